@@ -0,0 +1,163 @@
+// Модуль core для Python на pybind11: классы тел и колоночные расчеты над массивами NumPy.
+// Массивы float64/int32 в C-порядке передаются в ядро без копирования, на время циклов GIL отпускается,
+// а большие массивы делятся между потоками (set_num_threads).
+#include "inertia_calculator.h"
+
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include <string>
+
+namespace py = pybind11;
+
+using DoubleArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+using IntArray = py::array_t<int, py::array::c_style | py::array::forcecast>;
+
+static void checkLength(const py::array& arr, py::ssize_t n, const char* name) {
+    if (arr.ndim() != 1 || arr.shape(0) != n)
+        throw std::invalid_argument(std::string("Column '") + name + "' must have shape (" + std::to_string(n) + ",)");
+}
+
+static py::tuple calculateColumns(IntArray types, DoubleArray r, DoubleArray a, DoubleArray b,
+                                  DoubleArray c, DoubleArray h, DoubleArray density) {
+    py::ssize_t n = types.size();
+    checkLength(r, n, "r"); checkLength(a, n, "a"); checkLength(b, n, "b");
+    checkLength(c, n, "c"); checkLength(h, n, "h"); checkLength(density, n, "density");
+    DoubleArray mass(n), moment(n);
+    {
+        py::gil_scoped_release release;
+        calculate_columns_parallel(n, types.data(), r.data(), a.data(), b.data(), c.data(), h.data(),
+                                   density.data(), mass.mutable_data(), moment.mutable_data());
+    }
+    return py::make_tuple(mass, moment);
+}
+
+static py::tuple calculatePrincipalColumns(IntArray types, DoubleArray r, DoubleArray a, DoubleArray b,
+                                           DoubleArray c, DoubleArray h, DoubleArray density) {
+    py::ssize_t n = types.size();
+    checkLength(r, n, "r"); checkLength(a, n, "a"); checkLength(b, n, "b");
+    checkLength(c, n, "c"); checkLength(h, n, "h"); checkLength(density, n, "density");
+    DoubleArray mass(n);
+    DoubleArray principal({n, py::ssize_t(3)});
+    {
+        py::gil_scoped_release release;
+        calculate_principal_columns_parallel(n, types.data(), r.data(), a.data(), b.data(), c.data(), h.data(),
+                                             density.data(), mass.mutable_data(), principal.mutable_data());
+    }
+    return py::make_tuple(mass, principal);
+}
+
+static py::dict profileCounters() {
+    py::dict counters;
+    for (size_t i = 0; i < profile_counter_count(); ++i) {
+        unsigned long long calls, items, nanoseconds;
+        get_profile_counter(i, &calls, &items, &nanoseconds);
+        py::dict counter;
+        counter["calls"] = calls;
+        counter["items"] = items;
+        counter["seconds"] = nanoseconds * 1e-9;
+        counters[profile_counter_name(i)] = counter;
+    }
+    return counters;
+}
+
+static py::tuple assembleInertiaTensor(DoubleArray masses, DoubleArray principal, DoubleArray positions,
+                                       py::object rotations, py::object reference) {
+    py::ssize_t n = masses.size();
+    if (principal.size() != 3 * n || positions.size() != 3 * n)
+        throw std::invalid_argument("principal and positions must have shape (n, 3)");
+    DoubleArray rot, ref;
+    const double* rot_ptr = nullptr;
+    const double* ref_ptr = nullptr;
+    if (!rotations.is_none()) {
+        rot = rotations.cast<DoubleArray>();
+        if (rot.size() != 9 * n)
+            throw std::invalid_argument("rotations must have shape (n, 3, 3)");
+        rot_ptr = rot.data();
+    }
+    if (!reference.is_none()) {
+        ref = reference.cast<DoubleArray>();
+        if (ref.size() != 3)
+            throw std::invalid_argument("reference must have shape (3,)");
+        ref_ptr = ref.data();
+    }
+    DoubleArray com(3);
+    DoubleArray tensor({py::ssize_t(3), py::ssize_t(3)});
+    double total;
+    {
+        py::gil_scoped_release release;
+        total = assemble_inertia_tensor(n, masses.data(), principal.data(), positions.data(),
+                                        rot_ptr, ref_ptr, com.mutable_data(), tensor.mutable_data());
+    }
+    return py::make_tuple(total, com, tensor);
+}
+
+static py::tuple principalMoments(const Body& body, double density) {
+    if (density <= 0) throw std::invalid_argument("Density must be positive");
+    double out[3];
+    body.calculatePrincipalMoments(density, out);
+    return py::make_tuple(out[0], out[1], out[2]);
+}
+
+PYBIND11_MODULE(core, m) {
+    m.doc() = "Нативное ядро калькулятора моментов инерции";
+
+    m.attr("SPHERE") = int(BODY_SPHERE);
+    m.attr("BOX") = int(BODY_BOX);
+    m.attr("CYLINDER") = int(BODY_CYLINDER);
+
+    py::class_<Body>(m, "Body")
+        .def("calculate_moment", &Body::calculateMomentOfInertia, py::arg("density"))
+        .def("calculate_mass", &Body::calculateMass, py::arg("density"))
+        .def("principal_moments", &principalMoments, py::arg("density"))
+        .def_property_readonly("name", &Body::getName);
+
+    py::class_<Sphere, Body>(m, "Sphere")
+        .def(py::init<double>(), py::arg("radius"))
+        .def("get_dimensions", [](const Sphere& s) {
+            py::dict d;
+            d["radius"] = s.getRadius();
+            return d;
+        });
+
+    py::class_<Box, Body>(m, "Box")
+        .def(py::init<double, double, double>(), py::arg("a"), py::arg("b"), py::arg("c"))
+        .def("get_dimensions", [](const Box& box) {
+            double a, b, c;
+            box.getDimensions(a, b, c);
+            py::dict d;
+            d["a"] = a; d["b"] = b; d["c"] = c;
+            return d;
+        });
+
+    py::class_<Cylinder, Body>(m, "Cylinder")
+        .def(py::init<double, double>(), py::arg("radius"), py::arg("height"))
+        .def("get_dimensions", [](const Cylinder& cyl) {
+            double r, h;
+            cyl.getDimensions(r, h);
+            py::dict d;
+            d["radius"] = r; d["height"] = h;
+            return d;
+        });
+
+    m.def("calculate_columns", &calculateColumns,
+          py::arg("types"), py::arg("r"), py::arg("a"), py::arg("b"), py::arg("c"), py::arg("h"), py::arg("density"),
+          "Массы и моменты инерции по колонкам: возвращает (mass, moment), -1.0 для некорректных строк");
+    m.def("calculate_principal_columns", &calculatePrincipalColumns,
+          py::arg("types"), py::arg("r"), py::arg("a"), py::arg("b"), py::arg("c"), py::arg("h"), py::arg("density"),
+          "Массы и главные моменты (n, 3) по колонкам");
+    m.def("set_num_threads", &set_num_threads, py::arg("n"),
+          "Число потоков для колоночных расчетов, 0 - по числу ядер");
+    m.def("get_num_threads", &get_num_threads);
+    m.def("set_profiling", [](bool enabled) { set_profiling(enabled ? 1 : 0); }, py::arg("enabled"),
+          "Включает счетчики вызовов и времени функций ядра");
+    m.def("get_profiling", []() { return get_profiling() != 0; });
+    m.def("reset_profile_counters", &reset_profile_counters);
+    m.def("profile_counters", &profileCounters,
+          "Счетчики ядра: {имя: {calls, items, seconds}}");
+    m.def("assemble_inertia_tensor", &assembleInertiaTensor,
+          py::arg("masses"), py::arg("principal"), py::arg("positions"),
+          py::arg("rotations") = py::none(), py::arg("reference") = py::none(),
+          "Тензор инерции сборки по теореме Штейнера: (масса, центр масс, тензор 3x3)");
+}
@@ -1,27 +1,307 @@
 import sys
+import time
+
+# Отсчет времени запуска берется до тяжелых импортов
+_START = time.perf_counter()
+
+import json
+import math
 import os
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QLabel, QComboBox, QLineEdit,
-    QPushButton, QVBoxLayout, QHBoxLayout, QMessageBox,
-    QListWidget, QFileDialog, QTabWidget, QTextEdit, QGroupBox
-)
-from PyQt6.QtCore import Qt
-from inertia_wrapper import Sphere, Box, Cylinder, BodyContainer, ResultExporter
-
-import matplotlib
-matplotlib.use('Qt5Agg')
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-import numpy as np
+from contextlib import contextmanager
+from functools import lru_cache
+from types import SimpleNamespace
+
+# Время импорта модулей и этапов запуска в секундах от старта процесса (режим --profile-startup)
+STARTUP_TIMINGS = {"imports": {}, "stages": {}}
+
+
+@contextmanager
+def _timed_import(name):
+    start = time.perf_counter()
+    yield
+    STARTUP_TIMINGS["imports"][name] = time.perf_counter() - start
+
+
+def _mark_stage(name):
+    STARTUP_TIMINGS["stages"].setdefault(name, time.perf_counter() - _START)
+
+
+with _timed_import("PyQt6"):
+    from PyQt6.QtWidgets import (
+        QApplication, QWidget, QLabel, QComboBox, QLineEdit,
+        QPushButton, QVBoxLayout, QHBoxLayout, QMessageBox,
+        QTableView, QAbstractItemView, QHeaderView, QFileDialog, QTabWidget, QTextEdit, QGroupBox,
+        QSpinBox, QProgressBar, QCheckBox, QTableWidget, QTableWidgetItem
+    )
+    from PyQt6.QtCore import Qt, QEvent, QObject, QTimer, QThreadPool
+
+with _timed_import("inertia_wrapper"):
+    from inertia_wrapper import (
+        Sphere, Box, Cylinder, BodyContainer,
+        SPHERE, BOX, CYLINDER, SHAPE_CODES, PARAM_COLUMNS
+    )
+    import inertia_profile
+    from inertia_profile import timed, instrument
+    from gui_workers import Worker, TaskCancelled
+    from gui_models import BodyTableModel
+
+_mpl = None
+
+
+def _matplotlib():
+    """Matplotlib и NumPy загружаются при первом построении графика, а не при запуске окна"""
+    global _mpl
+    if _mpl is None:
+        with _timed_import("numpy"):
+            import numpy as np
+        with _timed_import("matplotlib"):
+            import matplotlib
+            matplotlib.use('QtAgg')
+            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+            from matplotlib.figure import Figure
+            from matplotlib import colormaps
+        with _timed_import("mpl_toolkits.mplot3d"):
+            from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+        _mpl = SimpleNamespace(np=np, Figure=Figure, FigureCanvas=FigureCanvas,
+                               Poly3DCollection=Poly3DCollection, colormaps=colormaps)
+    return _mpl
+
+
+# Размер блока фонового расчета и чтения файла: между блоками обновляется прогресс и проверяется отмена
+CALC_CHUNK_SIZE = 50000
+
+
+def calculation_task(worker, container, density):
+    """Фоновый расчет: в ядре блоками считаются только тела, измененные после прошлого расчета,
+    массы и моменты остальных получаются из хранимых результатов на единицу плотности"""
+    worker.report(0, container.pending)
+    # Все тела в начале координат с совпадающими осями; отмена между блоками сохраняет
+    # посчитанные блоки, следующий расчет продолжит с оставшихся тел
+    totals = container.update(density, CALC_CHUNK_SIZE, worker.report)
+    densities, masses, moments = container.results(density)
+    return list(zip(container.bodies, densities, moments)), masses, totals
+
+
+# Сколько последних расчетов хранит история (в виде массивов масс и моментов)
+HISTORY_SIZE = 20
+
+# Выше этого числа тел графики анализа строятся по агрегатам, а не по каждому телу
+AGGREGATE_THRESHOLD = 30
+# Сколько крупнейших по моменту тел показывается отдельно в агрегированном режиме
+TOP_K = 10
+# Выше этого числа точек диаграмма масса-момент строится как hexbin
+HEXBIN_THRESHOLD = 20000
+HIST_BINS = 40
+
+# Подпись, цвет и маркер типа тела на графиках анализа
+SHAPE_STYLES = {
+    SPHERE: ("Сфера", 'blue', 'o'),
+    BOX: ("Пар-д", 'green', 's'),
+    CYLINDER: ("Цил.", 'red', '^'),
+}
+
+
+def top_indices(values, k):
+    """Индексы k наибольших значений по убыванию без полной сортировки"""
+    np = _matplotlib().np
+    if len(values) > k:
+        indices = np.argpartition(values, -k)[-k:]
+    else:
+        indices = np.arange(len(values))
+    return indices[np.argsort(values[indices])[::-1]]
+
+
+def visualization_task(worker, results, masses):
+    """Данные графиков без matplotlib: колонки типов, масс и моментов и размеры подписываемых тел"""
+    np = _matplotlib().np
+    count = len(results)
+    codes = np.empty(count, dtype=np.intc)
+    moments = np.empty(count)
+    for i, (body, density, moment) in enumerate(results):
+        codes[i] = SHAPE_CODES.get(body.name, -1)
+        moments[i] = moment
+        if (i + 1) % 10000 == 0:
+            worker.report(i + 1, count)
+    # Размеры нужны только подписанным столбцам (малое число тел) и первому телу для распределения масс
+    labelled = range(count) if count <= AGGREGATE_THRESHOLD else [0]
+    dims = {i: results[i][0].get_dimensions() for i in labelled}
+    return SimpleNamespace(codes=codes, moments=moments, masses=np.asarray(masses, dtype=np.float64),
+                           dims=dims, first_density=results[0][1])
+
+
+def load_task(worker, filename, interner):
+    """Фоновое чтение тел из CSV/Parquet: блоки колонок с общими (интернированными) телами"""
+    from inertia_pipeline import read_chunks
+    # Повторяющиеся строки получают один объект тела, новые создаются одним вызовом DLL на блок
+    chunks = []
+    loaded = 0
+    for chunk in read_chunks(filename, CALC_CHUNK_SIZE):
+        bodies = interner.intern_columns(chunk["types"], **{name: chunk[name] for name in PARAM_COLUMNS})
+        chunks.append((chunk, bodies))
+        loaded += len(bodies)
+        # Общее число строк заранее неизвестно, прогресс показывается без шкалы
+        worker.report(loaded, 0)
+    return chunks
+
+
+# Фильтры диалога экспорта и расширения, добавляемые к имени файла без расширения
+EXPORT_FILTERS = {
+    "Text files (*.txt)": ".txt",
+    "PDF files (*.pdf)": ".pdf",
+    "CSV files (*.csv)": ".csv",
+    "JSON Lines (*.jsonl)": ".jsonl",
+    "Parquet files (*.parquet)": ".parquet",
+}
+
+
+def export_task(worker, filename, columns):
+    """Экспорт из числовых колонок блоками, без обращения к объектам тел"""
+    from inertia_export import export_results
+    try:
+        export_results(filename, progress=worker.report, **columns)
+    except TaskCancelled:
+        # Недописанный файл после отмены не оставляется
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+    return filename
+
+
+# Фиксирует первую отрисовку окна для режима --profile-startup
+class _FirstPaintFilter(QObject):
+    def __init__(self, on_paint):
+        super().__init__()
+        self._on_paint = on_paint
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            _mark_stage("first_paint")
+            QTimer.singleShot(0, self._on_paint)
+        return False
+
+
+# Доля объема описанного параллелепипеда, занятая телом: нужна, чтобы получить около count точек
+_FILL_FRACTION = {"Sphere": math.pi / 6, "Box": 1.0, "Cylinder": math.pi / 4}
+
+
+def mass_point_cloud(name, dims, count):
+    """Около count точек, равномерно заполняющих тело с центром в начале координат, массив (n, 3).
+
+    Точки берутся в узлах регулярной сетки по описанному параллелепипеду и отсекаются формой тела,
+    поэтому облако строится одним векторным проходом NumPy.
+    """
+    np = _matplotlib().np
+    if name == "Sphere":
+        r = dims["radius"]
+        half = np.array([r, r, r])
+    elif name == "Box":
+        half = np.array([dims["a"], dims["b"], dims["c"]]) / 2
+    else:
+        r = dims["radius"]
+        half = np.array([r, r, dims["height"] / 2])
+    per_axis = max(2, int(round((count / _FILL_FRACTION[name]) ** (1 / 3))))
+    # Узлы в центрах ячеек, чтобы точки не ложились на поверхность
+    axis = (np.arange(per_axis) + 0.5) / per_axis * 2 - 1
+    grid = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    if name == "Sphere":
+        grid = grid[(grid ** 2).sum(axis=1) <= 1]
+    elif name == "Cylinder":
+        grid = grid[grid[:, 0] ** 2 + grid[:, 1] ** 2 <= 1]
+    return grid * half
+
+
+def _grid_polygons(x, y, z):
+    # Сетка поверхности (m, n) -> четырехугольные грани (k, 4, 3)
+    np = _matplotlib().np
+    p = np.stack([x, y, z], axis=-1)
+    quads = np.stack([p[:-1, :-1], p[1:, :-1], p[1:, 1:], p[:-1, 1:]], axis=2)
+    return quads.reshape(-1, 4, 3)
+
+
+# Полуразмеры единичных сеток по осям: размеры тела умножаются на них для пределов осей
+_UNIT_HALF = {"Sphere": (1.0, 1.0, 1.0), "Box": (0.5, 0.5, 0.5), "Cylinder": (1.0, 1.0, 0.5)}
+
+
+@lru_cache(maxsize=None)
+def unit_mesh(name):
+    """Грани единичного тела (k, 4, 3) и их яркость (k,), считаются один раз на тип тела.
+
+    Сфера радиуса 1, куб со стороной 1, цилиндр радиуса 1 и высоты 1 с центром в начале координат;
+    под конкретное тело грани масштабируются умножением на размеры по осям.
+    """
+    np = _matplotlib().np
+    if name == "Sphere":
+        u = np.linspace(0, 2 * np.pi, 30)
+        v = np.linspace(0, np.pi, 30)
+        polys = _grid_polygons(np.outer(np.cos(u), np.sin(v)), np.outer(np.sin(u), np.sin(v)),
+                               np.outer(np.ones(np.size(u)), np.cos(v)))
+    elif name == "Box":
+        v = np.array([
+            [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+            [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]
+        ]) * 0.5
+        polys = v[[[0, 1, 2, 3], [4, 5, 6, 7], [0, 1, 5, 4], [2, 3, 7, 6], [0, 3, 7, 4], [1, 2, 6, 5]]]
+    else:
+        theta = np.linspace(0, 2 * np.pi, 30)
+        theta_grid, z_grid = np.meshgrid(theta, np.linspace(-0.5, 0.5, 2))
+        side = _grid_polygons(np.cos(theta_grid), np.sin(theta_grid), z_grid)
+        r_grid, theta_grid = np.meshgrid(np.linspace(0, 1, 10), theta)
+        x_cap, y_cap = r_grid * np.cos(theta_grid), r_grid * np.sin(theta_grid)
+        top = _grid_polygons(x_cap, y_cap, np.full_like(x_cap, 0.5))
+        bottom = _grid_polygons(x_cap, y_cap, np.full_like(x_cap, -0.5))
+        polys = np.concatenate([side, top, bottom])
+    # Освещение граней по нормалям единичной сетки, как shade=True у plot_surface
+    normals = np.cross(polys[:, 2] - polys[:, 0], polys[:, 3] - polys[:, 1])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True) + 1e-12
+    light = np.array([-1.0, -1.0, 1.0]) / np.sqrt(3)
+    shade = 0.55 + 0.45 * np.abs(normals @ light)
+    polys.setflags(write=False)
+    shade.setflags(write=False)
+    return polys, shade
 
 
+@lru_cache(maxsize=None)
+def shaded_colors(name, color, alpha):
+    """Цвета граней единичной сетки с учетом освещения (k, 4)"""
+    from matplotlib.colors import to_rgb
+    np = _matplotlib().np
+    _, shade = unit_mesh(name)
+    colors = np.empty((shade.shape[0], 4))
+    colors[:, :3] = shade[:, None] * np.array(to_rgb(color))
+    colors[:, 3] = alpha
+    colors.setflags(write=False)
+    return colors
+
+
+def scaled_mesh(name, scale):
+    """Грани тела с размерами scale по осям x, y, z"""
+    polys, _ = unit_mesh(name)
+    return polys * _matplotlib().np.asarray(scale, dtype=float)
+
+
+def set_half_limits(ax, name, scale):
+    half = [s * h for s, h in zip(scale, _UNIT_HALF[name])]
+    ax.set_xlim(-half[0], half[0])
+    ax.set_ylim(-half[1], half[1])
+    ax.set_zlim(-half[2], half[2])
+
+
+@instrument
 class InertiaGUI(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Калькулятор моментов инерции твердых тел (ООП + C++ ядро)")
         self.body_container = BodyContainer()
-        self.calculation_history = []
+        # Таблица общих тел и кэш результатов создаются при первой загрузке: модуль тянет NumPy
+        self.interner = None
+        # История и итоги создаются после первого расчета: модуль истории тянет NumPy
+        self.calculation_history = None
+        self.totals = None
+        self.calc_density = None
+        self.viz_data = None
+        # Текущая фоновая задача (одновременно выполняется не больше одной)
+        self.active_worker = None
         
         self.init_ui()
         self.resize(1200, 700)
@@ -38,12 +318,29 @@ class InertiaGUI(QWidget):
         visualization_tab = QWidget()
         self.setup_visualization_tab(visualization_tab)
         
+        profile_tab = QWidget()
+        self.setup_profile_tab(profile_tab)
+        
         tabs.addTab(calc_tab, "Калькулятор")
         tabs.addTab(instruction_tab, "Инструкция")
         tabs.addTab(visualization_tab, "Визуализация")
+        tabs.addTab(profile_tab, "Профилирование")
+        
+        # Строка состояния фоновой задачи, видна только во время ее выполнения
+        self.task_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.cancel_btn = QPushButton("Отмена")
+        self.cancel_btn.clicked.connect(self.cancel_task)
+        task_layout = QHBoxLayout()
+        task_layout.addWidget(self.task_label)
+        task_layout.addWidget(self.progress_bar, 1)
+        task_layout.addWidget(self.cancel_btn)
+        for widget in (self.task_label, self.progress_bar, self.cancel_btn):
+            widget.hide()
         
         main_layout = QVBoxLayout()
         main_layout.addWidget(tabs)
+        main_layout.addLayout(task_layout)
         self.setLayout(main_layout)
 
     def setup_calculator_tab(self, tab):
@@ -60,18 +357,39 @@ class InertiaGUI(QWidget):
         self.calc_btn = QPushButton("Рассчитать все")
         self.clear_btn = QPushButton("Очистить")
         self.export_btn = QPushButton("Экспорт результатов")
+        self.load_btn = QPushButton("Загрузить из файла")
+        self.incremental_box = QCheckBox("Досчитывать новые тела без полного пересчета")
+        self.incremental_box.setChecked(True)
 
         self.result_label = QLabel("Результат: ")
-        self.body_list = QListWidget()
+        # Таблица запрашивает у модели только видимые строки, поэтому выдерживает миллионы тел
+        self.body_model = BodyTableModel(self)
+        self.body_list = QTableView()
+        self.body_list.setModel(self.body_model)
+        self.body_list.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.body_list.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.body_list.verticalHeader().hide()
+        # Фиксированная высота строк: представлению не нужно измерять содержимое
+        self.body_list.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.body_list.horizontalHeader().setStretchLastSection(True)
+        self.body_list.setSortingEnabled(True)
+        self.body_list.sortByColumn(0, Qt.SortOrder.AscendingOrder)
 
-        self.figure = Figure(figsize=(6, 5))
-        self.canvas = FigureCanvas(self.figure)
+        # Фигура 3D-вида создается при первом выборе тела, до этого на ее месте подсказка
+        self.figure = None
+        self.canvas = None
+        self.body_ax = None
+        self.plot_layout = QVBoxLayout()
+        self.plot_placeholder = QLabel("Выберите тело в списке, чтобы увидеть его 3D-модель")
+        self.plot_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.plot_layout.addWidget(self.plot_placeholder)
 
         self.add_btn.clicked.connect(self.add_body)
         self.calc_btn.clicked.connect(self.calculate_all)
         self.clear_btn.clicked.connect(self.clear_all)
         self.export_btn.clicked.connect(self.export_results)
-        self.body_list.currentRowChanged.connect(self.on_body_selected)
+        self.load_btn.clicked.connect(self.load_bodies)
+        self.body_list.selectionModel().currentRowChanged.connect(self.on_body_selected)
 
         controls_layout = QVBoxLayout()
         
@@ -96,7 +414,11 @@ class InertiaGUI(QWidget):
         buttons_layout.addWidget(self.calc_btn)
         buttons_layout.addWidget(self.clear_btn)
         control_layout.addLayout(buttons_layout)
-        control_layout.addWidget(self.export_btn)
+        files_layout = QHBoxLayout()
+        files_layout.addWidget(self.load_btn)
+        files_layout.addWidget(self.export_btn)
+        control_layout.addLayout(files_layout)
+        control_layout.addWidget(self.incremental_box)
         control_layout.addWidget(self.result_label)
         control_layout.addWidget(QLabel("Добавленные тела:"))
         control_layout.addWidget(self.body_list)
@@ -107,7 +429,7 @@ class InertiaGUI(QWidget):
 
         main_layout = QHBoxLayout()
         main_layout.addLayout(controls_layout, 1)
-        main_layout.addWidget(self.canvas, 2)
+        main_layout.addLayout(self.plot_layout, 2)
         
         tab.setLayout(main_layout)
         self.on_shape_changed()
@@ -195,18 +517,147 @@ class InertiaGUI(QWidget):
 
     def setup_visualization_tab(self, tab):
         layout = QVBoxLayout()
-        self.calc_figure = Figure(figsize=(10, 8))
-        self.calc_canvas = FigureCanvas(self.calc_figure)
+        # Фигура графиков создается при первой генерации визуализации
+        self.calc_figure = None
+        self.calc_canvas = None
         self.viz_btn = QPushButton("Сгенерировать визуализацию на основе расчетов")
         self.viz_btn.clicked.connect(self.generate_calculation_visualization)
-        layout.addWidget(self.viz_btn)
-        layout.addWidget(self.calc_canvas)
+        self.mass_points_box = QSpinBox()
+        self.mass_points_box.setRange(27, 50000)
+        self.mass_points_box.setSingleStep(500)
+        self.mass_points_box.setValue(2000)
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(self.viz_btn, 1)
+        options_layout.addWidget(QLabel("Точек в распределении масс:"))
+        options_layout.addWidget(self.mass_points_box)
+        layout.addLayout(options_layout)
+        self.viz_layout = layout
+        tab.setLayout(layout)
+
+    def setup_profile_tab(self, tab):
+        layout = QVBoxLayout()
+        self.profile_box = QCheckBox("Включить профилирование")
+        self.profile_box.setChecked(inertia_profile.enabled)
+        self.profile_box.toggled.connect(self.on_profile_toggled)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.profile_box, 1)
+        for text, slot in (("Обновить", self.refresh_profile), ("Сбросить", self.reset_profile),
+                           ("Сохранить JSON", self.save_profile)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            buttons.addWidget(button)
+        self.profile_table = QTableWidget(0, 5)
+        self.profile_table.setHorizontalHeaderLabels(["Замер", "Вызовы", "Тела", "Время, с", "Среднее, мс"])
+        self.profile_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.profile_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addLayout(buttons)
+        layout.addWidget(self.profile_table)
         tab.setLayout(layout)
 
+    def on_profile_toggled(self, checked):
+        if checked:
+            inertia_profile.enable()
+        else:
+            inertia_profile.disable()
+
+    def refresh_profile(self):
+        report = inertia_profile.report()
+        # Таймеры Python, затем счетчики и функции нативных ядер с префиксом ядра
+        rows = [(name, t["calls"], t["items"], t["seconds"]) for name, t in sorted(report["timers"].items())]
+        rows += [(name, value, "", None) for name, value in sorted(report["counters"].items())]
+        rows += [(f"{core}: {name}", c["calls"], c["items"], c["seconds"])
+                 for core, counters in sorted(report["native"].items()) for name, c in sorted(counters.items())]
+        self.profile_table.setRowCount(len(rows))
+        for row, (name, calls, items, seconds) in enumerate(rows):
+            values = [name, str(calls), str(items), "", ""]
+            if seconds is not None:
+                values[3] = f"{seconds:.6f}"
+                values[4] = f"{seconds / calls * 1000:.4f}" if calls else ""
+            for column, value in enumerate(values):
+                self.profile_table.setItem(row, column, QTableWidgetItem(value))
+
+    def reset_profile(self):
+        inertia_profile.reset()
+        self.refresh_profile()
+
+    def save_profile(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить профиль", "profile.json", "JSON (*.json)")
+        if not filename:
+            return
+        try:
+            inertia_profile.dump(filename)
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения профиля: {e}")
+
+    def ensure_body_canvas(self):
+        if self.canvas is None:
+            mpl = _matplotlib()
+            self.figure = mpl.Figure(figsize=(6, 5))
+            self.canvas = mpl.FigureCanvas(self.figure)
+            self.plot_layout.removeWidget(self.plot_placeholder)
+            self.plot_placeholder.hide()
+            self.plot_placeholder.deleteLater()
+            self.plot_layout.addWidget(self.canvas)
+        return self.figure
+
+    def ensure_calc_canvas(self):
+        if self.calc_canvas is None:
+            mpl = _matplotlib()
+            self.calc_figure = mpl.Figure(figsize=(10, 8))
+            self.calc_canvas = mpl.FigureCanvas(self.calc_figure)
+            self.viz_layout.addWidget(self.calc_canvas)
+        return self.calc_figure
+
+    def run_task(self, title, error_text, fn, args, on_finished):
+        """Запускает fn(worker, *args) в QThreadPool; on_finished получает результат в потоке GUI"""
+        worker = Worker(fn, *args)
+        signals = worker.signals
+        signals.progress.connect(self.on_task_progress)
+        # finish_task подключается первым: кнопки включаются до обработчиков результата
+        for signal in (signals.finished, signals.failed, signals.cancelled):
+            signal.connect(self.finish_task)
+        signals.finished.connect(on_finished)
+        signals.failed.connect(lambda message: QMessageBox.critical(self, "Ошибка", f"{error_text}: {message}"))
+        signals.cancelled.connect(lambda: self.result_label.setText(f"{title}: отменено"))
+        self.active_worker = worker
+        self.set_busy(True, title)
+        QThreadPool.globalInstance().start(worker)
+
+    def set_busy(self, busy, title=""):
+        # Пока идет задача, список тел и результаты не меняются
+        for button in (self.add_btn, self.calc_btn, self.clear_btn, self.export_btn, self.load_btn, self.viz_btn):
+            button.setEnabled(not busy)
+        self.task_label.setText(title)
+        self.progress_bar.setRange(0, 0)
+        self.cancel_btn.setEnabled(True)
+        for widget in (self.task_label, self.progress_bar, self.cancel_btn):
+            widget.setVisible(busy)
+
+    def on_task_progress(self, done, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def finish_task(self, *_):
+        self.active_worker = None
+        self.set_busy(False)
+
+    def cancel_task(self):
+        if self.active_worker is not None:
+            self.active_worker.cancel()
+            self.cancel_btn.setEnabled(False)
+
+    def closeEvent(self, event):
+        # Фоновая задача останавливается до уничтожения окна и ядра
+        if self.active_worker is not None:
+            self.active_worker.cancel()
+            QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+
     def generate_calculation_visualization(self):
-        self.calc_figure.clear()
+        self.ensure_calc_canvas()
         
         if not hasattr(self, 'results') or not self.results:
+            self.calc_figure.clear()
             ax = self.calc_figure.add_subplot(111)
             ax.text(0.5, 0.5, 'Нет данных для визуализации.\nСначала рассчитайте моменты инерции.', 
                     transform=ax.transAxes, ha='center', va='center', fontsize=12)
@@ -214,6 +665,14 @@ class InertiaGUI(QWidget):
             self.calc_canvas.draw()
             return
         
+        # Данные собираются в фоне, рисование matplotlib остается в потоке GUI
+        self.run_task("Подготовка визуализации", "Ошибка визуализации", visualization_task,
+                      (self.results, self.masses), self.draw_calculation_visualization)
+
+    @timed()
+    def draw_calculation_visualization(self, data):
+        self.viz_data = data
+        self.calc_figure.clear()
         grid = self.calc_figure.add_gridspec(2, 2)
         
         ax1 = self.calc_figure.add_subplot(grid[0, 0])
@@ -231,29 +690,35 @@ class InertiaGUI(QWidget):
         self.calc_figure.tight_layout()
         self.calc_canvas.draw()
 
+    def body_colors(self, count):
+        # Палитра повторяется по кругу, поэтому цветов хватает на любое число тел
+        cmap = _matplotlib().colormaps['tab20']
+        return [cmap(i % cmap.N) for i in range(count)]
+
+    def body_label(self, i):
+        code = int(self.viz_data.codes[i])
+        dims = self.viz_data.dims.get(i, {})
+        if code == SPHERE:
+            return f"Сфера\nr={dims.get('radius', 0):.2f}м"
+        elif code == BOX:
+            return f"Пар-д\n{dims.get('a', 0):.1f}×{dims.get('b', 0):.1f}×{dims.get('c', 0):.1f}м"
+        elif code == CYLINDER:
+            return f"Цилиндр\nr={dims.get('radius', 0):.2f}м"
+        return f"Тело {i+1}"
+
+    @timed()
     def plot_actual_inertia_comparison(self, ax):
-        if not hasattr(self, 'results'):
+        data = self.viz_data
+        if data is None:
             return
-            
-        body_names = []
-        moments = []
-        
-        for i, (body, density, moment) in enumerate(self.results):
-            dims = body.get_dimensions()
-            if body.name == "Sphere":
-                name = f"Сфера\nr={dims.get('radius', 0):.2f}м"
-            elif body.name == "Box":
-                name = f"Пар-д\n{dims.get('a', 0):.1f}×{dims.get('b', 0):.1f}×{dims.get('c', 0):.1f}м"
-            elif body.name == "Cylinder":
-                name = f"Цилиндр\nr={dims.get('radius', 0):.2f}м"
-            else:
-                name = f"Тело {i+1}"
-                
-            body_names.append(name)
-            moments.append(moment)
+        if len(data.moments) > AGGREGATE_THRESHOLD:
+            self.plot_moment_histogram(ax)
+            return
+        
+        body_names = [self.body_label(i) for i in range(len(data.moments))]
+        moments = data.moments.tolist()
         
-        colors = ['lightblue', 'lightgreen', 'lightcoral', 'gold', 'lightpink', 'lightcyan']
-        bars = ax.bar(body_names, moments, color=colors[:len(body_names)])
+        bars = ax.bar(body_names, moments, color=self.body_colors(len(moments)))
         ax.set_title('Сравнение моментов инерции')
         ax.set_ylabel('Момент инерции (кг·м²)')
         ax.tick_params(axis='x', rotation=45)
@@ -263,87 +728,108 @@ class InertiaGUI(QWidget):
             ax.text(bar.get_x() + bar.get_width()/2., height,
                    f'{moment:.4f}', ha='center', va='bottom', fontsize=9)
 
+    @timed()
+    def plot_moment_histogram(self, ax):
+        """Гистограмма моментов по типам тел (логарифмические интервалы) вместо столбца на тело"""
+        np = _matplotlib().np
+        data = self.viz_data
+        moments = data.moments
+        low, high = moments.min(), moments.max()
+        log_scale = low > 0 and high > low
+        bins = np.geomspace(low, high, HIST_BINS + 1) if log_scale else HIST_BINS
+        groups = [(style, moments[data.codes == code]) for code, style in SHAPE_STYLES.items()]
+        groups = [(style, values) for style, values in groups if len(values)]
+        ax.hist([values for _, values in groups], bins=bins, stacked=True,
+                color=[style[1] for style, _ in groups], alpha=0.6,
+                label=[style[0] for style, _ in groups])
+        if log_scale:
+            ax.set_xscale('log')
+        ax.set_title(f'Распределение моментов инерции ({len(moments)} тел)')
+        ax.set_xlabel('Момент инерции (кг·м²)')
+        ax.set_ylabel('Число тел')
+        ax.legend()
+
+    @timed()
     def plot_inertia_contribution(self, ax):
-        if not hasattr(self, 'results'):
+        data = self.viz_data
+        if data is None:
             return
             
-        moments = [moment for _, _, moment in self.results]
+        moments = data.moments.tolist()
         total = sum(moments)
         
         if total == 0:
             ax.text(0.5, 0.5, 'Нет данных', transform=ax.transAxes, ha='center')
             return
+        if len(moments) > TOP_K:
+            self.plot_top_contributions(ax, total)
+            return
         
         labels = []
-        for i, (body, density, moment) in enumerate(self.results):
-            dims = body.get_dimensions()
+        for i, moment in enumerate(moments):
             percentage = (moment / total) * 100
-            
-            if body.name == "Sphere":
-                label = f"Сфера\n{percentage:.1f}%"
-            elif body.name == "Box":
-                label = f"Пар-д\n{percentage:.1f}%"
-            elif body.name == "Cylinder":
-                label = f"Цил.\n{percentage:.1f}%"
-            else:
-                label = f"Тело {i+1}\n{percentage:.1f}%"
-                
-            labels.append(label)
+            style = SHAPE_STYLES.get(int(data.codes[i]))
+            name = style[0] if style else f"Тело {i+1}"
+            labels.append(f"{name}\n{percentage:.1f}%")
         
-        colors = ['lightblue', 'lightgreen', 'lightcoral', 'gold', 'lightpink', 'lightcyan']
-        wedges, texts, autotexts = ax.pie(moments, labels=labels, autopct='%1.1f%%', 
-                                         colors=colors[:len(moments)])
+        ax.pie(moments, labels=labels, autopct='%1.1f%%', colors=self.body_colors(len(moments)))
         ax.set_title('Вклад тел в общий момент инерции')
 
+    @timed()
+    def plot_top_contributions(self, ax, total):
+        """Доли TOP_K крупнейших тел горизонтальными столбцами вместо сектора на каждое тело"""
+        data = self.viz_data
+        top = top_indices(data.moments, TOP_K)
+        shares = data.moments[top] / total * 100
+        styles = [SHAPE_STYLES.get(int(data.codes[i]), ("Тело", 'gray', None)) for i in top]
+        positions = list(range(len(top)))
+        ax.barh(positions, shares, color=[style[1] for style in styles], alpha=0.6)
+        ax.set_yticks(positions, [f"{style[0]} №{i+1}" for style, i in zip(styles, top.tolist())])
+        ax.invert_yaxis()
+        ax.set_xlabel('Доля общего момента инерции, %')
+        ax.set_title(f'Крупнейшие {len(top)} из {len(data.moments)} тел ({shares.sum():.1f}% момента)')
+
+    @timed()
     def plot_mass_inertia_correlation(self, ax):
-        if not hasattr(self, 'results'):
+        np = _matplotlib().np
+        data = self.viz_data
+        if data is None:
             return
-            
-        masses = []
-        moments = []
-        colors = []
-        markers = []
-        
-        for i, (body, density, moment) in enumerate(self.results):
-            try:
-                if body.name == "Sphere":
-                    r = body.get_radius()
-                    mass = (4/3) * np.pi * r**3 * density
-                    color = 'blue'
-                    marker = 'o'
-                elif body.name == "Box":
-                    dims = body.get_dimensions()
-                    mass = dims['a'] * dims['b'] * dims['c'] * density
-                    color = 'green'
-                    marker = 's'
-                elif body.name == "Cylinder":
-                    dims = body.get_dimensions()
-                    mass = np.pi * dims['radius']**2 * dims['height'] * density
-                    color = 'red'
-                    marker = '^'
-                else:
-                    continue
-                    
-                masses.append(mass)
-                moments.append(moment)
-                colors.append(color)
-                markers.append(marker)
-            except:
-                continue
-        
-        if not masses:
+        # Массы посчитаны ядром вместе с моментами, формулы здесь не повторяются
+        known = data.codes >= 0
+        masses = data.masses[known]
+        moments = data.moments[known]
+        if not len(masses):
             return
-            
-        for i, (mass, moment, color, marker) in enumerate(zip(masses, moments, colors, markers)):
-            ax.scatter(mass, moment, c=color, marker=marker, s=100, alpha=0.7)
-            ax.annotate(f'Тело {i+1}', (mass, moment), 
-                       xytext=(5, 5), textcoords='offset points', fontsize=9)
         
-        if len(masses) > 1:
+        if len(masses) > HEXBIN_THRESHOLD:
+            # Плотность точек вместо миллиона маркеров
+            log_scale = masses.min() > 0 and moments.min() > 0
+            scale = 'log' if log_scale else 'linear'
+            hexbin = ax.hexbin(masses, moments, gridsize=50, bins='log', mincnt=1, cmap='viridis',
+                               xscale=scale, yscale=scale)
+            self.calc_figure.colorbar(hexbin, ax=ax, label='Число тел')
+        else:
+            # Одна коллекция точек на тип тела; подписи только при малом числе тел
+            large = len(data.moments) > AGGREGATE_THRESHOLD
+            for code, (label, color, marker) in SHAPE_STYLES.items():
+                selected = data.codes == code
+                if selected.any():
+                    ax.scatter(data.masses[selected], data.moments[selected], c=color, marker=marker,
+                               s=10 if large else 100, alpha=0.5 if large else 0.7,
+                               label=label, linewidths=0 if large else None)
+            if not large:
+                for i, (mass, moment) in enumerate(zip(data.masses.tolist(), data.moments.tolist())):
+                    ax.annotate(f'Тело {i+1}', (mass, moment),
+                               xytext=(5, 5), textcoords='offset points', fontsize=9)
+        
+        # Линейный тренд на логарифмических осях hexbin вводил бы в заблуждение
+        if 1 < len(masses) <= HEXBIN_THRESHOLD and masses.min() < masses.max():
             z = np.polyfit(masses, moments, 1)
             p = np.poly1d(z)
-            mass_range = np.linspace(min(masses), max(masses), 100)
+            mass_range = np.linspace(masses.min(), masses.max(), 100)
             ax.plot(mass_range, p(mass_range), "r--", alpha=0.5, label='Тренд')
+        if ax.get_legend_handles_labels()[0]:
             ax.legend()
         
         ax.set_xlabel('Масса (кг)')
@@ -351,131 +837,77 @@ class InertiaGUI(QWidget):
         ax.set_title('Корреляция массы и момента инерции')
         ax.grid(True, alpha=0.3)
 
+    @timed()
     def plot_actual_mass_distribution(self, ax):
-        if not hasattr(self, 'results'):
-            return
-            
-        if self.results:
-            body, density, moment = self.results[0]
+        if self.viz_data is not None:
+            code = int(self.viz_data.codes[0])
+            dims = self.viz_data.dims[0]
+            density = self.viz_data.first_density
             try:
-                dims = body.get_dimensions()
-                
-                if body.name == "Sphere":
+                if code == SPHERE:
                     r = dims.get('radius', 1.0)
                     self.plot_sphere_mass_distribution(ax, r, density)
                     ax.set_title(f"Распределение масс: Сфера r={r:.2f}м")
-                elif body.name == "Box":
+                elif code == BOX:
                     a = dims.get('a', 1.0)
                     b = dims.get('b', 1.0)
                     c = dims.get('c', 1.0)
                     self.plot_box_mass_distribution(ax, a, b, c, density)
                     ax.set_title(f"Распределение масс: Параллелепипед {a:.1f}×{b:.1f}×{c:.1f}м")
-                elif body.name == "Cylinder":
+                elif code == CYLINDER:
                     r = dims.get('radius', 1.0)
                     h = dims.get('height', 1.0)
                     self.plot_cylinder_mass_distribution(ax, r, h, density)
                     ax.set_title(f"Распределение масс: Цилиндр r={r:.2f}м, h={h:.2f}м")
             except Exception as e:
-                ax.text(0.5, 0.5, 0.5, f"Ошибка визуализации:\n{e}", 
-                        transform=ax.transAxes, ha='center')
+                # Сообщение в координатах осей поверх 3D-сцены
+                ax.text2D(0.5, 0.5, f"Ошибка визуализации:\n{e}", transform=ax.transAxes,
+                          ha='center', va='center', color='red')
         else:
-            ax.text(0.5, 0.5, 0.5, "Нет данных", 
-                    transform=ax.transAxes, ha='center')
+            ax.text2D(0.5, 0.5, "Нет данных", transform=ax.transAxes, ha='center', va='center')
+
+    def mass_point_count(self):
+        return self.mass_points_box.value()
 
+    def scatter_mass_cloud(self, ax, points, weight):
+        """Облако точек одним набором scatter: размер и цвет растут с квадратом расстояния до оси"""
+        # Чем больше точек, тем они мельче, чтобы облако не сливалось
+        base = max(2.0, 2000.0 / max(len(points), 1) ** (2 / 3))
+        ax.scatter(points[:, 0], points[:, 1], points[:, 2], s=base * (0.2 + weight),
+                   c=weight, cmap='Reds', vmin=-0.3, vmax=1.0, alpha=0.6, depthshade=False)
+
+    def add_body_surface(self, ax, name, scale, color):
+        # Полупрозрачная оболочка тела из кэша единичных сеток
+        ax.add_collection3d(_matplotlib().Poly3DCollection(
+            scaled_mesh(name, scale), facecolors=shaded_colors(name, color, 0.3), linewidths=0))
+        set_half_limits(ax, name, scale)
+
+    @timed()
     def plot_sphere_mass_distribution(self, ax, r, density):
-        try:
-            u = np.linspace(0, 2 * np.pi, 30)
-            v = np.linspace(0, np.pi, 30)
-            x = r * np.outer(np.cos(u), np.sin(v))
-            y = r * np.outer(np.sin(u), np.sin(v))
-            z = r * np.outer(np.ones(np.size(u)), np.cos(v))
-            
-            ax.plot_surface(x, y, z, color='lightblue', alpha=0.3)
-            
-            for i in range(3):
-                ri = r * (i + 1) / 4
-                ui = np.linspace(0, 2 * np.pi, 6)
-                vi = np.linspace(0, np.pi, 6)
-                
-                for u_val in ui:
-                    for v_val in vi:
-                        x_point = ri * np.cos(u_val) * np.sin(v_val)
-                        y_point = ri * np.sin(u_val) * np.sin(v_val)
-                        z_point = ri * np.cos(v_val)
-                        
-                        size = (ri / r) ** 2 * 80
-                        ax.scatter(x_point, y_point, z_point, s=size, 
-                                  color='red', alpha=0.6)
-        except Exception as e:
-            print(f"Ошибка визуализации сферы: {e}")
+        self.add_body_surface(ax, "Sphere", (r, r, r), 'lightblue')
+        
+        points = mass_point_cloud("Sphere", {"radius": r}, self.mass_point_count())
+        # Ось вращения сферы - z
+        weight = (points[:, 0] ** 2 + points[:, 1] ** 2) / (r * r)
+        self.scatter_mass_cloud(ax, points, weight)
 
+    @timed()
     def plot_box_mass_distribution(self, ax, a, b, c, density):
-        try:
-            vertices = np.array([
-                [-a/2, -b/2, -c/2], [a/2, -b/2, -c/2],
-                [a/2, b/2, -c/2], [-a/2, b/2, -c/2],
-                [-a/2, -b/2, c/2], [a/2, -b/2, c/2],
-                [a/2, b/2, c/2], [-a/2, b/2, c/2]
-            ])
-            
-            faces = [
-                [vertices[0], vertices[1], vertices[2], vertices[3]],
-                [vertices[4], vertices[5], vertices[6], vertices[7]],
-                [vertices[0], vertices[1], vertices[5], vertices[4]],
-                [vertices[2], vertices[3], vertices[7], vertices[6]],
-                [vertices[0], vertices[3], vertices[7], vertices[4]],
-                [vertices[1], vertices[2], vertices[6], vertices[5]]
-            ]
-            
-            ax.add_collection3d(Poly3DCollection(faces, facecolors='lightgreen', 
-                                               alpha=0.3, linewidths=1))
-            
-            n_points = 3
-            for i in range(n_points):
-                for j in range(n_points):
-                    for k in range(n_points):
-                        x = -a/2 + (i + 0.5) * a / n_points
-                        y = -b/2 + (j + 0.5) * b / n_points
-                        z = -c/2 + (k + 0.5) * c / n_points
-                        
-                        distance_sq = x**2 + z**2
-                        max_distance_sq = (a/2)**2 + (c/2)**2
-                        size = (distance_sq / max_distance_sq) * 150 if max_distance_sq > 0 else 50
-                        
-                        ax.scatter(x, y, z, s=size, color='red', alpha=0.6)
-            
-            ax.set_xlim(-a/2, a/2)
-            ax.set_ylim(-b/2, b/2)
-            ax.set_zlim(-c/2, c/2)
-        except Exception as e:
-            print(f"Ошибка визуализации параллелепипеда: {e}")
+        self.add_body_surface(ax, "Box", (a, b, c), 'lightgreen')
+        
+        points = mass_point_cloud("Box", {"a": a, "b": b, "c": c}, self.mass_point_count())
+        # Момент (b² + c²)/12 берется относительно оси x
+        weight = (points[:, 1] ** 2 + points[:, 2] ** 2) / ((b / 2) ** 2 + (c / 2) ** 2)
+        self.scatter_mass_cloud(ax, points, weight)
 
+    @timed()
     def plot_cylinder_mass_distribution(self, ax, r, h, density):
-        try:
-            z = np.linspace(-h/2, h/2, 20)
-            theta = np.linspace(0, 2*np.pi, 20)
-            theta_grid, z_grid = np.meshgrid(theta, z)
-            x_grid = r * np.cos(theta_grid)
-            y_grid = r * np.sin(theta_grid)
-            
-            ax.plot_surface(x_grid, y_grid, z_grid, color='lightcoral', alpha=0.3)
-            
-            n_radial = 3
-            n_angular = 6
-            n_height = 3
-            
-            for i in range(n_radial):
-                ri = r * (i + 0.5) / n_radial
-                for j in range(n_angular):
-                    theta = 2 * np.pi * j / n_angular
-                    for k in range(n_height):
-                        z_val = -h/2 + (k + 0.5) * h / n_height
-                        x = ri * np.cos(theta)
-                        y = ri * np.sin(theta)
-                        size = (ri / r) ** 2 * 80
-                        ax.scatter(x, y, z_val, s=size, color='red', alpha=0.6)
-        except Exception as e:
-            print(f"Ошибка визуализации цилиндра: {e}")
+        self.add_body_surface(ax, "Cylinder", (r, r, h), 'lightcoral')
+        
+        points = mass_point_cloud("Cylinder", {"radius": r, "height": h}, self.mass_point_count())
+        # Ось цилиндра - z
+        weight = (points[:, 0] ** 2 + points[:, 1] ** 2) / (r * r)
+        self.scatter_mass_cloud(ax, points, weight)
 
     def on_shape_changed(self):
         shape = self.shape_box.currentText()
@@ -501,17 +933,12 @@ class InertiaGUI(QWidget):
             else:
                 raise ValueError("Неизвестная фигура")
             
+            if self.interner is not None:
+                body = self.interner.intern(body)
             self.body_container.add_body(body)
-            display_text = f"{body.name}: "
-            if shape == "Сфера":
-                display_text += f"r={p1}"
-            elif shape == "Параллелепипед":
-                display_text += f"{p1}×{p2}×{p3}"
-            elif shape == "Цилиндр":
-                display_text += f"r={p1}, h={p2}"
-            
-            self.body_list.addItem(display_text)
-            self.result_label.setText(f"Тело добавлено. Всего тел: {self.body_list.count()}")
+            self.body_model.add_body(body)
+            if not self.add_incremental_result(body):
+                self.result_label.setText(f"Тело добавлено. Всего тел: {len(self.body_container.bodies)}")
             
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка добавления тела: {str(e)}")
@@ -521,23 +948,67 @@ class InertiaGUI(QWidget):
             density = float(self.density.text())
             if density <= 0:
                 raise ValueError("Плотность должна быть положительной")
-            
-            self.results = self.body_container.calculate_all_moments(density)
-            total = sum(moment for _, _, moment in self.results)
-            self.result_label.setText(f"Суммарный момент инерции: {total:.6f} кг·м²")
-            
-            self.calculation_history.append({
-                'timestamp': np.datetime64('now'),
-                'results': self.results,
-                'total_inertia': total
-            })
-            
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка расчета: {str(e)}")
+            return
+        self.run_task("Расчет моментов инерции", "Ошибка расчета", calculation_task,
+                      (self.body_container, density),
+                      lambda result: self.on_calculation_finished(result, density))
+
+    def on_calculation_finished(self, result, density):
+        from inertia_history import CalculationHistory, RunningTotals
+        self.results, masses, totals = result
+        self.masses = list(masses)
+        self.calc_density = density
+        moments = [moment for _, _, moment in self.results]
+        self.body_model.set_results(self.masses, moments)
+        
+        if self.calculation_history is None:
+            # INERTIA_HISTORY_DIR: каталог для вытесненных из истории снимков (.npz)
+            self.calculation_history = CalculationHistory(HISTORY_SIZE,
+                                                          spill_dir=os.environ.get("INERTIA_HISTORY_DIR"))
+            self.totals = RunningTotals()
+        # В истории остаются только числа: объекты тел и C++ память не удерживаются
+        self.calculation_history.append(self.masses, moments)
+        self.totals.reset(*totals)
+        self.show_totals()
+
+    def add_incremental_result(self, body):
+        """Досчитывает только новое тело и обновляет итоги; False, если нужен полный расчет"""
+        if (not self.incremental_box.isChecked() or self.totals is None
+                or len(self.results) != len(self.body_container.bodies) - 1):
+            return False
+        density = self.calc_density
+        # Контейнер досчитывает только новое тело и обновляет суммы
+        self.totals.reset(*self.body_container.update(density))
+        mass, moment = self.body_container.body_result(-1, density)
+        self.results.append((body, density, moment))
+        self.masses.append(mass)
+        self.body_model.append_result(mass, moment)
+        self.show_totals(f"Тело добавлено. Всего тел: {self.totals.count}\n")
+        return True
+
+    def show_totals(self, prefix=""):
+        totals = self.totals
+        ixx, iyy, izz = totals.principal
+        self.result_label.setText(
+            f"{prefix}Суммарный момент инерции: {totals.moment:.6f} кг·м²\n"
+            f"Тензор сборки: Ixx={ixx:.6f}, Iyy={iyy:.6f}, Izz={izz:.6f} кг·м²"
+        )
 
     def clear_all(self):
-        self.body_container.clear()
-        self.body_list.clear()
+        # C++ объекты тел освобождаются сразу, а не по мере сборки мусора
+        self.body_container.close()
+        # Общие тела закрыты вместе с контейнером; кэш результатов хранит только числа и остается
+        if self.interner is not None:
+            self.interner.close()
+            self.interner = None
+        self.body_model.clear()
+        self.results = []
+        self.masses = []
+        # История расчетов сохраняется, сбрасываются только текущие итоги
+        if self.totals is not None:
+            self.totals.reset()
         self.result_label.setText("Результат: ")
         self.clear_plot()
 
@@ -548,28 +1019,85 @@ class InertiaGUI(QWidget):
             
         filename, filter = QFileDialog.getSaveFileName(
             self, "Экспорт результатов", "", 
-            "Text files (*.txt);;PDF files (*.pdf)"
+            ";;".join(EXPORT_FILTERS)
         )
         
         if filename:
-            try:
-                if filter == "Text files (*.txt)":
-                    ResultExporter.export_to_txt(self.results, filename)
-                elif filter == "PDF files (*.pdf)":
-                    ResultExporter.export_to_pdf(self.results, filename)
-                
-                QMessageBox.information(self, "Успех", f"Результаты экспортированы в {filename}")
-            except Exception as e:
-                QMessageBox.critical(self, "Ошибка", f"Ошибка экспорта: {str(e)}")
+            if not os.path.splitext(filename)[1]:
+                filename += EXPORT_FILTERS.get(filter, ".txt")
+            self.run_task("Экспорт результатов", "Ошибка экспорта", export_task,
+                          (filename, self.result_columns()),
+                          lambda path: QMessageBox.information(self, "Успех", f"Результаты экспортированы в {path}"))
 
-    def on_body_selected(self, index):
-        if index >= 0 and hasattr(self, 'results') and index < len(self.results):
-            body, density, moment = self.results[index]
-            self.plot_body(body, moment)
+    def result_columns(self):
+        """Копии числовых колонок текущих результатов: фоновый экспорт не зависит от таблицы"""
+        import numpy as np
+        count = len(self.results)
+        store = self.body_model.columns()
+        columns = {name: np.array(store.column(name)[:count]) for name in PARAM_COLUMNS}
+        columns["types"] = np.array(store.types[:count])
+        columns["density"] = np.array([density for _, density, _ in self.results], dtype=np.float64)
+        columns["mass"] = np.array(self.masses[:count], dtype=np.float64)
+        columns["moment"] = np.array([moment for _, _, moment in self.results], dtype=np.float64)
+        return columns
 
+    def load_bodies(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Загрузка тел", "", "Таблицы тел (*.csv *.parquet *.pq)"
+        )
+        if filename:
+            self.run_task("Загрузка тел", "Ошибка загрузки", load_task, (filename, self.body_interner()),
+                          self.on_bodies_loaded)
+
+    def body_interner(self):
+        """Таблица общих тел; вместе с ней контейнер получает кэш результатов, и расчет
+        не повторяется для деталей, уже посчитанных до замены или удаления"""
+        if self.interner is None:
+            from inertia_cache import BodyInterner, MomentCache
+            self.interner = BodyInterner()
+            if self.body_container.cache is None:
+                self.body_container.cache = MomentCache()
+        return self.interner
+
+    def on_bodies_loaded(self, chunks):
+        loaded = 0
+        for chunk, bodies in chunks:
+            # Плотность 0 (пустая ячейка) означает общую плотность расчета
+            densities = [density if density > 0 else None for density in chunk["density"].tolist()]
+            self.body_container.add_bodies(bodies, densities)
+            model_density = [density if density is not None else float("nan") for density in densities]
+            self.body_model.extend(chunk["types"], model_density,
+                                   **{name: chunk[name] for name in PARAM_COLUMNS})
+            loaded += len(bodies)
+        self.result_label.setText(f"Загружено тел: {loaded}. Всего тел: {len(self.body_container.bodies)}, "
+                                  f"различных: {len(self.interner)}")
+
+    def on_body_selected(self, current, previous=None):
+        if not current.isValid():
+            return
+        index = self.body_model.body_index(current.row())
+        body = self.body_container.bodies[index]
+        moment = None
+        if hasattr(self, 'results') and index < len(self.results):
+            moment = self.results[index][2]
+        self.plot_body(body, moment)
+
+    def ensure_body_axes(self):
+        """3D-оси и художники выбранного тела создаются один раз и дальше только обновляются"""
+        self.ensure_body_canvas()
+        if self.body_ax is None:
+            self.body_ax = self.figure.add_subplot(111, projection='3d')
+            self.body_mesh = _matplotlib().Poly3DCollection([], linewidths=1)
+            self.body_ax.add_collection3d(self.body_mesh)
+            self.body_axis_line, = self.body_ax.plot([0, 0], [0, 0], [0, 0], 'r-', linewidth=2,
+                                                     label='Ось вращения')
+            self.body_ax.legend()
+            self.body_ax.set_box_aspect([1, 1, 1])
+        return self.body_ax
+
+    @timed()
     def plot_body(self, body, moment=None):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111, projection='3d')
+        ax = self.ensure_body_axes()
         
         try:
             if hasattr(body, 'get_dimensions'):
@@ -593,109 +1121,92 @@ class InertiaGUI(QWidget):
                     self.plot_cylinder_3d(ax, r, h)
                     title = f"Цилиндр\nРадиус: {r:.2f} м, Высота: {h:.2f} м"
                 else:
+                    self.hide_body_artists()
                     title = "Неизвестное тело"
             else:
+                self.hide_body_artists()
                 title = "Тело (данные недоступны)"
             
             if moment is not None:
                 title += f"\nМомент инерции: {moment:.4f} кг·м²"
                 
             ax.set_title(title)
-            ax.set_box_aspect([1, 1, 1])
             
         except Exception as e:
-            print(f"Ошибка визуализации: {e}")
-            ax.text(0.5, 0.5, 0.5, f"Ошибка визуализации:\n{e}", 
-                    transform=ax.transAxes, ha='center')
+            # Ошибка показывается в заголовке осей вместо тела
+            self.hide_body_artists()
+            ax.set_title(f"Ошибка визуализации:\n{e}")
         
-        self.canvas.draw()
+        self.canvas.draw_idle()
+
+    def show_body_mesh(self, ax, name, scale, color, edgecolor, axis_line):
+        # Меняются только вершины и цвета существующих художников, оси не пересоздаются
+        self.body_mesh.set_verts(scaled_mesh(name, scale))
+        self.body_mesh.set_facecolor(shaded_colors(name, color, 0.7))
+        self.body_mesh.set_edgecolor(edgecolor)
+        self.body_mesh.set_visible(True)
+        self.body_axis_line.set_data_3d(*axis_line)
+        self.body_axis_line.set_visible(True)
+        set_half_limits(ax, name, scale)
 
+    def hide_body_artists(self):
+        if self.body_ax is not None:
+            self.body_mesh.set_visible(False)
+            self.body_axis_line.set_visible(False)
+
+    @timed()
     def plot_sphere_3d(self, ax, r):
-        try:
-            u = np.linspace(0, 2 * np.pi, 30)
-            v = np.linspace(0, np.pi, 30)
-            x = r * np.outer(np.cos(u), np.sin(v))
-            y = r * np.outer(np.sin(u), np.sin(v))
-            z = r * np.outer(np.ones(np.size(u)), np.cos(v))
-            ax.plot_surface(x, y, z, color='lightblue', alpha=0.7)
-            ax.plot([0, 0], [0, 0], [-r, r], 'r-', linewidth=2, label='Ось вращения')
-            ax.legend()
-        except Exception as e:
-            print(f"Ошибка визуализации сферы: {e}")
+        self.show_body_mesh(ax, "Sphere", (r, r, r), 'lightblue', 'none',
+                            ([0, 0], [0, 0], [-r, r]))
 
+    @timed()
     def plot_box_3d(self, ax, a, b, c):
-        try:
-            vertices = np.array([
-                [-a/2, -b/2, -c/2], [a/2, -b/2, -c/2],
-                [a/2, b/2, -c/2], [-a/2, b/2, -c/2],
-                [-a/2, -b/2, c/2], [a/2, -b/2, c/2],
-                [a/2, b/2, c/2], [-a/2, b/2, c/2]
-            ])
-            
-            faces = [
-                [vertices[0], vertices[1], vertices[2], vertices[3]],
-                [vertices[4], vertices[5], vertices[6], vertices[7]],
-                [vertices[0], vertices[1], vertices[5], vertices[4]],
-                [vertices[2], vertices[3], vertices[7], vertices[6]],
-                [vertices[0], vertices[3], vertices[7], vertices[4]],
-                [vertices[1], vertices[2], vertices[6], vertices[5]]
-            ]
-            
-            collection = Poly3DCollection(faces, 
-                                        facecolors='lightgreen', 
-                                        edgecolors='black',
-                                        alpha=0.7,
-                                        linewidths=1)
-            ax.add_collection3d(collection)
-            
-            ax.plot([-a/2, a/2], [0, 0], [0, 0], 'r-', linewidth=2, label='Ось вращения')
-            ax.legend()
-            
-            ax.set_xlim(-a/2, a/2)
-            ax.set_ylim(-b/2, b/2)
-            ax.set_zlim(-c/2, c/2)
-            
-        except Exception as e:
-            print(f"Ошибка визуализации параллелепипеда: {e}")
+        self.show_body_mesh(ax, "Box", (a, b, c), 'lightgreen', 'black',
+                            ([-a/2, a/2], [0, 0], [0, 0]))
 
+    @timed()
     def plot_cylinder_3d(self, ax, r, h):
-        try:
-            z = np.linspace(-h/2, h/2, 30)
-            theta = np.linspace(0, 2*np.pi, 30)
-            theta_grid, z_grid = np.meshgrid(theta, z)
-            x_grid = r * np.cos(theta_grid)
-            y_grid = r * np.sin(theta_grid)
-            
-            ax.plot_surface(x_grid, y_grid, z_grid, color='lightcoral', alpha=0.7)
-            
-            theta_base = np.linspace(0, 2*np.pi, 30)
-            r_base = np.linspace(0, r, 10)
-            R_base, Theta_base = np.meshgrid(r_base, theta_base)
-            
-            X_top = R_base * np.cos(Theta_base)
-            Y_top = R_base * np.sin(Theta_base)
-            Z_top = np.full_like(X_top, h/2)
-            
-            X_bottom = R_base * np.cos(Theta_base)
-            Y_bottom = R_base * np.sin(Theta_base)
-            Z_bottom = np.full_like(X_bottom, -h/2)
-            
-            ax.plot_surface(X_top, Y_top, Z_top, color='lightcoral', alpha=0.5)
-            ax.plot_surface(X_bottom, Y_bottom, Z_bottom, color='lightcoral', alpha=0.5)
-            
-            ax.plot([0, 0], [0, 0], [-h/2, h/2], 'r-', linewidth=2, label='Ось вращения')
-            ax.legend()
-            
-        except Exception as e:
-            print(f"Ошибка визуализации цилиндра: {e}")
+        self.show_body_mesh(ax, "Cylinder", (r, r, h), 'lightcoral', 'none',
+                            ([0, 0], [0, 0], [-h/2, h/2]))
 
     def clear_plot(self):
-        self.figure.clear()
-        self.canvas.draw()
+        if self.body_ax is None:
+            return
+        self.hide_body_artists()
+        self.body_ax.set_title("")
+        self.canvas.draw_idle()
 
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+def report_startup(path=None):
+    """Печатает STARTUP_TIMINGS в JSON (или пишет в файл) для отслеживания регрессий запуска"""
+    report = json.dumps(STARTUP_TIMINGS, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+def main(argv):
+    # --profile-startup[=файл.json]: замер времени импорта и первой отрисовки, затем выход
+    profile = next((arg for arg in argv if arg.startswith("--profile-startup")), None)
+    app = QApplication([arg for arg in argv if arg != profile])
+    _mark_stage("qapplication")
     gui = InertiaGUI()
+    _mark_stage("window_created")
+    if profile:
+        path = profile.partition("=")[2] or None
+
+        def finish():
+            report_startup(path)
+            app.quit()
+
+        first_paint = _FirstPaintFilter(finish)
+        gui.installEventFilter(first_paint)
     gui.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    _mark_stage("window_shown")
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
\ No newline at end of file
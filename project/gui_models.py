@@ -0,0 +1,179 @@
+import math
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# Колонки таблицы тел
+COLUMNS = ("№", "Тело", "Размеры", "Плотность, кг/м³", "Масса, кг", "Момент, кг·м²")
+NUMBER, SHAPE, DIMENSIONS, DENSITY, MASS, MOMENT = range(len(COLUMNS))
+
+
+def _format_dimensions(name, dims):
+    if name == "Sphere":
+        return f"r={dims['radius']:g}"
+    if name == "Box":
+        return f"{dims['a']:g}×{dims['b']:g}×{dims['c']:g}"
+    if name == "Cylinder":
+        return f"r={dims['radius']:g}, h={dims['height']:g}"
+    return ""
+
+
+class BodyTableModel(QAbstractTableModel):
+    """Таблица тел для QTableView поверх колонок ColumnarBodyContainer.
+
+    Строки не хранятся в виде текста: представление запрашивает только видимые ячейки,
+    и они форматируются из чисел колонок. Сортировка - перестановка индексов (argsort),
+    сами колонки не переупорядочиваются. Плотность NaN означает общую плотность расчета.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Колонки и NumPy подключаются при первом добавлении тела, чтобы не замедлять запуск окна
+        self._store = None
+        # Буферы результатов растут удвоением, заполнены первые _results значений
+        self._mass = None
+        self._moment = None
+        self._results = 0
+        self._order = None
+        self._sort = None
+
+    def columns(self):
+        """ColumnarBodyContainer с телами таблицы в порядке добавления"""
+        if self._store is None:
+            from inertia_columns import ColumnarBodyContainer
+            self._store = ColumnarBodyContainer()
+        return self._store
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._store is None:
+            return 0
+        return len(self._store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def body_index(self, row):
+        """Номер тела в контейнере для строки представления"""
+        return int(self._order[row]) if self._order is not None else row
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() in (NUMBER, DENSITY, MASS, MOMENT):
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        i = self.body_index(index.row())
+        column = index.column()
+        store = self._store
+        if column == NUMBER:
+            return str(i + 1)
+        if column == SHAPE:
+            return store.name(i)
+        if column == DIMENSIONS:
+            return _format_dimensions(store.name(i), store.get_dimensions(i))
+        if column == DENSITY:
+            density = float(store.density[i])
+            return "общая" if math.isnan(density) else f"{density:g}"
+        values = self._mass if column == MASS else self._moment
+        # Тела, добавленные после расчета, остаются без результата до следующего расчета
+        if i >= self._results:
+            return ""
+        return f"{values[i]:.6g}"
+
+    def add_body(self, body, density=None):
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.columns().add_body(body, math.nan if density is None else density)
+        self._append_order(row, row + 1)
+        self.endInsertRows()
+
+    def extend(self, types, density, **params):
+        """Добавляет пачку тел из колонок (см. ColumnarBodyContainer.extend)"""
+        count = len(types)
+        if not count:
+            return
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row + count - 1)
+        self.columns().extend(types, density, **params)
+        self._append_order(row, row + count)
+        self.endInsertRows()
+
+    def _append_order(self, start, stop):
+        # Новые тела при активной сортировке попадают в конец до следующей сортировки
+        if self._order is not None:
+            import numpy as np
+            self._order = np.concatenate([self._order, np.arange(start, stop)])
+
+    def set_results(self, masses, moments):
+        import numpy as np
+        self._mass = np.array(masses, dtype=np.float64)
+        self._moment = np.array(moments, dtype=np.float64)
+        self._results = len(self._mass)
+        if self._sort is not None and self._sort[0] in (MASS, MOMENT):
+            self.sort(*self._sort)
+        elif self.rowCount():
+            self.dataChanged.emit(self.index(0, MASS), self.index(self.rowCount() - 1, MOMENT))
+
+    def append_result(self, mass, moment):
+        """Результат следующего по порядку тела (инкрементальный расчет без полного пересчета)"""
+        import numpy as np
+        i = self._results
+        if self._mass is None or i >= len(self._mass):
+            capacity = max(2 * i, 1024)
+            self._mass = np.resize(self._mass if self._mass is not None else np.zeros(0), capacity)
+            self._moment = np.resize(self._moment if self._moment is not None else np.zeros(0), capacity)
+        self._mass[i] = mass
+        self._moment[i] = moment
+        self._results = i + 1
+        # Строка тела при сортировке неизвестна без поиска; представление перерисует только видимые ячейки
+        self.dataChanged.emit(self.index(0, MASS), self.index(self.rowCount() - 1, MOMENT))
+
+    def clear(self):
+        self.beginResetModel()
+        if self._store is not None:
+            self._store.clear()
+        self._mass = self._moment = self._order = None
+        self._results = 0
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort = (column, order)
+        if self._store is None or not len(self._store):
+            return
+        import numpy as np
+        store = self._store
+        if column == NUMBER:
+            key = None
+        elif column == SHAPE:
+            key = store.types
+        elif column == DENSITY:
+            key = store.density
+        elif column in (MASS, MOMENT):
+            if self._results != len(store):
+                return
+            key = (self._mass if column == MASS else self._moment)[:self._results]
+        else:
+            return
+        self.layoutAboutToBeChanged.emit()
+        # Выделение и текущая строка представления остаются на тех же телах
+        persistent = self.persistentIndexList()
+        bodies = [self.body_index(index.row()) for index in persistent]
+        if key is None:
+            permutation = None if order == Qt.SortOrder.AscendingOrder else np.arange(len(store))[::-1]
+        else:
+            permutation = np.argsort(key, kind="stable")
+            if order == Qt.SortOrder.DescendingOrder:
+                permutation = permutation[::-1]
+        self._order = permutation
+        if persistent:
+            rows = np.arange(len(store))
+            if permutation is not None:
+                rows[permutation] = np.arange(len(store))
+            self.changePersistentIndexList(
+                persistent, [self.index(int(rows[i]), index.column()) for i, index in zip(bodies, persistent)])
+        self.layoutChanged.emit()
@@ -0,0 +1,57 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class TaskCancelled(Exception):
+    """Задача остановлена пользователем"""
+
+
+class WorkerSignals(QObject):
+    # Сигналы создаются в потоке GUI, поэтому слоты вызываются в нем же (очередь событий Qt)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """Выполняет fn(worker, *args) в пуле потоков и сообщает результат сигналами.
+
+    fn вызывает worker.report(done, total) между блоками работы: так передается прогресс,
+    а после cancel() тот же вызов прерывает задачу исключением TaskCancelled.
+    fn не должна трогать виджеты - они доступны только из потока GUI. Сигналы подключаются
+    до передачи объекта в QThreadPool.start().
+    """
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        # Объект остается у вызывающего кода до получения сигнала о завершении
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled
+
+    def report(self, done, total):
+        if self._cancelled:
+            raise TaskCancelled()
+        self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            result = self.fn(self, *self.args)
+            if self._cancelled:
+                raise TaskCancelled()
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
@@ -0,0 +1,388 @@
+"""Бенчмарк движков расчета моментов инерции.
+
+Для синтетических наборов тел смешанных типов (по умолчанию от 10 до 10 млн) отдельно замеряет
+создание тел, расчет, get_dimensions, экспорт и построение графиков для каждого доступного движка:
+
+    ctypes  - объекты Sphere/Box/Cylinder и вызов Body.calculate_moment для каждого тела
+    batch   - тела из BodyPool и расчет BodyContainer одним вызовом DLL
+    core, native, numpy - колоночные движки inertia_engine над ColumnarBodyContainer
+
+Результаты пишутся в JSON. С --compare результаты сравниваются с сохраненной базой, и при падении
+пропускной способности больше порога (--threshold) программа завершается с кодом 1. Примеры:
+
+    python inertia_bench.py --sizes 10,1000,100000 -o baseline.json
+    python inertia_bench.py --sizes 10,1000,100000 --compare baseline.json
+    python inertia_bench.py --input current.json --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import inertia_wrapper
+from inertia_wrapper import SPHERE, BOX, CYLINDER, PARAM_COLUMNS
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+ENGINES = ("ctypes", "batch", "core", "native", "numpy")
+STAGES = ("create", "evaluate", "get_dimensions", "export", "plot")
+# Этапы с объектами Python на каждое тело, поэлементным экспортом и графиками выше этого
+# числа тел пропускаются: 10 млн объектов тел не помещаются в память обычной машины
+DEFAULT_SLOW_LIMIT = 1000000
+# Короткий этап повторяется, пока суммарное время не превысит MIN_TIME; долгий (дольше
+# LONG_TIME) выполняется один раз
+MIN_TIME = 0.1
+LONG_TIME = 1.0
+DEFAULT_THRESHOLD = 0.2
+DENSITIES = (1000.0, 2700.0, 7800.0, 8960.0)
+
+
+def make_columns(n, seed=0):
+    """Синтетические тела: равные доли сфер, параллелепипедов и цилиндров, размеры 0.1-2 м"""
+    rng = np.random.default_rng(seed)
+    types = rng.integers(0, 3, n).astype(np.intc)
+    columns = {name: rng.uniform(0.1, 2.0, n) for name in PARAM_COLUMNS}
+    density = rng.choice(DENSITIES, n)
+    return types, columns, density
+
+
+def _measure(fn, repeat):
+    """Лучшее время одного вызова fn за repeat серий и число вызовов в серии"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME or loops >= 10 ** 6:
+            break
+        loops *= 10
+    best = elapsed / loops
+    if elapsed < LONG_TIME:
+        for _ in range(repeat - 1):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            best = min(best, (time.perf_counter() - start) / loops)
+    return best, loops
+
+
+class _Plotter:
+    # Графики строятся методами окна InertiaGUI вне экрана: замеряется тот же код, что в GUI
+    def __init__(self):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtWidgets import QApplication
+        import gui
+        self.gui = gui
+        self.app = QApplication.instance() or QApplication([])
+        self.window = gui.InertiaGUI()
+        self.window.ensure_calc_canvas()
+
+    def draw(self, data):
+        self.window.draw_calculation_visualization(data)
+
+    def from_results(self, results, masses):
+        worker = SimpleNamespace(report=lambda done, total: None)
+        return self.gui.visualization_task(worker, results, masses)
+
+    def from_columns(self, store, mass, moment):
+        # Те же данные, что собирает visualization_task, но прямо из колонок
+        count = len(store)
+        labelled = range(count) if count <= self.gui.AGGREGATE_THRESHOLD else [0]
+        return SimpleNamespace(codes=store.types, moments=moment, masses=mass,
+                               dims={i: store.get_dimensions(i) for i in labelled},
+                               first_density=float(store.density[0]))
+
+
+class _ObjectCase:
+    """Этапы для тел-объектов: ctypes (поштучно) и batch (пул и пакетный вызов DLL)"""
+
+    def __init__(self, engine, types, columns, density):
+        self.engine = engine
+        self.types = types
+        self.columns = columns
+        self.density = density
+        self.container = None
+        self.results = None
+        self.masses = None
+
+    def _create_each(self):
+        r, a, b, c, h = (self.columns[name].tolist() for name in PARAM_COLUMNS)
+        bodies = []
+        for i, code in enumerate(self.types.tolist()):
+            if code == SPHERE:
+                bodies.append(inertia_wrapper.Sphere(r[i]))
+            elif code == BOX:
+                bodies.append(inertia_wrapper.Box(a[i], b[i], c[i]))
+            else:
+                bodies.append(inertia_wrapper.Cylinder(r[i], h[i]))
+        return bodies
+
+    def create(self):
+        # При повторах замера время включает освобождение предыдущего набора тел
+        if self.container is not None:
+            self.container.close()
+        container = inertia_wrapper.BodyContainer()
+        if self.engine == "ctypes":
+            container.add_bodies(self._create_each(), self.density.tolist())
+        else:
+            container.extend(self.types, self.density.tolist(), **self.columns)
+        self.container = container
+
+    def evaluate(self):
+        container = self.container
+        if self.engine == "ctypes":
+            self.results = [(body, density, body.calculate_moment(density))
+                            for body, density in zip(container.bodies, container.densities)]
+            self.masses = [body.calculate_mass(density)
+                           for body, density in zip(container.bodies, container.densities)]
+        else:
+            self.results = container.calculate_all_moments()
+            self.masses = container.calculate_all_masses()
+
+    def get_dimensions(self):
+        if self.engine == "ctypes":
+            for body in self.container.bodies:
+                body.get_dimensions()
+        else:
+            # Пакетный движок читает записи всех тел одним вызовом DLL
+            self.container.body_records()
+
+    def export(self, path):
+        inertia_wrapper.ResultExporter.export_to_txt(self.results, path + ".txt")
+
+    def plot(self, plotter):
+        plotter.draw(plotter.from_results(self.results, self.masses))
+
+    def close(self):
+        if self.container is not None:
+            self.container.close()
+
+
+class _ColumnCase:
+    """Этапы для колоночных движков inertia_engine над ColumnarBodyContainer"""
+
+    def __init__(self, engine, types, columns, density):
+        from inertia_engine import get_engine
+        self.engine = get_engine(engine)
+        self.types = types
+        self.columns = columns
+        self.density = density
+        self.store = None
+        self.mass = None
+        self.moment = None
+
+    def create(self):
+        from inertia_columns import ColumnarBodyContainer
+        store = ColumnarBodyContainer(capacity=len(self.types))
+        store.extend(self.types, self.density, **self.columns)
+        self.store = store
+
+    def evaluate(self):
+        store = self.store
+        self.mass, self.moment = self.engine.evaluate(
+            store.types, *(store.column(name) for name in PARAM_COLUMNS), store.density)
+
+    def get_dimensions(self):
+        store = self.store
+        for i in range(len(store)):
+            store.get_dimensions(i)
+
+    def export(self, path):
+        from inertia_export import export_results
+        store = self.store
+        export_results(path + ".csv", store.types, store.density, self.mass, self.moment,
+                       **{name: store.column(name) for name in PARAM_COLUMNS})
+
+    def plot(self, plotter):
+        plotter.draw(plotter.from_columns(self.store, self.mass, self.moment))
+
+    def close(self):
+        self.store = None
+
+
+def available_engines():
+    """Движки бенчмарка, доступные в текущем окружении"""
+    from inertia_engine import available_engines as columnar
+    engines = ["ctypes", "batch"] if inertia_wrapper.lib else []
+    return engines + [name for name in ENGINES if name in columnar()]
+
+
+def _skip_reason(engine, stage, size, slow_limit, plotter_error):
+    slow = engine in ("ctypes", "batch") or stage in ("get_dimensions", "export", "plot")
+    if slow and size > slow_limit:
+        return f"больше {slow_limit} тел"
+    if stage == "plot" and plotter_error:
+        return plotter_error
+    return None
+
+
+def run(sizes=DEFAULT_SIZES, engines=None, stages=STAGES, repeat=3, slow_limit=DEFAULT_SLOW_LIMIT,
+        seed=0, log=None):
+    """Выполняет замеры и возвращает словарь {"meta": ..., "results": [...]}.
+
+    Запись результата: engine, size, stage, seconds (лучшее время этапа), per_body_us,
+    throughput (тел в секунду) и loops; для пропущенного этапа вместо времени - skipped.
+    Этапы одного движка идут по порядку STAGES и используют результаты предыдущих.
+    """
+    available = available_engines()
+    engines = available if engines is None else [name for name in engines if name in available]
+    plotter = None
+    plotter_error = None
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            types, columns, density = make_columns(size, seed)
+            for engine in engines:
+                case_type = _ObjectCase if engine in ("ctypes", "batch") else _ColumnCase
+                case = case_type(engine, types, columns, density)
+                ready = True
+                for stage in STAGES:
+                    if stage not in stages and stage not in ("create", "evaluate"):
+                        continue
+                    record = {"engine": engine, "size": size, "stage": stage}
+                    # Окно для графиков создается один раз, при первом нужном замере
+                    if stage == "plot" and stage in stages and plotter is None and plotter_error is None:
+                        try:
+                            plotter = _Plotter()
+                        except ImportError as e:
+                            plotter_error = f"нет модуля для графиков: {e.name}"
+                    reason = _skip_reason(engine, stage, size, slow_limit, plotter_error) or \
+                        (None if ready else "нет данных предыдущих этапов")
+                    if reason:
+                        if stage in ("create", "evaluate"):
+                            ready = False
+                        if stage in stages:
+                            record["skipped"] = reason
+                            results.append(record)
+                        continue
+                    if stage == "export":
+                        fn = lambda: case.export(os.path.join(tmp, "export"))
+                    elif stage == "plot":
+                        fn = lambda: case.plot(plotter)
+                    else:
+                        fn = getattr(case, stage)
+                    seconds, loops = _measure(fn, repeat)
+                    if stage not in stages:
+                        continue
+                    record.update(seconds=seconds, per_body_us=seconds / size * 1e6,
+                                  throughput=size / seconds if seconds > 0 else float("inf"), loops=loops)
+                    results.append(record)
+                    if log:
+                        log(record)
+                case.close()
+    return {"meta": environment(), "results": results}
+
+
+def environment():
+    from inertia_engine import get_num_threads
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "dll": inertia_wrapper.DLL_PATH,
+        "threads": get_num_threads(),
+    }
+
+
+def _key(record):
+    return record["engine"], record["size"], record["stage"]
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Сравнивает результаты с базой: список (запись, отношение пропускной способности).
+
+    В список попадают только регрессии - замеры, у которых throughput упал больше чем на
+    threshold (доля) относительно базы. Замеры, которых нет в одном из файлов, пропускаются.
+    """
+    base = {_key(record): record for record in baseline["results"] if "throughput" in record}
+    regressions = []
+    for record in current["results"]:
+        old = base.get(_key(record))
+        if old is None or "throughput" not in record:
+            continue
+        ratio = record["throughput"] / old["throughput"]
+        if ratio < 1.0 - threshold:
+            regressions.append((record, ratio))
+    return regressions
+
+
+def _print_record(record):
+    print(f"{record['engine']:>7} {record['size']:>9} {record['stage']:<15} "
+          f"{record['seconds']:10.6f} с {record['per_body_us']:10.3f} мкс/тело", file=sys.stderr)
+
+
+def _parse_list(text, allowed=None):
+    items = [item.strip() for item in text.split(",") if item.strip()]
+    if allowed is not None:
+        unknown = [item for item in items if item not in allowed]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"неизвестные значения: {', '.join(unknown)}")
+    return items
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Бенчмарк движков расчета моментов инерции")
+    parser.add_argument("--sizes", type=lambda text: [int(float(x)) for x in _parse_list(text)],
+                        default=list(DEFAULT_SIZES), help="число тел в наборах через запятую")
+    parser.add_argument("--engines", type=lambda text: _parse_list(text, ENGINES),
+                        help="движки через запятую: " + ", ".join(ENGINES) + " (по умолчанию все доступные)")
+    parser.add_argument("--stages", type=lambda text: _parse_list(text, STAGES), default=list(STAGES),
+                        help="этапы через запятую: " + ", ".join(STAGES))
+    parser.add_argument("--repeat", type=int, default=3, help="число серий замера, берется лучшая")
+    parser.add_argument("--slow-limit", type=int, default=DEFAULT_SLOW_LIMIT,
+                        help="наибольший набор для поэлементных этапов (объекты тел, экспорт, графики)")
+    parser.add_argument("--threads", type=int, help="число потоков нативного ядра, 0 - по числу ядер")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора синтетических тел")
+    parser.add_argument("-o", "--output", default="-", help="файл JSON с результатами, по умолчанию stdout")
+    parser.add_argument("--input", help="не запускать замеры, а взять результаты из файла JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="файл JSON с базовыми результатами")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимое падение пропускной способности (доля), по умолчанию 0.2")
+    parser.add_argument("-q", "--quiet", action="store_true", help="не печатать замеры в stderr")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.input:
+            with open(args.input, encoding="utf-8") as f:
+                report = json.load(f)
+        else:
+            if args.threads is not None:
+                from inertia_engine import set_num_threads
+                set_num_threads(args.threads)
+            report = run(args.sizes, args.engines, args.stages, args.repeat, args.slow_limit, args.seed,
+                         log=None if args.quiet else _print_record)
+            text = json.dumps(report, ensure_ascii=False, indent=1)
+            if args.output == "-":
+                print(text)
+            else:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    f.write(text + "\n")
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressions = compare(report, baseline, args.threshold)
+            for record, ratio in regressions:
+                print(f"Регрессия: {record['engine']} {record['size']} {record['stage']}: "
+                      f"{ratio:.0%} от базы", file=sys.stderr)
+            if regressions:
+                return 1
+            print("Регрессий нет", file=sys.stderr)
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+from collections import OrderedDict
+
+import numpy as np
+
+import inertia_profile
+from inertia_wrapper import SPHERE, BOX, CYLINDER, SHAPE_CODES, PARAM_COLUMNS, BodyPool, BodyContainer
+
+# Параметры, входящие в ключ тела каждого типа (в порядке Body.get_dimensions)
+KEY_PARAMS = {
+    SPHERE: ("r",),
+    BOX: ("a", "b", "c"),
+    CYLINDER: ("r", "h"),
+}
+
+DEFAULT_CACHE_SIZE = 100000
+
+
+def shape_key(shape, r=0.0, a=0.0, b=0.0, c=0.0, h=0.0):
+    """Ключ тела (код типа, размеры...) - тот же, что возвращает Body.cache_key()"""
+    code = SHAPE_CODES[shape] if isinstance(shape, str) else int(shape)
+    if code not in KEY_PARAMS:
+        raise ValueError(f"Неизвестный тип тела: {shape}")
+    values = {"r": r, "a": a, "b": b, "c": c, "h": h}
+    return (code,) + tuple(float(values[name]) for name in KEY_PARAMS[code])
+
+
+class BodyInterner:
+    """Общие объекты тел для одинаковых (тип, размеры): сколько бы раз ни повторялась деталь
+    каталога, для нее создается один C++ объект.
+
+    Новые тела создаются в пуле интернера (BodyPool). max_size ограничивает число тел в таблице;
+    при превышении вытесняется давно не запрашивавшееся тело: оно остается рабочим у тех, кто
+    на него ссылается, но следующий запрос создаст новое. Память пула освобождается после
+    clear(), когда на его тела не остается ссылок, или сразу в close() вместе с телами.
+    """
+
+    def __init__(self, max_size=None):
+        if max_size is not None and max_size < 1:
+            raise ValueError("Размер таблицы должен быть положительным")
+        self.max_size = max_size
+        self._bodies = OrderedDict()
+        self._pool = BodyPool()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._bodies)
+
+    def __contains__(self, key):
+        return key in self._bodies
+
+    def get(self, shape, r=0.0, a=0.0, b=0.0, c=0.0, h=0.0):
+        """Общее тело с заданными размерами (SPHERE: r; BOX: a, b, c; CYLINDER: r, h)"""
+        key = shape_key(shape, r, a, b, c, h)
+        body = self._bodies.get(key)
+        if body is not None:
+            self.hits += 1
+            self._bodies.move_to_end(key)
+            return body
+        self.misses += 1
+        body = self._pool.create_bodies([key[0]], r=[r], a=[a], b=[b], c=[c], h=[h])[0]
+        self._store(key, body)
+        return body
+
+    def intern(self, body):
+        """Общее тело с размерами body; если такого еще нет, им становится сам body"""
+        key = body.cache_key()
+        shared = self._bodies.get(key)
+        if shared is not None:
+            self.hits += 1
+            self._bodies.move_to_end(key)
+            return shared
+        self.misses += 1
+        self._store(key, body)
+        return body
+
+    def intern_columns(self, types, **params):
+        """Тела по колонкам (как BodyPool.create_bodies), одинаковые строки получают общий объект.
+
+        Уникальные строки находятся одной сортировкой NumPy, новые тела создаются одним вызовом DLL.
+        """
+        unknown = set(params) - set(PARAM_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+        types = np.asarray(types, dtype=np.intc).ravel()
+        count = types.shape[0]
+        if not count:
+            return []
+        # Колонки, не используемые типом тела, обнуляются, чтобы не влиять на ключ
+        rows = np.zeros((count, len(PARAM_COLUMNS) + 1))
+        rows[:, 0] = types
+        for column, name in enumerate(PARAM_COLUMNS, 1):
+            used = np.isin(types, [code for code, names in KEY_PARAMS.items() if name in names])
+            rows[:, column] = np.where(used, np.broadcast_to(np.asarray(params.get(name, 0.0), dtype=np.float64),
+                                                             (count,)), 0.0)
+        # Строки сравниваются как байтовые записи: так np.unique в разы быстрее, чем с axis=0
+        records = rows.view(np.dtype((np.void, rows.itemsize * rows.shape[1]))).ravel()
+        unique, inverse = np.unique(records, return_inverse=True)
+        unique = unique.view(np.float64).reshape(-1, rows.shape[1])
+        columns = dict(zip(PARAM_COLUMNS, unique[:, 1:].T))
+        keys = [shape_key(int(row[0]), *row[1:]) for row in unique.tolist()]
+
+        shared = [self._bodies.get(key) for key in keys]
+        missing = [i for i, body in enumerate(shared) if body is None]
+        if missing:
+            created = self._pool.create_bodies(unique[missing, 0].astype(np.intc),
+                                               **{name: column[missing] for name, column in columns.items()})
+            for i, body in zip(missing, created):
+                shared[i] = body
+        for key, body in zip(keys, shared):
+            self._store(key, body)
+        self.misses += len(missing)
+        self.hits += count - len(missing)
+        return [shared[i] for i in inverse.ravel().tolist()]
+
+    def _store(self, key, body):
+        body._key = key
+        self._bodies[key] = body
+        self._bodies.move_to_end(key)
+        while self.max_size is not None and len(self._bodies) > self.max_size:
+            self._bodies.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key):
+        """Убирает тело из таблицы по ключу или по самому телу"""
+        if not isinstance(key, tuple):
+            key = key.cache_key()
+        self._bodies.pop(key, None)
+
+    def clear(self):
+        """Очищает таблицу; тела остаются у тех, кто на них ссылается"""
+        self._bodies.clear()
+        self._pool = BodyPool()
+
+    def close(self):
+        """Закрывает тела пула интернера и освобождает его память; таблица очищается"""
+        self._bodies.clear()
+        self._pool.close()
+        self._pool = BodyPool()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._bodies), "max_size": self.max_size}
+
+
+class MomentCache:
+    """LRU-кэш (масса, момент инерции) по ключу (тип, размеры, плотность).
+
+    evaluate() считает каждую уникальную пару (тело, плотность) не больше одного раза:
+    найденные в кэше значения берутся из него, недостающие считаются одним пакетным вызовом.
+    unit_results() так же хранит результаты на единицу плотности для BodyContainer.update()
+    (ключ с None вместо плотности). Подключается к BodyContainer(cache=...).
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        if max_size < 1:
+            raise ValueError("Размер кэша должен быть положительным")
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def evaluate(self, bodies, densities):
+        """Массы и моменты инерции тел (списки) с плотностями densities"""
+        # Общие (интернированные) тела повторяются как объекты, поэтому ключ и поиск в кэше
+        # нужны только для уникальных пар (объект тела, плотность)
+        pairs = list(zip(bodies, densities))
+        unique = dict.fromkeys(pairs)
+        values = {}
+        representatives = {}
+        for pair in unique:
+            body, density = pair
+            # Закрытое тело - ошибка, даже если его значение осталось в кэше
+            body._check_open()
+            key = body.cache_key() + (density,)
+            unique[pair] = key
+            if key in values or key in representatives:
+                continue
+            value = self._entries.get(key)
+            if value is None:
+                representatives[key] = body
+            else:
+                self._entries.move_to_end(key)
+                values[key] = value
+        if representatives:
+            # Недостающие значения считаются по одному телу на ключ без участия кэша
+            batch = BodyContainer()
+            batch.add_bodies(representatives.values(), [key[-1] for key in representatives])
+            masses = batch.calculate_all_masses()
+            moments = [moment for _, _, moment in batch.calculate_all_moments()]
+            for key, mass, moment in zip(representatives, masses, moments):
+                values[key] = (mass, moment)
+                self._store(key, (mass, moment))
+        for pair, key in unique.items():
+            unique[pair] = values[key]
+        misses = len(representatives)
+        self.misses += misses
+        self.hits += len(pairs) - misses
+        inertia_profile.count("MomentCache.hits", len(pairs) - misses)
+        inertia_profile.count("MomentCache.misses", misses)
+        results = [unique[pair] for pair in pairs]
+        return [mass for mass, _ in results], [moment for _, moment in results]
+
+    def unit_results(self, bodies, compute):
+        """Массы, моменты и главные моменты (плоским списком) тел при единичной плотности.
+
+        Недостающие значения считает compute(bodies) - функция с тем же результатом - одним
+        вызовом по одному телу на ключ.
+        """
+        unique = dict.fromkeys(bodies)
+        values = {}
+        representatives = {}
+        for body in unique:
+            body._check_open()
+            key = body.cache_key() + (None,)
+            unique[body] = key
+            if key in values or key in representatives:
+                continue
+            value = self._entries.get(key)
+            if value is None:
+                representatives[key] = body
+            else:
+                self._entries.move_to_end(key)
+                values[key] = value
+        if representatives:
+            mass, moment, principal = compute(list(representatives.values()))
+            for k, key in enumerate(representatives):
+                values[key] = (mass[k], moment[k], tuple(principal[3 * k:3 * k + 3]))
+                self._store(key, values[key])
+        misses = len(representatives)
+        self.misses += misses
+        self.hits += len(bodies) - misses
+        inertia_profile.count("MomentCache.hits", len(bodies) - misses)
+        inertia_profile.count("MomentCache.misses", misses)
+        results = [values[unique[body]] for body in bodies]
+        return ([mass for mass, _, _ in results], [moment for _, moment, _ in results],
+                [x for _, _, principal in results for x in principal])
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, shape=None, density=None):
+        """Удаляет значения для типа тела (код или имя) и/или плотности; без аргументов - все"""
+        if shape is None and density is None:
+            self._entries.clear()
+            return
+        code = SHAPE_CODES[shape] if isinstance(shape, str) else shape
+        stale = [key for key in self._entries
+                 if (code is None or key[0] == code) and (density is None or key[-1] == density)]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._entries), "max_size": self.max_size}
@@ -1,21 +1,114 @@
 #include "inertia_calculator.h"
 
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstddef>
+#include <new>
+#include <system_error>
+#include <thread>
+
+// Формулы вынесены в отдельные функции, чтобы классы и колоночный расчет давали одинаковые числа
+static inline double sphereMass(double r, double density) {
+    return (4.0 / 3.0) * M_PI * r * r * r * density;
+}
+
+static inline double sphereMoment(double mass, double r) {
+    return 0.4 * mass * r * r;
+}
+
+static inline double boxMass(double a, double b, double c, double density) {
+    return a * b * c * density;
+}
+
+static inline double boxMoment(double mass, double b, double c) {
+    return (1.0 / 12.0) * mass * (b * b + c * c);
+}
+
+static inline double cylinderMass(double r, double h, double density) {
+    return M_PI * r * r * h * density;
+}
+
+static inline double cylinderMoment(double mass, double r) {
+    return 0.5 * mass * r * r;
+}
+
+static inline void spherePrincipal(double mass, double r, double out[3]) {
+    out[0] = out[1] = out[2] = sphereMoment(mass, r);
+}
+
+static inline void boxPrincipal(double mass, double a, double b, double c, double out[3]) {
+    out[0] = boxMoment(mass, b, c);
+    out[1] = boxMoment(mass, a, c);
+    out[2] = boxMoment(mass, a, b);
+}
+
+static inline void cylinderPrincipal(double mass, double r, double h, double out[3]) {
+    out[0] = out[1] = (1.0 / 12.0) * mass * (3.0 * r * r + h * h);
+    out[2] = cylinderMoment(mass, r);
+}
+
+// Настройка многопоточных расчетов: 0 - по числу ядер
+static std::atomic<int> g_num_threads{0};
+
+// Блок меньше этого размера не окупает запуск потока
+static const size_t PARALLEL_MIN_CHUNK = 16384;
+
+static size_t resolveThreads(size_t n) {
+    int requested = g_num_threads.load();
+    size_t threads = requested > 0 ? size_t(requested) : size_t(std::max(1u, std::thread::hardware_concurrency()));
+    return std::max<size_t>(1, std::min(threads, (n + PARALLEL_MIN_CHUNK - 1) / PARALLEL_MIN_CHUNK));
+}
+
+// Делит [0, n) на непрерывные блоки и считает их в отдельных потоках.
+// fn(begin, end) возвращает число ошибок в блоке; блоки не пересекаются, поэтому синхронизация не нужна
+template <class Fn>
+static size_t parallelChunks(size_t n, Fn fn) {
+    size_t threads = resolveThreads(n);
+    if (threads <= 1) return fn(0, n);
+    size_t chunk = (n + threads - 1) / threads;
+    std::vector<size_t> errors(threads, 0);
+    std::vector<std::thread> workers;
+    workers.reserve(threads - 1);
+    for (size_t t = 1; t < threads; ++t) {
+        size_t begin = std::min(n, t * chunk), end = std::min(n, begin + chunk);
+        try {
+            workers.emplace_back([&errors, &fn, t, begin, end] { errors[t] = fn(begin, end); });
+        } catch (const std::system_error&) {
+            // Поток не создан - блок считается в вызывающем потоке
+            errors[t] = fn(begin, end);
+        }
+    }
+    errors[0] = fn(0, std::min(n, chunk));
+    for (auto& worker : workers) worker.join();
+    size_t total = 0;
+    for (size_t e : errors) total += e;
+    return total;
+}
+
 // Реализация Sphere
 Sphere::Sphere(double r) : radius(r) {
     if (r <= 0) throw std::invalid_argument("Radius must be positive");
 }
 
 double Sphere::calculateMomentOfInertia(double density) const {
-    double mass = calculateMass(density);
-    return 0.4 * mass * radius * radius;
+    return sphereMoment(calculateMass(density), radius);
 }
 
 double Sphere::calculateMass(double density) const {
-    return (4.0 / 3.0) * M_PI * pow(radius, 3) * density;
+    return sphereMass(radius, density);
+}
+
+void Sphere::calculatePrincipalMoments(double density, double out[3]) const {
+    spherePrincipal(calculateMass(density), radius, out);
 }
 
 const char* Sphere::getName() const { return "Sphere"; }
+BodyType Sphere::getType() const { return BODY_SPHERE; }
 double Sphere::getRadius() const { return radius; }
+void Sphere::getParameters(double out[BODY_PARAM_COUNT]) const {
+    out[0] = radius; out[1] = out[2] = out[3] = out[4] = 0.0;
+}
 
 // Реализация Box
 Box::Box(double a, double b, double c) : a(a), b(b), c(c) {
@@ -24,15 +117,22 @@ Box::Box(double a, double b, double c) : a(a), b(b), c(c) {
 }
 
 double Box::calculateMomentOfInertia(double density) const {
-    double mass = calculateMass(density);
-    return (1.0 / 12.0) * mass * (b * b + c * c);
+    return boxMoment(calculateMass(density), b, c);
 }
 
 double Box::calculateMass(double density) const {
-    return a * b * c * density;
+    return boxMass(a, b, c, density);
+}
+
+void Box::calculatePrincipalMoments(double density, double out[3]) const {
+    boxPrincipal(calculateMass(density), a, b, c, out);
 }
 
 const char* Box::getName() const { return "Box"; }
+BodyType Box::getType() const { return BODY_BOX; }
+void Box::getParameters(double out[BODY_PARAM_COUNT]) const {
+    out[0] = 0.0; out[1] = a; out[2] = b; out[3] = c; out[4] = 0.0;
+}
 void Box::getDimensions(double& a, double& b, double& c) const {
     a = this->a; b = this->b; c = this->c;
 }
@@ -44,22 +144,290 @@ Cylinder::Cylinder(double r, double h) : radius(r), height(h) {
 }
 
 double Cylinder::calculateMomentOfInertia(double density) const {
-    double mass = calculateMass(density);
-    return 0.5 * mass * radius * radius;
+    return cylinderMoment(calculateMass(density), radius);
 }
 
 double Cylinder::calculateMass(double density) const {
-    return M_PI * radius * radius * height * density;
+    return cylinderMass(radius, height, density);
+}
+
+void Cylinder::calculatePrincipalMoments(double density, double out[3]) const {
+    cylinderPrincipal(calculateMass(density), radius, height, out);
 }
 
 const char* Cylinder::getName() const { return "Cylinder"; }
+BodyType Cylinder::getType() const { return BODY_CYLINDER; }
+void Cylinder::getParameters(double out[BODY_PARAM_COUNT]) const {
+    out[0] = radius; out[1] = out[2] = out[3] = 0.0; out[4] = height;
+}
 void Cylinder::getDimensions(double& r, double& h) const {
     r = radius; h = height;
 }
 
+// Арена тел: каждая пачка create_bodies_batch размещается в одном блоке памяти (placement new).
+// Тела пула живут до уничтожения пула; удалять их по одному через delete_body нельзя.
+namespace {
+
+class BodyPool {
+public:
+    ~BodyPool() {
+        for (Body* body : bodies) body->~Body();
+    }
+
+    size_t createBatch(size_t n, const int* types, const double* r, const double* a, const double* b,
+                       const double* c, const double* h, void** out) {
+        // Сначала проверка всей пачки: при ошибке память не выделяется и тела не создаются
+        size_t errors = 0;
+        size_t slots = 0;
+        for (size_t i = 0; i < n; ++i) {
+            size_t size = validSize(types[i], r[i], a[i], b[i], c[i], h[i]);
+            if (!size) ++errors;
+            slots += size;
+        }
+        if (errors) {
+            std::fill(out, out + n, nullptr);
+            return errors;
+        }
+        if (!n) return 0;
+
+        std::unique_ptr<Slot[]> block(new Slot[slots]);
+        bodies.reserve(bodies.size() + n);
+        Slot* next = block.get();
+        for (size_t i = 0; i < n; ++i) {
+            Body* body;
+            switch (types[i]) {
+            case BODY_SPHERE: body = new (next) Sphere(r[i]); break;
+            case BODY_BOX: body = new (next) Box(a[i], b[i], c[i]); break;
+            default: body = new (next) Cylinder(r[i], h[i]); break;
+            }
+            next += validSize(types[i], r[i], a[i], b[i], c[i], h[i]);
+            bodies.push_back(body);
+            out[i] = body;
+        }
+        blocks.push_back(std::move(block));
+        return 0;
+    }
+
+    size_t size() const { return bodies.size(); }
+    size_t blockCount() const { return blocks.size(); }
+
+private:
+    // Ячейка с максимальным выравниванием; тело занимает целое число ячеек
+    using Slot = std::max_align_t;
+
+    template <typename T>
+    static constexpr size_t slotsFor() { return (sizeof(T) + sizeof(Slot) - 1) / sizeof(Slot); }
+
+    // Число ячеек под тело или 0 для некорректной строки (те же условия, что в calculate_columns)
+    static size_t validSize(int type, double r, double a, double b, double c, double h) {
+        switch (type) {
+        case BODY_SPHERE: return r > 0 ? slotsFor<Sphere>() : 0;
+        case BODY_BOX: return (a > 0 && b > 0 && c > 0) ? slotsFor<Box>() : 0;
+        case BODY_CYLINDER: return (r > 0 && h > 0) ? slotsFor<Cylinder>() : 0;
+        }
+        return 0;
+    }
+
+    std::vector<std::unique_ptr<Slot[]>> blocks;
+    std::vector<Body*> bodies;
+};
+
+
+// Счетчики профилирования C-интерфейса: число вызовов, число обработанных тел и время.
+// Выключены по умолчанию; в выключенном состоянии каждый вызов проверяет только один флаг.
+enum ProfileCounter {
+    PROF_CREATE_BODY,
+    PROF_DELETE_BODY,
+    PROF_CREATE_BODIES_BATCH,
+    PROF_BODY_MOMENT,
+    PROF_BODY_MASS,
+    PROF_BODY_PRINCIPAL,
+    PROF_BODY_NAME,
+    PROF_GET_DIMENSIONS,
+    PROF_MOMENTS_BATCH,
+    PROF_MASSES_BATCH,
+    PROF_PRINCIPAL_BATCH,
+    PROF_COLUMNS,
+    PROF_PRINCIPAL_COLUMNS,
+    PROF_ASSEMBLE,
+    PROF_BODY_RECORDS,
+    PROF_COUNT
+};
+
+const char* const kProfileNames[PROF_COUNT] = {
+    "create_body",
+    "delete_body",
+    "create_bodies_batch",
+    "calculate_moment",
+    "calculate_mass",
+    "calculate_principal_moments",
+    "get_body_name",
+    "get_dimensions",
+    "calculate_moments_batch",
+    "calculate_masses_batch",
+    "calculate_principal_batch",
+    "calculate_columns",
+    "calculate_principal_columns",
+    "assemble_inertia_tensor",
+    "get_body_records",
+};
+
+struct ProfileSlot {
+    std::atomic<unsigned long long> calls{0};
+    std::atomic<unsigned long long> items{0};
+    std::atomic<unsigned long long> nanoseconds{0};
+};
+
+std::atomic<bool> g_profiling{false};
+ProfileSlot g_profile[PROF_COUNT];
+
+// Замер вызова от конструктора до деструктора; при выключенном профилировании ничего не делает
+class ProfileScope {
+public:
+    ProfileScope(ProfileCounter counter, size_t items)
+        : slot(g_profiling.load(std::memory_order_relaxed) ? &g_profile[counter] : nullptr), items(items) {
+        if (slot) start = std::chrono::steady_clock::now();
+    }
+
+    ~ProfileScope() {
+        if (!slot) return;
+        auto elapsed = std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now() - start);
+        slot->calls.fetch_add(1, std::memory_order_relaxed);
+        slot->items.fetch_add(items, std::memory_order_relaxed);
+        slot->nanoseconds.fetch_add(elapsed.count(), std::memory_order_relaxed);
+    }
+
+    ProfileScope(const ProfileScope&) = delete;
+    ProfileScope& operator=(const ProfileScope&) = delete;
+
+private:
+    ProfileSlot* slot;
+    size_t items;
+    std::chrono::steady_clock::time_point start;
+};
+
+// Ядра расчетов без счетчиков: пакетные и многопоточные функции вызывают их напрямую,
+// чтобы одно тело или блок не учитывались дважды
+double bodyMoment(void* body, double density) {
+    if (!body || density <= 0) return -1.0;
+    try {
+        return static_cast<Body*>(body)->calculateMomentOfInertia(density);
+    } catch (...) {
+        return -1.0;
+    }
+}
+
+double bodyMass(void* body, double density) {
+    if (!body || density <= 0) return -1.0;
+    try {
+        return static_cast<Body*>(body)->calculateMass(density);
+    } catch (...) {
+        return -1.0;
+    }
+}
+
+int bodyPrincipal(void* body, double density, double* out3) {
+    if (!body || density <= 0) return -1;
+    try {
+        static_cast<Body*>(body)->calculatePrincipalMoments(density, out3);
+        return 0;
+    } catch (...) {
+        return -1;
+    }
+}
+
+int bodyRecord(void* body, double* out_params) {
+    if (!body) {
+        std::fill(out_params, out_params + BODY_PARAM_COUNT, 0.0);
+        return -1;
+    }
+    const Body* b = static_cast<const Body*>(body);
+    b->getParameters(out_params);
+    return b->getType();
+}
+
+size_t columnsKernel(size_t n, const int* types,
+                     const double* r, const double* a, const double* b,
+                     const double* c, const double* h, const double* densities,
+                     double* out_mass, double* out_moment) {
+    size_t errors = 0;
+    for (size_t i = 0; i < n; ++i) {
+        double density = densities[i];
+        double mass = -1.0;
+        double moment = -1.0;
+        if (density > 0) {
+            switch (types[i]) {
+            case BODY_SPHERE:
+                if (r[i] > 0) {
+                    mass = sphereMass(r[i], density);
+                    moment = sphereMoment(mass, r[i]);
+                }
+                break;
+            case BODY_BOX:
+                if (a[i] > 0 && b[i] > 0 && c[i] > 0) {
+                    mass = boxMass(a[i], b[i], c[i], density);
+                    moment = boxMoment(mass, b[i], c[i]);
+                }
+                break;
+            case BODY_CYLINDER:
+                if (r[i] > 0 && h[i] > 0) {
+                    mass = cylinderMass(r[i], h[i], density);
+                    moment = cylinderMoment(mass, r[i]);
+                }
+                break;
+            }
+        }
+        if (moment < 0) ++errors;
+        out_mass[i] = mass;
+        out_moment[i] = moment;
+    }
+    return errors;
+}
+
+size_t principalColumnsKernel(size_t n, const int* types,
+                              const double* r, const double* a, const double* b,
+                              const double* c, const double* h, const double* densities,
+                              double* out_mass, double* out_principal) {
+    size_t errors = 0;
+    for (size_t i = 0; i < n; ++i) {
+        double density = densities[i];
+        double* out = out_principal + 3 * i;
+        double mass = -1.0;
+        out[0] = out[1] = out[2] = -1.0;
+        if (density > 0) {
+            switch (types[i]) {
+            case BODY_SPHERE:
+                if (r[i] > 0) {
+                    mass = sphereMass(r[i], density);
+                    spherePrincipal(mass, r[i], out);
+                }
+                break;
+            case BODY_BOX:
+                if (a[i] > 0 && b[i] > 0 && c[i] > 0) {
+                    mass = boxMass(a[i], b[i], c[i], density);
+                    boxPrincipal(mass, a[i], b[i], c[i], out);
+                }
+                break;
+            case BODY_CYLINDER:
+                if (r[i] > 0 && h[i] > 0) {
+                    mass = cylinderMass(r[i], h[i], density);
+                    cylinderPrincipal(mass, r[i], h[i], out);
+                }
+                break;
+            }
+        }
+        if (mass < 0) ++errors;
+        out_mass[i] = mass;
+    }
+    return errors;
+}
+
+} // namespace
+
 // Реализация C-интерфейса
 extern "C" {
     void* create_sphere(double radius) {
+        ProfileScope scope(PROF_CREATE_BODY, 1);
         try {
             return new Sphere(radius);
         } catch (...) {
@@ -68,6 +436,7 @@ extern "C" {
     }
     
     void* create_box(double a, double b, double c) {
+        ProfileScope scope(PROF_CREATE_BODY, 1);
         try {
             return new Box(a, b, c);
         } catch (...) {
@@ -76,6 +445,7 @@ extern "C" {
     }
     
     void* create_cylinder(double radius, double height) {
+        ProfileScope scope(PROF_CREATE_BODY, 1);
         try {
             return new Cylinder(radius, height);
         } catch (...) {
@@ -83,31 +453,71 @@ extern "C" {
         }
     }
     
-    double calculate_moment(void* body, double density) {
-        if (!body || density <= 0) return -1.0;
+    void* create_body_pool() {
         try {
-            Body* b = static_cast<Body*>(body);
-            return b->calculateMomentOfInertia(density);
+            return new BodyPool();
         } catch (...) {
-            return -1.0;
+            return nullptr;
         }
     }
+
+    void delete_body_pool(void* pool) {
+        delete static_cast<BodyPool*>(pool);
+    }
+
+    size_t create_bodies_batch(void* pool, size_t n, const int* types,
+                               const double* r, const double* a, const double* b,
+                               const double* c, const double* h, void** out_bodies) {
+        ProfileScope scope(PROF_CREATE_BODIES_BATCH, n);
+        if (!pool) {
+            std::fill(out_bodies, out_bodies + n, nullptr);
+            return n;
+        }
+        try {
+            return static_cast<BodyPool*>(pool)->createBatch(n, types, r, a, b, c, h, out_bodies);
+        } catch (...) {
+            std::fill(out_bodies, out_bodies + n, nullptr);
+            return n;
+        }
+    }
+
+    size_t body_pool_size(void* pool) {
+        return pool ? static_cast<BodyPool*>(pool)->size() : 0;
+    }
+
+    size_t body_pool_blocks(void* pool) {
+        return pool ? static_cast<BodyPool*>(pool)->blockCount() : 0;
+    }
+    
+    double calculate_moment(void* body, double density) {
+        ProfileScope scope(PROF_BODY_MOMENT, 1);
+        return bodyMoment(body, density);
+    }
+    
+    double calculate_mass(void* body, double density) {
+        ProfileScope scope(PROF_BODY_MASS, 1);
+        return bodyMass(body, density);
+    }
     
     void delete_body(void* body) {
+        ProfileScope scope(PROF_DELETE_BODY, 1);
         delete static_cast<Body*>(body);
     }
     
     const char* get_body_name(void* body) {
+        ProfileScope scope(PROF_BODY_NAME, 1);
         Body* b = static_cast<Body*>(body);
         return b ? b->getName() : "Unknown";
     }
     
     double get_sphere_radius(void* body) {
+        ProfileScope scope(PROF_GET_DIMENSIONS, 1);
         Sphere* sphere = dynamic_cast<Sphere*>(static_cast<Body*>(body));
         return sphere ? sphere->getRadius() : -1.0;
     }
     
     void get_box_dimensions(void* body, double* a, double* b, double* c) {
+        ProfileScope scope(PROF_GET_DIMENSIONS, 1);
         Box* box = dynamic_cast<Box*>(static_cast<Body*>(body));
         if (box) {
             box->getDimensions(*a, *b, *c);
@@ -115,9 +525,215 @@ extern "C" {
     }
     
     void get_cylinder_dimensions(void* body, double* r, double* h) {
+        ProfileScope scope(PROF_GET_DIMENSIONS, 1);
         Cylinder* cylinder = dynamic_cast<Cylinder*>(static_cast<Body*>(body));
         if (cylinder) {
             cylinder->getDimensions(*r, *h);
         }
     }
+
+    int get_body_record(void* body, double* out_params) {
+        ProfileScope scope(PROF_GET_DIMENSIONS, 1);
+        return bodyRecord(body, out_params);
+    }
+
+    size_t get_body_records(void** bodies, size_t n, int* out_types, double* out_params) {
+        ProfileScope scope(PROF_BODY_RECORDS, n);
+        size_t errors = 0;
+        for (size_t i = 0; i < n; ++i) {
+            out_types[i] = bodyRecord(bodies[i], out_params + BODY_PARAM_COUNT * i);
+            if (out_types[i] < 0) ++errors;
+        }
+        return errors;
+    }
+    
+    size_t calculate_moments_batch(void** bodies, size_t n, const double* densities, double* out) {
+        ProfileScope scope(PROF_MOMENTS_BATCH, n);
+        size_t errors = 0;
+        for (size_t i = 0; i < n; ++i) {
+            out[i] = bodyMoment(bodies[i], densities[i]);
+            if (out[i] < 0) ++errors;
+        }
+        return errors;
+    }
+    
+    size_t calculate_masses_batch(void** bodies, size_t n, const double* densities, double* out) {
+        ProfileScope scope(PROF_MASSES_BATCH, n);
+        size_t errors = 0;
+        for (size_t i = 0; i < n; ++i) {
+            out[i] = bodyMass(bodies[i], densities[i]);
+            if (out[i] < 0) ++errors;
+        }
+        return errors;
+    }
+    
+    size_t calculate_columns(size_t n, const int* types,
+                             const double* r, const double* a, const double* b,
+                             const double* c, const double* h, const double* densities,
+                             double* out_mass, double* out_moment) {
+        ProfileScope scope(PROF_COLUMNS, n);
+        return columnsKernel(n, types, r, a, b, c, h, densities, out_mass, out_moment);
+    }
+    
+    int calculate_principal_moments(void* body, double density, double* out3) {
+        ProfileScope scope(PROF_BODY_PRINCIPAL, 1);
+        return bodyPrincipal(body, density, out3);
+    }
+    
+    size_t calculate_principal_batch(void** bodies, size_t n, const double* densities,
+                                     double* out_mass, double* out_principal) {
+        ProfileScope scope(PROF_PRINCIPAL_BATCH, n);
+        size_t errors = 0;
+        for (size_t i = 0; i < n; ++i) {
+            double* out = out_principal + 3 * i;
+            out_mass[i] = bodyMass(bodies[i], densities[i]);
+            if (out_mass[i] < 0 || bodyPrincipal(bodies[i], densities[i], out) != 0) {
+                out_mass[i] = out[0] = out[1] = out[2] = -1.0;
+                ++errors;
+            }
+        }
+        return errors;
+    }
+    
+    size_t calculate_principal_columns(size_t n, const int* types,
+                                       const double* r, const double* a, const double* b,
+                                       const double* c, const double* h, const double* densities,
+                                       double* out_mass, double* out_principal) {
+        ProfileScope scope(PROF_PRINCIPAL_COLUMNS, n);
+        return principalColumnsKernel(n, types, r, a, b, c, h, densities, out_mass, out_principal);
+    }
+    
+    size_t calculate_columns_parallel(size_t n, const int* types,
+                                      const double* r, const double* a, const double* b,
+                                      const double* c, const double* h, const double* densities,
+                                      double* out_mass, double* out_moment) {
+        // Многопоточный вызов учитывается одним замером вместе с колоночным расчетом
+        ProfileScope scope(PROF_COLUMNS, n);
+        return parallelChunks(n, [=](size_t begin, size_t end) {
+            return columnsKernel(end - begin, types + begin, r + begin, a + begin, b + begin,
+                                     c + begin, h + begin, densities + begin, out_mass + begin, out_moment + begin);
+        });
+    }
+    
+    size_t calculate_principal_columns_parallel(size_t n, const int* types,
+                                                const double* r, const double* a, const double* b,
+                                                const double* c, const double* h, const double* densities,
+                                                double* out_mass, double* out_principal) {
+        ProfileScope scope(PROF_PRINCIPAL_COLUMNS, n);
+        return parallelChunks(n, [=](size_t begin, size_t end) {
+            return principalColumnsKernel(end - begin, types + begin, r + begin, a + begin, b + begin,
+                                               c + begin, h + begin, densities + begin,
+                                               out_mass + begin, out_principal + 3 * begin);
+        });
+    }
+    
+    void set_num_threads(int n) {
+        g_num_threads.store(n > 0 ? n : 0);
+    }
+    
+    int get_num_threads() {
+        int requested = g_num_threads.load();
+        return requested > 0 ? requested : int(std::max(1u, std::thread::hardware_concurrency()));
+    }
+    
+    void set_profiling(int enabled) {
+        g_profiling.store(enabled != 0);
+    }
+    
+    int get_profiling() {
+        return g_profiling.load() ? 1 : 0;
+    }
+    
+    void reset_profile_counters() {
+        for (ProfileSlot& slot : g_profile) {
+            slot.calls.store(0);
+            slot.items.store(0);
+            slot.nanoseconds.store(0);
+        }
+    }
+    
+    size_t profile_counter_count() {
+        return PROF_COUNT;
+    }
+    
+    const char* profile_counter_name(size_t index) {
+        return index < PROF_COUNT ? kProfileNames[index] : nullptr;
+    }
+    
+    int get_profile_counter(size_t index, unsigned long long* calls, unsigned long long* items,
+                            unsigned long long* nanoseconds) {
+        if (index >= PROF_COUNT) return -1;
+        *calls = g_profile[index].calls.load();
+        *items = g_profile[index].items.load();
+        *nanoseconds = g_profile[index].nanoseconds.load();
+        return 0;
+    }
+    
+    double assemble_inertia_tensor(size_t n, const double* masses, const double* principal,
+                                   const double* positions, const double* rotations,
+                                   const double* reference, double* out_com, double* out_tensor) {
+        ProfileScope scope(PROF_ASSEMBLE, n);
+        // Суммы накапливаются в отдельных скалярах без ветвлений внутри цикла,
+        // чтобы компилятор мог векторизовать проход
+        double m_sum = 0, mx = 0, my = 0, mz = 0;
+        double ixx = 0, iyy = 0, izz = 0, ixy = 0, ixz = 0, iyz = 0;
+        
+        // Первый проход: масса и центр масс
+        for (size_t i = 0; i < n; ++i) {
+            double m = masses[i];
+            m_sum += m;
+            mx += m * positions[3 * i]; my += m * positions[3 * i + 1]; mz += m * positions[3 * i + 2];
+        }
+        
+        if (rotations) {
+            // I_world = R * diag(I) * R^T
+            for (size_t i = 0; i < n; ++i) {
+                const double* R = rotations + 9 * i;
+                double p0 = principal[3 * i], p1 = principal[3 * i + 1], p2 = principal[3 * i + 2];
+                ixx += R[0] * R[0] * p0 + R[1] * R[1] * p1 + R[2] * R[2] * p2;
+                iyy += R[3] * R[3] * p0 + R[4] * R[4] * p1 + R[5] * R[5] * p2;
+                izz += R[6] * R[6] * p0 + R[7] * R[7] * p1 + R[8] * R[8] * p2;
+                ixy += R[0] * R[3] * p0 + R[1] * R[4] * p1 + R[2] * R[5] * p2;
+                ixz += R[0] * R[6] * p0 + R[1] * R[7] * p1 + R[2] * R[8] * p2;
+                iyz += R[3] * R[6] * p0 + R[4] * R[7] * p1 + R[5] * R[8] * p2;
+            }
+        } else {
+            for (size_t i = 0; i < n; ++i) {
+                ixx += principal[3 * i];
+                iyy += principal[3 * i + 1];
+                izz += principal[3 * i + 2];
+            }
+        }
+        
+        double cx = 0, cy = 0, cz = 0;
+        if (m_sum > 0) {
+            cx = mx / m_sum; cy = my / m_sum; cz = mz / m_sum;
+        }
+        out_com[0] = cx; out_com[1] = cy; out_com[2] = cz;
+        
+        double rx = cx, ry = cy, rz = cz;
+        if (reference) {
+            rx = reference[0]; ry = reference[1]; rz = reference[2];
+        }
+        
+        // Второй проход: вторые моменты масс относительно опорной точки sum m (p - ref)(p - ref)^T.
+        // Суммы по смещениям d = p - ref, а не по сырым координатам: при больших координатах
+        // разность сумм m*x^2 и m*ref^2 теряет точность
+        double sxx = 0, syy = 0, szz = 0, sxy = 0, sxz = 0, syz = 0;
+        for (size_t i = 0; i < n; ++i) {
+            double m = masses[i];
+            double dx = positions[3 * i] - rx, dy = positions[3 * i + 1] - ry, dz = positions[3 * i + 2] - rz;
+            sxx += m * dx * dx; syy += m * dy * dy; szz += m * dz * dz;
+            sxy += m * dx * dy; sxz += m * dx * dz; syz += m * dy * dz;
+        }
+        
+        // Теорема Штейнера: I += m (|d|^2 E - d d^T)
+        out_tensor[0] = ixx + syy + szz;
+        out_tensor[4] = iyy + sxx + szz;
+        out_tensor[8] = izz + sxx + syy;
+        out_tensor[1] = out_tensor[3] = ixy - sxy;
+        out_tensor[2] = out_tensor[6] = ixz - sxz;
+        out_tensor[5] = out_tensor[7] = iyz - syz;
+        return m_sum;
+    }
 }
\ No newline at end of file
@@ -14,27 +14,49 @@
   #else
     #define INERTIA_API __declspec(dllimport)
   #endif
+#elif defined(__GNUC__)
+  #define INERTIA_API __attribute__((visibility("default")))
 #else
   #define INERTIA_API
 #endif
 
+// Коды типов тел для колоночного (struct-of-arrays) представления
+enum BodyType : int {
+    BODY_SPHERE = 0,
+    BODY_BOX = 1,
+    BODY_CYLINDER = 2
+};
+
+// Число параметров в записи тела: r, a, b, c, h (как колонки calculate_columns)
+constexpr int BODY_PARAM_COUNT = 5;
+
 // Базовый класс для всех тел
 class INERTIA_API Body {
 public:
     virtual ~Body() = default;
     virtual double calculateMomentOfInertia(double density) const = 0;
     virtual double calculateMass(double density) const = 0;
+    // Главные моменты инерции (Ixx, Iyy, Izz) относительно центра масс в осях тела
+    virtual void calculatePrincipalMoments(double density, double out[3]) const = 0;
     virtual const char* getName() const = 0;
+    virtual BodyType getType() const = 0;
+    // Параметры r, a, b, c, h; неиспользуемые типом тела равны 0
+    virtual void getParameters(double out[BODY_PARAM_COUNT]) const = 0;
 };
 
-// Конкретные классы тел
+// Конкретные классы тел.
+// Оси тела: сторона a параллелепипеда направлена по x, b - по y, c - по z;
+// ось цилиндра совпадает с z. Скалярный момент - это Ixx для параллелепипеда и Izz для цилиндра.
 class INERTIA_API Sphere : public Body {
     double radius;
 public:
     Sphere(double r);
     double calculateMomentOfInertia(double density) const override;
     double calculateMass(double density) const override;
+    void calculatePrincipalMoments(double density, double out[3]) const override;
     const char* getName() const override;
+    BodyType getType() const override;
+    void getParameters(double out[BODY_PARAM_COUNT]) const override;
     double getRadius() const;
 };
 
@@ -44,7 +66,10 @@ public:
     Box(double a, double b, double c);
     double calculateMomentOfInertia(double density) const override;
     double calculateMass(double density) const override;
+    void calculatePrincipalMoments(double density, double out[3]) const override;
     const char* getName() const override;
+    BodyType getType() const override;
+    void getParameters(double out[BODY_PARAM_COUNT]) const override;
     void getDimensions(double& a, double& b, double& c) const;
 };
 
@@ -54,7 +79,10 @@ public:
     Cylinder(double r, double h);
     double calculateMomentOfInertia(double density) const override;
     double calculateMass(double density) const override;
+    void calculatePrincipalMoments(double density, double out[3]) const override;
     const char* getName() const override;
+    BodyType getType() const override;
+    void getParameters(double out[BODY_PARAM_COUNT]) const override;
     void getDimensions(double& r, double& h) const;
 };
 
@@ -64,9 +92,84 @@ extern "C" {
     INERTIA_API void* create_box(double a, double b, double c);
     INERTIA_API void* create_cylinder(double radius, double height);
     INERTIA_API double calculate_moment(void* body, double density);
+    INERTIA_API double calculate_mass(void* body, double density);
     INERTIA_API void delete_body(void* body);
     INERTIA_API const char* get_body_name(void* body);
     INERTIA_API double get_sphere_radius(void* body);
     INERTIA_API void get_box_dimensions(void* body, double* a, double* b, double* c);
     INERTIA_API void get_cylinder_dimensions(void* body, double* r, double* h);
+
+    // Запись тела за один вызов: возвращает код типа (BodyType, -1 для NULL), out_params -
+    // BODY_PARAM_COUNT параметров r, a, b, c, h (неиспользуемые - 0).
+    // get_body_records заполняет out_types[i] и out_params[BODY_PARAM_COUNT*i + k] для n тел
+    // и возвращает число NULL-указателей (их записи: код -1 и нули).
+    INERTIA_API int get_body_record(void* body, double* out_params);
+    INERTIA_API size_t get_body_records(void** bodies, size_t n, int* out_types, double* out_params);
+
+    // Пул тел: create_bodies_batch создает n тел по колонкам (как calculate_columns) в одном блоке
+    // памяти пула и пишет указатели в out_bodies. Если хотя бы одна строка некорректна, тела не
+    // создаются, out_bodies заполняется NULL и возвращается число ошибок. Тела пула освобождаются
+    // только вместе с ним (delete_body_pool), delete_body для них не вызывается.
+    INERTIA_API void* create_body_pool();
+    INERTIA_API void delete_body_pool(void* pool);
+    INERTIA_API size_t create_bodies_batch(void* pool, size_t n, const int* types,
+                                           const double* r, const double* a, const double* b,
+                                           const double* c, const double* h, void** out_bodies);
+    INERTIA_API size_t body_pool_size(void* pool);
+    INERTIA_API size_t body_pool_blocks(void* pool);
+
+    // Пакетные вызовы: n тел за один переход в нативный код.
+    // out[i] = -1.0 для некорректного тела или плотности, возвращается число таких ошибок.
+    INERTIA_API size_t calculate_moments_batch(void** bodies, size_t n, const double* densities, double* out);
+    INERTIA_API size_t calculate_masses_batch(void** bodies, size_t n, const double* densities, double* out);
+
+    // Колоночный расчет: типы тел (BodyType) и параметры r, a, b, c, h лежат в отдельных массивах.
+    // Неиспользуемые типом тела колонки игнорируются. Некорректные строки получают -1.0.
+    INERTIA_API size_t calculate_columns(size_t n, const int* types,
+                                         const double* r, const double* a, const double* b,
+                                         const double* c, const double* h, const double* densities,
+                                         double* out_mass, double* out_moment);
+
+    // Главные моменты инерции: out_principal[3*i + k] = I_kk тела i в его осях
+    INERTIA_API int calculate_principal_moments(void* body, double density, double* out3);
+    INERTIA_API size_t calculate_principal_batch(void** bodies, size_t n, const double* densities,
+                                                 double* out_mass, double* out_principal);
+    INERTIA_API size_t calculate_principal_columns(size_t n, const int* types,
+                                                   const double* r, const double* a, const double* b,
+                                                   const double* c, const double* h, const double* densities,
+                                                   double* out_mass, double* out_principal);
+
+    // Многопоточные варианты колоночных расчетов: диапазон [0, n) делится на блоки по потокам.
+    // Небольшие массивы считаются в вызывающем потоке. Результаты совпадают с однопоточными.
+    INERTIA_API size_t calculate_columns_parallel(size_t n, const int* types,
+                                                  const double* r, const double* a, const double* b,
+                                                  const double* c, const double* h, const double* densities,
+                                                  double* out_mass, double* out_moment);
+    INERTIA_API size_t calculate_principal_columns_parallel(size_t n, const int* types,
+                                                            const double* r, const double* a, const double* b,
+                                                            const double* c, const double* h, const double* densities,
+                                                            double* out_mass, double* out_principal);
+
+    // Число потоков для *_parallel; 0 - по числу ядер (std::thread::hardware_concurrency)
+    INERTIA_API void set_num_threads(int n);
+    INERTIA_API int get_num_threads();
+
+    // Профилирование: счетчики вызовов, обработанных тел и времени (нс) по функциям C-интерфейса.
+    // По умолчанию выключено. Счетчик index (0 <= index < profile_counter_count()) имеет имя
+    // profile_counter_name(index); get_profile_counter возвращает -1 для неверного индекса.
+    INERTIA_API void set_profiling(int enabled);
+    INERTIA_API int get_profiling();
+    INERTIA_API void reset_profile_counters();
+    INERTIA_API size_t profile_counter_count();
+    INERTIA_API const char* profile_counter_name(size_t index);
+    INERTIA_API int get_profile_counter(size_t index, unsigned long long* calls, unsigned long long* items,
+                                        unsigned long long* nanoseconds);
+
+    // Тензор инерции сборки по теореме Штейнера за один проход.
+    // positions - n*3 координат центров масс, rotations - n*9 матриц поворота (по строкам, NULL - без поворота),
+    // reference - точка, относительно которой считается тензор (NULL - центр масс сборки).
+    // Возвращает суммарную массу, out_com - центр масс, out_tensor - тензор 3x3 по строкам.
+    INERTIA_API double assemble_inertia_tensor(size_t n, const double* masses, const double* principal,
+                                               const double* positions, const double* rotations,
+                                               const double* reference, double* out_com, double* out_tensor);
 }
\ No newline at end of file
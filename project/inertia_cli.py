@@ -0,0 +1,54 @@
+"""Консольный расчет моментов инерции без GUI.
+
+Импортирует только inertia_wrapper и NumPy (плюс pyarrow для Parquet), поэтому запускается
+за доли секунды. Пример:
+
+    python inertia_cli.py bodies.csv -o results.parquet --threads 8
+"""
+import argparse
+import sys
+import time
+
+from inertia_pipeline import DEFAULT_CHUNK_SIZE, process_file
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Расчет масс и моментов инерции тел из CSV/Parquet")
+    parser.add_argument("input", help="файл с телами (.csv или .parquet, \"-\" - CSV из stdin): "
+                                      "shape, r, a, b, c, h, density, material")
+    parser.add_argument("-o", "--output", default="-",
+                        help="файл результатов (.csv или .parquet), по умолчанию CSV в stdout")
+    parser.add_argument("--density", type=float,
+                        help="плотность строк без density и material (пусто или 0), кг/м³")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="число строк в блоке обработки")
+    parser.add_argument("--engine", choices=("core", "native", "numpy"),
+                        help="вычислительный движок (по умолчанию самый быстрый доступный)")
+    parser.add_argument("--threads", type=int, help="число потоков нативного ядра, 0 - по числу ядер")
+    parser.add_argument("-q", "--quiet", action="store_true", help="не печатать итог в stderr")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    try:
+        if args.threads is not None:
+            from inertia_engine import set_num_threads
+            set_num_threads(args.threads)
+        if args.density is not None and args.density <= 0:
+            raise ValueError("Плотность должна быть положительной")
+        summary = process_file(args.input, args.output, args.chunk_size, args.engine, density=args.density)
+    except (OSError, ValueError, KeyError, ImportError, RuntimeError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        print(f"Тел: {summary.bodies}, суммарная масса: {summary.total_mass:.6f} кг, "
+              f"суммарный момент инерции: {summary.total_moment:.6f} кг·м² ({elapsed:.3f} с)",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
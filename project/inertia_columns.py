@@ -0,0 +1,372 @@
+from ctypes import c_double, c_int, POINTER
+
+import numpy as np
+
+import inertia_profile
+import inertia_wrapper
+from inertia_materials import NO_MATERIAL, materials
+from inertia_wrapper import SPHERE, BOX, CYLINDER, SHAPE_CODES, SHAPE_NAMES, PARAM_COLUMNS
+
+try:
+    # Модуль pybind11 из setup.py; без него остаются ctypes и NumPy
+    import core
+except ImportError:
+    core = None
+
+# Старые сборки core без счетчиков профилирования просто не попадают в отчет
+if core is not None and hasattr(core, "profile_counters"):
+    inertia_profile.register_native("core", core.set_profiling, core.profile_counters, core.reset_profile_counters)
+
+
+def _broadcast_columns(types, *columns):
+    # Скалярный параметр (одно значение на все тела) растягивается до длины колонки типов
+    return [np.broadcast_to(np.asarray(x, dtype=np.float64), types.shape) for x in columns]
+
+
+def evaluate_numpy(types, r, a, b, c, h, density):
+    """Векторный расчет масс и моментов инерции, повторяет формулы inertia_calculator.cpp"""
+    types = np.asarray(types)
+    r, a, b, c, h, density = _broadcast_columns(types, r, a, b, c, h, density)
+    mass = np.full(types.shape, -1.0)
+    moment = np.full(types.shape, -1.0)
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        valid = density > 0
+
+        sel = valid & (types == SPHERE) & (r > 0)
+        rs = r[sel]
+        m = (4.0 / 3.0) * np.pi * rs * rs * rs * density[sel]
+        mass[sel] = m
+        moment[sel] = 0.4 * m * rs * rs
+
+        sel = valid & (types == BOX) & (a > 0) & (b > 0) & (c > 0)
+        bs, cs = b[sel], c[sel]
+        m = a[sel] * bs * cs * density[sel]
+        mass[sel] = m
+        moment[sel] = (1.0 / 12.0) * m * (bs * bs + cs * cs)
+
+        sel = valid & (types == CYLINDER) & (r > 0) & (h > 0)
+        rs = r[sel]
+        m = np.pi * rs * rs * h[sel] * density[sel]
+        mass[sel] = m
+        moment[sel] = 0.5 * m * rs * rs
+
+    return mass, moment
+
+
+def _as_double_ptr(arr):
+    return arr.ctypes.data_as(POINTER(c_double))
+
+
+def _contiguous_columns(types, *columns):
+    # Колонки нужной длины и типа в C-порядке; готовые массивы float64 не копируются
+    types = np.ascontiguousarray(types, dtype=np.intc)
+    n = types.shape[0]
+    return types, [np.ascontiguousarray(np.broadcast_to(x, (n,)), dtype=np.float64) for x in columns]
+
+
+def evaluate_native(types, r, a, b, c, h, density):
+    """Тот же расчет одним вызовом calculate_columns_parallel: буферы NumPy передаются в DLL без копирования.
+
+    ctypes отпускает GIL на время вызова, поэтому другие потоки Python продолжают работать.
+    """
+    lib = inertia_wrapper.lib
+    if not lib:
+        raise RuntimeError("DLL не загружена")
+    types, columns = _contiguous_columns(types, r, a, b, c, h, density)
+    n = types.shape[0]
+    mass = np.empty(n)
+    moment = np.empty(n)
+    lib.calculate_columns_parallel(n, types.ctypes.data_as(POINTER(c_int)),
+                                   *(_as_double_ptr(col) for col in columns),
+                                   _as_double_ptr(mass), _as_double_ptr(moment))
+    return mass, moment
+
+
+def principal_numpy(types, r, a, b, c, h, density):
+    """Массы и главные моменты (n, 3) относительно центров масс в осях тел"""
+    types = np.asarray(types)
+    r, a, b, c, h, density = _broadcast_columns(types, r, a, b, c, h, density)
+    mass, _ = evaluate_numpy(types, r, a, b, c, h, density)
+    principal = np.full(types.shape + (3,), -1.0)
+
+    sel = (mass >= 0) & (types == SPHERE)
+    rs = r[sel]
+    principal[sel] = (0.4 * mass[sel] * rs * rs)[:, None]
+
+    sel = (mass >= 0) & (types == BOX)
+    m, as_, bs, cs = mass[sel], a[sel], b[sel], c[sel]
+    principal[sel, 0] = (1.0 / 12.0) * m * (bs * bs + cs * cs)
+    principal[sel, 1] = (1.0 / 12.0) * m * (as_ * as_ + cs * cs)
+    principal[sel, 2] = (1.0 / 12.0) * m * (as_ * as_ + bs * bs)
+
+    sel = (mass >= 0) & (types == CYLINDER)
+    m, rs, hs = mass[sel], r[sel], h[sel]
+    side = (1.0 / 12.0) * m * (3.0 * rs * rs + hs * hs)
+    principal[sel, 0] = side
+    principal[sel, 1] = side
+    principal[sel, 2] = 0.5 * m * rs * rs
+    return mass, principal
+
+
+def principal_native(types, r, a, b, c, h, density):
+    lib = inertia_wrapper.lib
+    if not lib:
+        raise RuntimeError("DLL не загружена")
+    types, columns = _contiguous_columns(types, r, a, b, c, h, density)
+    n = types.shape[0]
+    mass = np.empty(n)
+    principal = np.empty((n, 3))
+    lib.calculate_principal_columns_parallel(n, types.ctypes.data_as(POINTER(c_int)),
+                                             *(_as_double_ptr(col) for col in columns),
+                                             _as_double_ptr(mass), _as_double_ptr(principal))
+    return mass, principal
+
+
+def _pose_arrays(n, positions, rotations):
+    positions = np.zeros((n, 3)) if positions is None else np.asarray(positions, dtype=np.float64).reshape(n, 3)
+    if rotations is not None:
+        rotations = np.asarray(rotations, dtype=np.float64).reshape(n, 3, 3)
+    return positions, rotations
+
+
+def assemble_numpy(masses, principal, positions=None, rotations=None, reference=None):
+    """Тензор инерции сборки по теореме Штейнера: (масса, центр масс, тензор 3x3)"""
+    masses = np.asarray(masses, dtype=np.float64)
+    principal = np.asarray(principal, dtype=np.float64).reshape(-1, 3)
+    positions, rotations = _pose_arrays(masses.shape[0], positions, rotations)
+    total = masses.sum()
+    com = masses @ positions / total if total > 0 else np.zeros(3)
+    ref = com if reference is None else np.asarray(reference, dtype=np.float64)
+
+    if rotations is None:
+        tensor = np.diag(principal.sum(axis=0))
+    else:
+        tensor = np.einsum("nik,nk,njk->ij", rotations, principal, rotations)
+    d = positions - ref
+    second = np.einsum("n,ni,nj->ij", masses, d, d)
+    tensor += np.trace(second) * np.eye(3) - second
+    return total, com, tensor
+
+
+def assemble_native(masses, principal, positions=None, rotations=None, reference=None):
+    lib = inertia_wrapper.lib
+    if not lib:
+        raise RuntimeError("DLL не загружена")
+    masses = np.ascontiguousarray(masses, dtype=np.float64)
+    n = masses.shape[0]
+    principal = np.ascontiguousarray(principal, dtype=np.float64).reshape(n, 3)
+    positions, rotations = _pose_arrays(n, positions, rotations)
+    positions = np.ascontiguousarray(positions)
+    rotations_ptr = None if rotations is None else _as_double_ptr(np.ascontiguousarray(rotations))
+    reference_ptr = None
+    if reference is not None:
+        reference = np.ascontiguousarray(reference, dtype=np.float64)
+        reference_ptr = _as_double_ptr(reference)
+    com = np.empty(3)
+    tensor = np.empty((3, 3))
+    total = lib.assemble_inertia_tensor(n, _as_double_ptr(masses), _as_double_ptr(principal),
+                                        _as_double_ptr(positions), rotations_ptr, reference_ptr,
+                                        _as_double_ptr(com), _as_double_ptr(tensor))
+    return total, com, tensor
+
+
+def _require_core():
+    if core is None:
+        raise RuntimeError("Модуль core не собран (python setup.py build_ext --inplace)")
+
+
+def evaluate_core(types, r, a, b, c, h, density):
+    """Тот же расчет через модуль core: массивы передаются по буферному протоколу, GIL отпускается"""
+    _require_core()
+    types, columns = _contiguous_columns(types, r, a, b, c, h, density)
+    return core.calculate_columns(types, *columns)
+
+
+def principal_core(types, r, a, b, c, h, density):
+    _require_core()
+    types, columns = _contiguous_columns(types, r, a, b, c, h, density)
+    return core.calculate_principal_columns(types, *columns)
+
+
+def assemble_core(masses, principal, positions=None, rotations=None, reference=None):
+    _require_core()
+    masses = np.ascontiguousarray(masses, dtype=np.float64)
+    positions, rotations = _pose_arrays(masses.shape[0], positions, rotations)
+    return core.assemble_inertia_tensor(masses, principal, positions, rotations, reference)
+
+
+# Колоночный контейнер: тело хранится как код типа и несколько чисел float64
+class ColumnarBodyContainer:
+    def __init__(self, capacity=1024, registry=None):
+        capacity = max(int(capacity), 1)
+        self.registry = materials if registry is None else registry
+        self._size = 0
+        self._types = np.zeros(capacity, dtype=np.intc)
+        self._params = {name: np.zeros(capacity) for name in PARAM_COLUMNS}
+        self._density = np.zeros(capacity)
+        self._material = np.full(capacity, NO_MATERIAL, dtype=np.int16)
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, n):
+        capacity = self._types.shape[0]
+        if n <= capacity:
+            return
+        while capacity < n:
+            capacity *= 2
+        self._types = np.resize(self._types, capacity)
+        self._params = {name: np.resize(col, capacity) for name, col in self._params.items()}
+        self._density = np.resize(self._density, capacity)
+        self._material = np.resize(self._material, capacity)
+
+    # Колонки отдаются как представления без копирования
+    @property
+    def types(self):
+        return self._types[:self._size]
+
+    @property
+    def density(self):
+        return self._density[:self._size]
+
+    @property
+    def material(self):
+        """Индексы материалов в реестре, NO_MATERIAL для тел с плотностью, заданной числом"""
+        return self._material[:self._size]
+
+    def column(self, name):
+        return self._params[name][:self._size]
+
+    def _material_indices(self, material, count):
+        # material: имя, массив имен или массив индексов реестра
+        if isinstance(material, str):
+            return np.full(count, self.registry.index(material), dtype=np.int16)
+        material = np.asarray(material)
+        if material.dtype.kind in "USO":
+            return np.broadcast_to(self.registry.indices(material.ravel()), (count,))
+        return np.broadcast_to(material.astype(np.int16), (count,))
+
+    def extend(self, types, density=1000.0, material=None, **params):
+        """Добавляет пачку тел: types - коды типов, params - колонки r, a, b, c, h.
+
+        material (имя, имена или индексы реестра) имеет приоритет над density.
+        """
+        unknown = set(params) - set(PARAM_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+        types = np.asarray(types, dtype=np.intc).ravel()
+        count = types.shape[0]
+        start, stop = self._size, self._size + count
+        self._reserve(stop)
+        self._types[start:stop] = types
+        for name in PARAM_COLUMNS:
+            self._params[name][start:stop] = params.get(name, 0.0)
+        self._density[start:stop] = density
+        if material is None:
+            self._material[start:stop] = NO_MATERIAL
+        else:
+            indices = self._material_indices(material, count)
+            self._material[start:stop] = indices
+            known = indices >= 0
+            self._density[start:stop][known] = self.registry.lookup(indices[known])
+        self._size = stop
+
+    def add_sphere(self, radius, density=1000.0, material=None):
+        self.extend([SPHERE], density, material, r=radius)
+
+    def add_box(self, a, b, c, density=1000.0, material=None):
+        self.extend([BOX], density, material, a=a, b=b, c=c)
+
+    def add_cylinder(self, radius, height, density=1000.0, material=None):
+        self.extend([CYLINDER], density, material, r=radius, h=height)
+
+    def add_body(self, body, density=1000.0, material=None):
+        """Переносит параметры объектного тела (Sphere/Box/Cylinder) в колонки"""
+        code = SHAPE_CODES[body.name]
+        dims = body.get_dimensions()
+        if code == BOX:
+            self.add_box(dims["a"], dims["b"], dims["c"], density, material)
+        elif code == SPHERE:
+            self.add_sphere(dims["radius"], density, material)
+        else:
+            self.add_cylinder(dims["radius"], dims["height"], density, material)
+
+    @classmethod
+    def from_container(cls, container, density=1000.0):
+        """Колоночная копия BodyContainer с сохранением собственных плотностей тел"""
+        # Типы и параметры всех тел читаются одним вызовом DLL, а не по телу
+        types, params = container.body_records()
+        columns = cls(capacity=len(types))
+        if types:
+            columns.extend(types, [density if own is None else own for own in container.densities], **params)
+        return columns
+
+    def update_material_densities(self):
+        """Перечитывает плотности из реестра после изменения материалов"""
+        material = self.material
+        known = material >= 0
+        self.density[known] = self.registry.lookup(material[known])
+
+    def name(self, index):
+        return SHAPE_NAMES.get(int(self.types[index]), "Unknown")
+
+    def get_dimensions(self, index):
+        """Возвращает размеры тела в том же виде, что Body.get_dimensions"""
+        code = int(self.types[index])
+        if code == SPHERE:
+            return {"radius": float(self._params["r"][index])}
+        elif code == BOX:
+            return {key: float(self._params[key][index]) for key in ("a", "b", "c")}
+        elif code == CYLINDER:
+            return {"radius": float(self._params["r"][index]), "height": float(self._params["h"][index])}
+        return {}
+
+    def calculate(self, density=None, engine=None):
+        """Массы и моменты инерции всех тел за один проход.
+
+        density переопределяет колонку плотностей одним значением; engine - имя движка
+        inertia_engine (None - самый быстрый доступный: core, DLL, NumPy).
+        """
+        from inertia_engine import get_engine
+        densities = self.density if density is None else density
+        mass, moment = get_engine(engine).evaluate(self.types, *(self.column(name) for name in PARAM_COLUMNS),
+                                                   densities)
+        errors = int(np.count_nonzero(moment < 0))
+        if errors:
+            raise ValueError(f"Ошибка расчета для {errors} тел(а)")
+        return mass, moment
+
+    def calculate_sharded(self, density=None, workers=None, shard_size=None, engine=None):
+        """Массы и моменты инерции в пуле процессов: колонки передаются через разделяемую память"""
+        from inertia_sharded import evaluate_sharded
+        densities = self.density if density is None else density
+        return evaluate_sharded(self.types, *(self.column(name) for name in PARAM_COLUMNS), densities,
+                                workers=workers, shard_size=shard_size, engine=engine)
+
+    def principal_moments(self, density=None, engine=None):
+        """Массы и главные моменты (n, 3) всех тел за один проход"""
+        from inertia_engine import get_engine
+        densities = self.density if density is None else density
+        mass, principal = get_engine(engine).principal(self.types, *(self.column(name) for name in PARAM_COLUMNS),
+                                                       densities)
+        errors = int(np.count_nonzero(mass < 0))
+        if errors:
+            raise ValueError(f"Ошибка расчета для {errors} тел(а)")
+        return mass, principal
+
+    def assembly_tensor(self, positions=None, rotations=None, reference=None, density=None, engine=None):
+        """Тензор инерции сборки: positions (n, 3), rotations (n, 3, 3), reference - точка приведения"""
+        from inertia_engine import get_engine
+        engine = get_engine(engine)
+        mass, principal = self.principal_moments(density, engine.name)
+        return engine.assemble(mass, principal, positions, rotations, reference)
+
+    def calculate_all_masses(self, density=None):
+        return self.calculate(density)[0]
+
+    def calculate_all_moments(self, density=None):
+        return self.calculate(density)[1]
+
+    def clear(self):
+        self._size = 0
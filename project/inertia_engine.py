@@ -0,0 +1,71 @@
+import inertia_columns
+import inertia_wrapper
+from inertia_columns import (
+    evaluate_numpy, evaluate_native, evaluate_core,
+    principal_numpy, principal_native, principal_core,
+    assemble_numpy, assemble_native, assemble_core,
+)
+
+
+# Вычислительный движок: набор колоночных функций с одинаковыми сигнатурами
+class Engine:
+    def __init__(self, name, evaluate, principal, assemble):
+        self.name = name
+        self.evaluate = evaluate
+        self.principal = principal
+        self.assemble = assemble
+
+    def __repr__(self):
+        return f"Engine({self.name!r})"
+
+
+ENGINES = {
+    "numpy": Engine("numpy", evaluate_numpy, principal_numpy, assemble_numpy),
+    "native": Engine("native", evaluate_native, principal_native, assemble_native),
+    "core": Engine("core", evaluate_core, principal_core, assemble_core),
+}
+
+# Порядок выбора движка по умолчанию: pybind11, ctypes, NumPy
+PREFERENCE = ("core", "native", "numpy")
+
+
+def available_engines():
+    """Имена движков, которые можно использовать в текущем окружении"""
+    available = {
+        "numpy": True,
+        "native": bool(inertia_wrapper.lib),
+        "core": inertia_columns.core is not None,
+    }
+    return [name for name in ENGINES if available[name]]
+
+
+def get_engine(name=None):
+    """Движок по имени; None выбирает самый быстрый из доступных (PREFERENCE)"""
+    available = available_engines()
+    if name is None:
+        name = next(engine for engine in PREFERENCE if engine in available)
+    if name not in ENGINES:
+        raise ValueError(f"Неизвестный движок: {name}")
+    if name not in available:
+        raise RuntimeError("Модуль core не собран" if name == "core" else "DLL не загружена")
+    return ENGINES[name]
+
+
+def set_num_threads(n):
+    """Число потоков нативных колоночных расчетов (DLL и core), 0 - по числу ядер"""
+    n = int(n)
+    if n < 0:
+        raise ValueError("Число потоков не может быть отрицательным")
+    if inertia_wrapper.lib:
+        inertia_wrapper.lib.set_num_threads(n)
+    if inertia_columns.core is not None:
+        inertia_columns.core.set_num_threads(n)
+
+
+def get_num_threads():
+    """Текущее число потоков нативного ядра, 1 если доступен только NumPy"""
+    if inertia_columns.core is not None:
+        return inertia_columns.core.get_num_threads()
+    if inertia_wrapper.lib:
+        return inertia_wrapper.lib.get_num_threads()
+    return 1
@@ -0,0 +1,169 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+from inertia_pipeline import CsvWriter, ParquetWriter
+from inertia_profile import timed, instrument
+from inertia_wrapper import SHAPE_NAMES, PARAM_COLUMNS
+
+# Колонки экспорта результатов: тип, параметры, плотность, масса, момент
+EXPORT_COLUMNS = ("shape",) + PARAM_COLUMNS + ("density", "mass", "moment")
+
+# Строк в блоке форматирования: память экспорта ограничена блоком, а не числом тел
+DEFAULT_CHUNK_SIZE = 10000
+PDF_ROWS_PER_PAGE = 48
+
+EXPORT_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".txt": "txt",
+    ".pdf": "pdf",
+}
+
+# Имена типов для индексации массивом кодов (неизвестный код - последний элемент)
+_SHAPE_LABELS = np.array([SHAPE_NAMES.get(code, "Unknown") for code in range(max(SHAPE_NAMES) + 1)]
+                         + ["Unknown"], dtype=object)
+
+
+def export_format(path):
+    fmt = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Неподдерживаемый формат файла: {path}")
+    return fmt
+
+
+class _JsonLinesWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, columns):
+        values = [columns[name] if name == "shape" else columns[name].tolist() for name in EXPORT_COLUMNS]
+        self._file.write("".join(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+                                 for row in zip(*values)))
+
+    def close(self):
+        self._file.close()
+
+
+class _TextWriter:
+    # Тот же вид, что у ResultExporter.export_to_txt, но одна запись в файл на блок
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("Моменты инерции тел:\n" + "=" * 50 + "\n")
+        self._count = 0
+
+    def write(self, columns):
+        separator = "-" * 30
+        start = self._count + 1
+        rows = zip(range(start, start + len(columns["shape"])), columns["shape"],
+                   columns["density"].tolist(), columns["moment"].tolist())
+        self._file.write("".join(
+            f"{i}. {name}\n   Плотность: {density} кг/м³\n   Момент инерции: {moment:.6f} кг·м²\n{separator}\n"
+            for i, name, density, moment in rows))
+        self._count += len(columns["shape"])
+
+    def close(self):
+        self._file.close()
+
+
+class _PdfWriter:
+    """Таблица результатов постранично: страница собирается из буфера строк, отрисовывается
+    одним текстовым объектом моноширинным шрифтом и сразу закрывается"""
+
+    def __init__(self, path):
+        try:
+            from reportlab.lib.pagesizes import A4, landscape
+            from reportlab.pdfgen import canvas
+        except ImportError:
+            raise ImportError("reportlab required for PDF export") from None
+        self._pagesize = landscape(A4)
+        self._canvas = canvas.Canvas(path, pagesize=self._pagesize)
+        self._header = f"{'#':>8} {'shape':<9}" + "".join(f"{name:>13}" for name in EXPORT_COLUMNS[1:])
+        self._pending = []
+        self._count = 0
+        self._page = 0
+
+    def write(self, columns):
+        start = self._count + 1
+        numbers = zip(*(columns[name].tolist() for name in EXPORT_COLUMNS[1:]))
+        self._pending.extend(f"{i:>8} {name:<9}" + "".join(f"{value:>13.6g}" for value in row)
+                             for i, name, row in zip(range(start, start + len(columns["shape"])),
+                                                     columns["shape"], numbers))
+        self._count += len(columns["shape"])
+        while len(self._pending) >= PDF_ROWS_PER_PAGE:
+            self._draw_page(self._pending[:PDF_ROWS_PER_PAGE])
+            del self._pending[:PDF_ROWS_PER_PAGE]
+
+    def _draw_page(self, rows):
+        _, height = self._pagesize
+        self._page += 1
+        # Стандартные шрифты PDF не содержат кириллицы, поэтому подписи таблицы латиницей
+        self._canvas.setFont("Helvetica-Bold", 12)
+        self._canvas.drawString(40, height - 40, f"Inertia results, page {self._page}")
+        text = self._canvas.beginText(40, height - 65)
+        text.setFont("Courier", 8)
+        text.setLeading(10)
+        text.textLine(self._header)
+        text.textLine("-" * len(self._header))
+        for row in rows:
+            text.textLine(row)
+        self._canvas.drawText(text)
+        self._canvas.showPage()
+
+    def close(self):
+        if self._pending or not self._page:
+            self._draw_page(self._pending)
+            self._pending = []
+        self._canvas.save()
+
+
+_WRITERS = {
+    "csv": lambda path: CsvWriter(path, EXPORT_COLUMNS),
+    "parquet": lambda path: ParquetWriter(path, EXPORT_COLUMNS),
+    "jsonl": _JsonLinesWriter,
+    "txt": _TextWriter,
+    "pdf": _PdfWriter,
+}
+
+
+@timed(items=lambda path, types, *args, **kwargs: len(types))
+def export_results(path, types, density, mass, moment, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, **params):
+    """Экспорт результатов из числовых массивов без обращения к объектам тел.
+
+    types - коды типов, params - колонки r, a, b, c, h (отсутствующие заполняются нулями).
+    Формат определяется по расширению: .csv, .jsonl, .parquet, .txt, .pdf. Строки форматируются
+    блоками по chunk_size; progress(done, total) вызывается после каждого блока, исключение из
+    него прерывает экспорт.
+    """
+    unknown = set(params) - set(PARAM_COLUMNS)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+    # Неположительный размер блока дает блоки по одной строке
+    chunk_size = max(int(chunk_size), 1)
+    types = np.asarray(types, dtype=np.intc).ravel()
+    count = types.shape[0]
+    columns = {name: np.broadcast_to(np.asarray(params.get(name, 0.0), dtype=np.float64), (count,))
+               for name in PARAM_COLUMNS}
+    for name, values in (("density", density), ("mass", mass), ("moment", moment)):
+        columns[name] = np.broadcast_to(np.asarray(values, dtype=np.float64), (count,))
+    labels = np.where((types >= 0) & (types < len(_SHAPE_LABELS) - 1), types, len(_SHAPE_LABELS) - 1)
+
+    writer = _WRITERS[export_format(path)](path)
+    try:
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            chunk = {name: np.ascontiguousarray(values[start:stop]) for name, values in columns.items()}
+            chunk["shape"] = _SHAPE_LABELS[labels[start:stop]].tolist()
+            writer.write(chunk)
+            if progress:
+                progress(stop, count)
+    finally:
+        writer.close()
+
+
+instrument(sys.modules[__name__])
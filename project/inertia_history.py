@@ -0,0 +1,120 @@
+import os
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+# Снимок одного расчета: только числа, без объектов тел и указателей на C++ объекты
+Snapshot = namedtuple("Snapshot", ["timestamp", "masses", "moments", "total_mass", "total_moment"])
+
+
+def make_snapshot(masses, moments, timestamp=None):
+    masses = np.array(masses, dtype=np.float64)
+    moments = np.array(moments, dtype=np.float64)
+    if masses.shape != moments.shape:
+        raise ValueError("Число масс не совпадает с числом моментов")
+    return Snapshot(time.time() if timestamp is None else timestamp, masses, moments,
+                    float(masses.sum()), float(moments.sum()))
+
+
+def snapshot_nbytes(snapshot):
+    return snapshot.masses.nbytes + snapshot.moments.nbytes
+
+
+def load_snapshot(path):
+    """Читает снимок, выгруженный CalculationHistory на диск"""
+    with np.load(path) as data:
+        return Snapshot(float(data["timestamp"]), data["masses"], data["moments"],
+                        float(data["total_mass"]), float(data["total_moment"]))
+
+
+class CalculationHistory:
+    """Ограниченная история расчетов (кольцевой буфер снимков).
+
+    При превышении max_snapshots или max_bytes вытесняются самые старые снимки. Если задан
+    spill_dir, вытесненный снимок сохраняется туда в .npz (путь - в spilled, чтение -
+    load_snapshot), иначе отбрасывается.
+    """
+
+    def __init__(self, max_snapshots=20, max_bytes=None, spill_dir=None):
+        if max_snapshots < 1:
+            raise ValueError("История должна вмещать хотя бы один снимок")
+        self.max_snapshots = max_snapshots
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spilled = []
+        self.evicted = 0
+        self._snapshots = deque()
+        self._nbytes = 0
+        # Префикс файлов сессии, чтобы не перезаписывать снимки прошлых запусков
+        self._session = time.strftime("%Y%m%d_%H%M%S")
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __iter__(self):
+        return iter(self._snapshots)
+
+    def __getitem__(self, index):
+        return self._snapshots[index]
+
+    @property
+    def nbytes(self):
+        """Память под массивы снимков в буфере"""
+        return self._nbytes
+
+    def latest(self):
+        return self._snapshots[-1] if self._snapshots else None
+
+    def append(self, masses, moments, timestamp=None):
+        """Добавляет снимок расчета и вытесняет старые снимки сверх лимитов"""
+        snapshot = make_snapshot(masses, moments, timestamp)
+        self._snapshots.append(snapshot)
+        self._nbytes += snapshot_nbytes(snapshot)
+        # Последний снимок остается в буфере, даже если сам превышает max_bytes
+        while len(self._snapshots) > 1 and (
+                len(self._snapshots) > self.max_snapshots
+                or (self.max_bytes is not None and self._nbytes > self.max_bytes)):
+            self._evict()
+        return snapshot
+
+    def _evict(self):
+        snapshot = self._snapshots.popleft()
+        self._nbytes -= snapshot_nbytes(snapshot)
+        self.evicted += 1
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f"calculation_{self._session}_{self.evicted:06d}.npz")
+            np.savez(path, timestamp=snapshot.timestamp, masses=snapshot.masses, moments=snapshot.moments,
+                     total_mass=snapshot.total_mass, total_moment=snapshot.total_moment)
+            self.spilled.append(path)
+
+    def clear(self):
+        """Очищает буфер; файлы, уже выгруженные на диск, остаются"""
+        self._snapshots.clear()
+        self._nbytes = 0
+
+
+class RunningTotals:
+    """Суммарные масса, момент и диагональ тензора сборки с обновлением по одному телу.
+
+    reset() берет итоги полного расчета, add() добавляет одно тело без пересуммирования
+    контейнера. Тела считаются расположенными в начале координат с совпадающими осями,
+    как в BodyContainer.calculate_assembly_tensor без положений.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, count=0, mass=0.0, moment=0.0, principal=(0.0, 0.0, 0.0)):
+        self.count = count
+        self.mass = float(mass)
+        self.moment = float(moment)
+        self.principal = [float(x) for x in principal]
+
+    def add(self, mass, moment, principal):
+        self.count += 1
+        self.mass += mass
+        self.moment += moment
+        for axis in range(3):
+            self.principal[axis] += principal[axis]
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Плотности материалов по умолчанию (кг/м³), те же значения, что во вкладке "Инструкция"
+DEFAULT_MATERIALS = {
+    "aluminium": 2700.0,
+    "steel": 7800.0,
+    "copper": 8960.0,
+    "wood": 650.0,
+    "water": 1000.0,
+}
+
+# Индекс материала для тел, у которых плотность задана числом
+NO_MATERIAL = -1
+
+
+# Реестр материалов: имя -> индекс в компактном массиве плотностей
+class MaterialRegistry:
+    def __init__(self, materials=None):
+        self._index = {}
+        self._densities = np.empty(0)
+        for name, density in (DEFAULT_MATERIALS if materials is None else materials).items():
+            self.register(name, density)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name.lower() in self._index
+
+    def register(self, name, density):
+        """Добавляет материал или меняет плотность существующего, возвращает его индекс"""
+        density = float(density)
+        if density <= 0:
+            raise ValueError("Плотность должна быть положительной")
+        key = name.lower()
+        if key in self._index:
+            index = self._index[key]
+            self._densities[index] = density
+        else:
+            index = len(self._index)
+            self._index[key] = index
+            self._densities = np.append(self._densities, density)
+        return index
+
+    def index(self, name):
+        try:
+            return self._index[name.lower()]
+        except KeyError:
+            raise KeyError(f"Неизвестный материал: {name}") from None
+
+    def indices(self, names):
+        return np.array([self.index(name) for name in names], dtype=np.int16)
+
+    def density(self, name):
+        return float(self._densities[self.index(name)])
+
+    @property
+    def names(self):
+        return list(self._index)
+
+    @property
+    def densities(self):
+        """Массив плотностей, индексируемый индексом материала"""
+        return self._densities
+
+    def lookup(self, indices):
+        """Плотности для массива индексов материалов одним векторным обращением"""
+        return self._densities[np.asarray(indices)]
+
+
+# Общий реестр, которым пользуются контейнеры по умолчанию
+materials = MaterialRegistry()
@@ -0,0 +1,222 @@
+import csv
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from inertia_materials import materials
+from inertia_wrapper import SHAPE_CODES, SHAPE_NAMES, PARAM_COLUMNS
+
+# Размер блока по умолчанию: память процесса ограничена блоком, а не размером файла
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Колонки результата после исходных колонок тела
+RESULT_COLUMNS = ("mass", "moment", "Ixx", "Iyy", "Izz")
+OUTPUT_COLUMNS = ("shape",) + PARAM_COLUMNS + ("density",) + RESULT_COLUMNS
+
+_SHAPE_LOOKUP = {name.lower(): code for name, code in SHAPE_CODES.items()}
+_SHAPE_LOOKUP.update({str(code): code for code in SHAPE_NAMES})
+
+# Ось главного момента, совпадающего со скалярным calculate_moment (Ixx параллелепипеда, Izz цилиндра)
+_SCALAR_AXIS = np.array([0, 0, 2])
+
+# Итог обработки файла
+PipelineSummary = namedtuple("PipelineSummary", ["bodies", "total_mass", "total_moment"])
+
+
+def _file_format(path):
+    if path == "-":
+        return "csv"
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext == ".csv":
+        return "csv"
+    raise ValueError(f"Неподдерживаемый формат файла: {path}")
+
+
+def _shape_codes(values):
+    try:
+        return np.array([_SHAPE_LOOKUP[str(value).strip().lower()] for value in values], dtype=np.intc)
+    except KeyError as e:
+        raise ValueError(f"Неизвестный тип тела: {e.args[0]}") from None
+
+
+def _float_column(values, count, default=None):
+    # Пустые значения и отсутствующая колонка дают 0; для плотности - default, если задан,
+    # и тогда 0 тоже считается незаданной плотностью, как в GUI
+    if values is None:
+        return np.full(count, float(default or 0.0))
+    column = np.array([float(value) if value not in (None, "") else 0.0 for value in values])
+    if default is not None:
+        column[column == 0.0] = default
+    return column
+
+
+def _make_chunk(raw, registry, density=None):
+    """Колонки блока из сырых значений: shape, r..h, density и/или material.
+
+    Строки без плотности и материала получают density (None - остаются с плотностью 0).
+    """
+    if "shape" not in raw:
+        raise ValueError("Во входных данных нет колонки shape")
+    types = _shape_codes(raw["shape"])
+    count = types.shape[0]
+    chunk = {"types": types}
+    for name in PARAM_COLUMNS:
+        chunk[name] = _float_column(raw.get(name), count)
+    density = _float_column(raw.get("density"), count, density)
+    names = raw.get("material")
+    if names is not None:
+        # Материал важнее числовой плотности, как в ColumnarBodyContainer.extend
+        for i, name in enumerate(names):
+            if name:
+                density[i] = registry.density(name)
+    chunk["density"] = density
+    return chunk
+
+
+def _read_csv(path, chunk_size):
+    # "-" - чтение из stdin, поток не закрывается
+    if path == "-":
+        yield from _read_csv_rows(sys.stdin, chunk_size)
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from _read_csv_rows(f, chunk_size)
+
+
+def _read_csv_rows(f, chunk_size):
+    reader = csv.DictReader(f)
+    while True:
+        rows = [row for _, row in zip(range(chunk_size), reader)]
+        if not rows:
+            return
+        yield {key.strip(): [row[key] for row in rows] for key in reader.fieldnames}
+
+
+def _read_parquet(path, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow required for Parquet input") from None
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pydict()
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, registry=None, density=None):
+    """Читает описания тел из CSV или Parquet блоками по chunk_size строк; "-" - CSV из stdin.
+
+    Каждый блок - словарь колонок types, r, a, b, c, h, density (массивы NumPy).
+    density - плотность строк без плотности (пусто или 0) и без материала; без нее такие
+    строки получают плотность 0.
+    """
+    registry = materials if registry is None else registry
+    read = _read_parquet if _file_format(path) == "parquet" else _read_csv
+    for raw in read(path, chunk_size):
+        yield _make_chunk(raw, registry, density)
+
+
+def evaluate_chunk(chunk, engine=None):
+    """Масса, момент и главные моменты блока одним проходом движка"""
+    from inertia_engine import get_engine
+    engine = get_engine(engine)
+    columns = [chunk[name] for name in PARAM_COLUMNS]
+    mass, principal = engine.principal(chunk["types"], *columns, chunk["density"])
+    principal = np.asarray(principal)
+    # Скалярный момент - одна из главных компонент, отдельный проход evaluate не нужен
+    axis = _SCALAR_AXIS[chunk["types"]]
+    moment = principal[np.arange(principal.shape[0]), axis]
+    return {"mass": np.asarray(mass), "moment": moment,
+            "Ixx": principal[:, 0], "Iyy": principal[:, 1], "Izz": principal[:, 2]}
+
+
+def _output_columns(chunk, results):
+    columns = {"shape": [SHAPE_NAMES.get(int(code), "Unknown") for code in chunk["types"]]}
+    for name in PARAM_COLUMNS + ("density",):
+        columns[name] = chunk[name]
+    columns.update(results)
+    return columns
+
+
+class CsvWriter:
+    """Запись колонок names в CSV блоками (write - словарь колонок блока), "-" - stdout.
+
+    Общий для потоковой обработки и экспорта результатов (inertia_export).
+    """
+
+    def __init__(self, path, names=OUTPUT_COLUMNS):
+        # "-" - запись в stdout, поток не закрывается
+        self._owned = path != "-"
+        self._file = open(path, "w", newline="", encoding="utf-8") if self._owned else sys.stdout
+        self._writer = csv.writer(self._file)
+        self._names = names
+        self._writer.writerow(names)
+
+    def write(self, columns):
+        values = [columns[name] if name == "shape" else columns[name].tolist() for name in self._names]
+        self._writer.writerows(zip(*values))
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class ParquetWriter:
+    """Запись колонок names в Parquet блоками: первая колонка - строки, остальные числа"""
+
+    def __init__(self, path, names=OUTPUT_COLUMNS):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow required for Parquet output") from None
+        self._pa = pa
+        self._names = names
+        # Первая колонка - имя типа тела, остальные числовые
+        schema = pa.schema([(names[0], pa.string())] + [(name, pa.float64()) for name in names[1:]])
+        self._writer = pq.ParquetWriter(path, schema)
+
+    def write(self, columns):
+        self._writer.write_table(self._pa.table({name: columns[name] for name in self._names}))
+
+    def close(self):
+        self._writer.close()
+
+
+def process_file(src, dst, chunk_size=DEFAULT_CHUNK_SIZE, engine=None, registry=None, density=None):
+    """Потоковая обработка: читает тела из src, считает блоками и дописывает результат в dst.
+
+    Форматы определяются по расширению (.csv, .parquet), src="-" читает CSV из stdin,
+    dst="-" пишет CSV в stdout. density - плотность строк без плотности и материала
+    (см. read_chunks). Возвращает PipelineSummary.
+    """
+    make_writer = ParquetWriter if _file_format(dst) == "parquet" else CsvWriter
+    writer = None
+    bodies, total_mass, total_moment = 0, 0.0, 0.0
+    try:
+        for chunk in read_chunks(src, chunk_size, registry, density):
+            missing = int(np.count_nonzero(chunk["density"] == 0))
+            if missing:
+                raise ValueError(f"Не задана плотность для {missing} тел(а) в строках "
+                                 f"{bodies + 1}-{bodies + len(chunk['types'])}: нужна колонка density "
+                                 f"или material либо плотность по умолчанию")
+            results = evaluate_chunk(chunk, engine)
+            errors = int(np.count_nonzero(results["moment"] < 0))
+            if errors:
+                raise ValueError(f"Ошибка расчета для {errors} тел(а) в строках {bodies + 1}-{bodies + len(chunk['types'])}")
+            # Файл результата создается после первого прочитанного блока, чтобы ошибка чтения не оставляла пустой файл
+            if writer is None:
+                writer = make_writer(dst)
+            writer.write(_output_columns(chunk, results))
+            bodies += len(chunk["types"])
+            total_mass += float(results["mass"].sum())
+            total_moment += float(results["moment"].sum())
+        if writer is None:
+            writer = make_writer(dst)
+    finally:
+        if writer is not None:
+            writer.close()
+    return PipelineSummary(bodies, total_mass, total_moment)
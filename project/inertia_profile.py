@@ -0,0 +1,181 @@
+"""Необязательное профилирование: именованные таймеры, счетчики и счетчики нативного ядра.
+
+По умолчанию выключено и ничего не стоит: методы, отмеченные @timed в классах и модулях,
+зарегистрированных через @instrument, подменяются обертками с замером только в enable(),
+а disable() возвращает исходные функции. Переменная окружения INERTIA_PROFILE=1 включает
+профилирование при запуске, INERTIA_PROFILE=файл.json еще и сохраняет отчет при выходе.
+
+    import inertia_profile
+    inertia_profile.enable()
+    ...
+    inertia_profile.dump("profile.json")
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+PROFILE_ENV_VAR = "INERTIA_PROFILE"
+
+# Проверяется кодом счетчиков в горячих циклах: inertia_profile.enabled, а не копия флага
+enabled = False
+
+# name -> [вызовы, тела, суммарное время, максимальное время]
+_timers = {}
+_counters = {}
+_lock = threading.Lock()
+_targets = []
+# (владелец, атрибут, исходный объект) подмененных функций
+_patched = []
+# Нативные ядра: name -> (set_profiling(bool), counters() -> dict, reset())
+_native = {}
+
+
+def timed(name=None, items=None):
+    """Отмечает функцию для замера; имя по умолчанию - "Класс.метод" или "модуль.функция".
+
+    items(*args, **kwargs) возвращает число обработанных тел вызова (считается до вызова и
+    только при включенном профилировании). Для staticmethod декоратор ставится под @staticmethod.
+    """
+    def mark(fn):
+        fn._profile = (name, items)
+        return fn
+    return mark
+
+
+def instrument(target):
+    """Регистрирует класс или модуль, функции которого отмечены @timed"""
+    _targets.append(target)
+    if enabled:
+        _patch(target)
+    return target
+
+
+def register_native(name, set_profiling, counters, reset):
+    """Подключает счетчики нативного ядра (DLL или модуля core) к отчету"""
+    _native[name] = (set_profiling, counters, reset)
+    if enabled:
+        set_profiling(True)
+
+
+def _wrap(fn, name, items):
+    with _lock:
+        stat = _timers.setdefault(name, [0, 0, 0.0, 0.0])
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # Число тел считается до вызова: функция может изменить то, по чему оно считается.
+        # Ошибка подсчета не должна мешать самому вызову
+        count = 0
+        if items is not None:
+            try:
+                count = items(*args, **kwargs)
+            except Exception:
+                pass
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            with _lock:
+                stat[0] += 1
+                stat[1] += count
+                stat[2] += elapsed
+                if elapsed > stat[3]:
+                    stat[3] = elapsed
+    return wrapper
+
+
+def _patch(target):
+    owner_name = target.__name__
+    for attr, value in list(vars(target).items()):
+        fn = getattr(value, "__func__", value)
+        marker = getattr(fn, "_profile", None)
+        if marker is None:
+            continue
+        name, items = marker
+        wrapper = _wrap(fn, name or f"{owner_name}.{attr}", items)
+        if isinstance(value, staticmethod):
+            wrapper = staticmethod(wrapper)
+        elif isinstance(value, classmethod):
+            wrapper = classmethod(wrapper)
+        setattr(target, attr, wrapper)
+        _patched.append((target, attr, value))
+
+
+def enable():
+    global enabled
+    if enabled:
+        return
+    enabled = True
+    for target in _targets:
+        _patch(target)
+    for set_profiling, _, _ in _native.values():
+        set_profiling(True)
+
+
+def disable():
+    global enabled
+    if not enabled:
+        return
+    enabled = False
+    while _patched:
+        target, attr, value = _patched.pop()
+        setattr(target, attr, value)
+    for set_profiling, _, _ in _native.values():
+        set_profiling(False)
+
+
+def count(name, n=1):
+    """Увеличивает именованный счетчик; без профилирования ничего не делает"""
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def reset():
+    # Списки таймеров обнуляются на месте: на них ссылаются установленные обертки
+    with _lock:
+        for stat in _timers.values():
+            stat[:] = [0, 0, 0.0, 0.0]
+        _counters.clear()
+    for _, _, reset_native in _native.values():
+        reset_native()
+
+
+def report():
+    """Снимок таймеров и счетчиков в виде словаря для JSON.
+
+    timers: {имя: {calls, items, seconds, mean, max}}, counters: {имя: значение},
+    native: {ядро: {функция C-интерфейса: {calls, items, seconds}}}.
+    Вложенные вызовы входят во время внешних.
+    """
+    with _lock:
+        timers = {name: {"calls": calls, "items": items, "seconds": total,
+                         "mean": total / calls if calls else 0.0, "max": longest}
+                  for name, (calls, items, total, longest) in _timers.items() if calls}
+        counters = dict(_counters)
+    native = {}
+    for name, (_, counters_native, _) in _native.items():
+        native[name] = {key: value for key, value in counters_native().items() if value["calls"]}
+    return {"enabled": enabled, "timers": timers, "counters": counters, "native": native}
+
+
+def dump(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report(), f, ensure_ascii=False, indent=1)
+
+
+def _enable_from_env():
+    value = os.environ.get(PROFILE_ENV_VAR, "")
+    if not value or value == "0":
+        return
+    enable()
+    if value.lower().endswith(".json"):
+        atexit.register(dump, value)
+
+
+_enable_from_env()
@@ -0,0 +1,105 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from inertia_wrapper import PARAM_COLUMNS
+
+# Шард меньше этого размера не окупает передачу задачи в другой процесс
+MIN_SHARD_SIZE = 65536
+
+
+def _create_shared(shape, dtype):
+    dtype = np.dtype(dtype)
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    # В процессы передается только описание блока: (имя, форма, тип)
+    return shm, array, (shm.name, shape, dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_worker():
+    # Процессы уже делят ядра между собой, поэтому нативное ядро внутри процесса однопоточное
+    from inertia_engine import set_num_threads
+    set_num_threads(1)
+
+
+def _evaluate_shard(types_spec, params_spec, out_spec, start, stop, engine):
+    from inertia_engine import get_engine
+    blocks = [_attach(spec) for spec in (types_spec, params_spec, out_spec)]
+    try:
+        types, params, out = (array for _, array in blocks)
+        mass, moment = get_engine(engine).evaluate(types[start:stop], *params[:, start:stop])
+        out[0, start:stop] = mass
+        out[1, start:stop] = moment
+        return int(np.count_nonzero(moment < 0))
+    finally:
+        # Представления NumPy освобождаются до закрытия блока, иначе close() не отдаст буфер
+        types = params = out = None
+        shms = [shm for shm, _ in blocks]
+        blocks.clear()
+        for shm in shms:
+            shm.close()
+
+
+def shard_bounds(n, workers, shard_size=None):
+    """Границы шардов [start, stop): по умолчанию около четырех шардов на процесс"""
+    if shard_size is None:
+        shard_size = max(math.ceil(n / (4 * workers)), MIN_SHARD_SIZE)
+    shard_size = max(int(shard_size), 1)
+    return [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+
+
+def evaluate_sharded(types, r, a, b, c, h, density, workers=None, shard_size=None, engine=None):
+    """Массы и моменты инерции по колонкам в пуле процессов.
+
+    Колонки копируются в разделяемую память один раз, процессы получают только имена блоков
+    и границы шардов и пишут результат в общий выходной блок. engine - имя движка
+    inertia_engine (None - самый быстрый доступный). Возвращает (mass, moment).
+    """
+    types = np.asarray(types, dtype=np.intc).ravel()
+    n = types.shape[0]
+    workers = workers or os.cpu_count() or 1
+    if engine is None:
+        from inertia_engine import get_engine
+        engine = get_engine().name
+
+    blocks = []
+    try:
+        arrays = []
+        for shape, dtype in (((n,), np.intc), ((len(PARAM_COLUMNS) + 1, n), np.float64), ((2, n), np.float64)):
+            shm, array, spec = _create_shared(shape, dtype)
+            blocks.append(shm)
+            arrays.append((array, spec))
+        (shared_types, types_spec), (shared_params, params_spec), (shared_out, out_spec) = arrays
+
+        shared_types[:] = types
+        for row, column in enumerate((r, a, b, c, h, density)):
+            shared_params[row] = column
+
+        bounds = shard_bounds(n, workers, shard_size)
+        with ProcessPoolExecutor(max_workers=min(workers, max(len(bounds), 1)),
+                                 initializer=_init_worker) as pool:
+            futures = [pool.submit(_evaluate_shard, types_spec, params_spec, out_spec, start, stop, engine)
+                       for start, stop in bounds]
+            errors = sum(future.result() for future in futures)
+
+        mass, moment = shared_out[0].copy(), shared_out[1].copy()
+    finally:
+        # Представления NumPy освобождаются до закрытия блоков
+        arrays = shared_types = shared_params = shared_out = None
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    if errors:
+        raise ValueError(f"Ошибка расчета для {errors} тел(а)")
+    return mass, moment
@@ -0,0 +1,62 @@
+from collections import namedtuple
+
+import numpy as np
+
+from inertia_wrapper import SPHERE, BOX, CYLINDER, SHAPE_CODES, PARAM_COLUMNS
+
+# Параметры, от которых зависит тело каждого типа, в порядке осей результата
+SHAPE_PARAMS = {
+    SPHERE: ("r",),
+    BOX: ("a", "b", "c"),
+    CYLINDER: ("r", "h"),
+}
+
+# axes - имена варьируемых параметров в порядке осей массивов mass и moment
+Sweep = namedtuple("Sweep", ["axes", "mass", "moment"])
+
+
+def sweep(shape, density, engine=None, **params):
+    """Масса и момент инерции на сетке параметров без создания объектов тел.
+
+    shape - код или имя типа тела ("Sphere", "Box", "Cylinder"), params - значения r, a, b, c, h
+    в зависимости от типа, density - плотность. Скаляр фиксирует параметр, одномерный массив
+    (например, np.linspace(0.1, 2, 100)) добавляет ось результата. Оси идут в порядке
+    SHAPE_PARAMS[shape], плотность - последней. engine - имя движка inertia_engine.
+    """
+    from inertia_engine import get_engine
+    code = SHAPE_CODES[shape] if isinstance(shape, str) else int(shape)
+    if code not in SHAPE_PARAMS:
+        raise ValueError(f"Неизвестный тип тела: {shape}")
+    names = SHAPE_PARAMS[code]
+    missing = [name for name in names if name not in params]
+    unknown = set(params) - set(names)
+    if missing or unknown:
+        raise ValueError(f"Для этого типа тела нужны параметры: {', '.join(names)}")
+
+    values = [np.asarray(params[name], dtype=np.float64) for name in names]
+    values.append(np.asarray(density, dtype=np.float64))
+    if any(value.ndim > 1 for value in values):
+        raise ValueError("Параметры должны быть скалярами или одномерными массивами")
+    axes = tuple(name for name, value in zip(names + ("density",), values) if value.ndim == 1)
+
+    # Каждая варьируемая величина получает свою ось; массивы растягиваются без копирования
+    grid_shape = tuple(value.shape[0] for value in values if value.ndim == 1)
+    columns = {}
+    axis = 0
+    for name, value in zip(names + ("density",), values):
+        if value.ndim == 1:
+            axis_shape = [1] * len(grid_shape)
+            axis_shape[axis] = value.shape[0]
+            value = value.reshape(axis_shape)
+            axis += 1
+        columns[name] = np.broadcast_to(value, grid_shape)
+
+    engine = get_engine(engine)
+    types = np.full(int(np.prod(grid_shape)), code, dtype=np.intc)
+    # Неиспользуемые типом тела колонки остаются скалярными нулями
+    flat = [columns[name].ravel() if name in columns else 0.0 for name in PARAM_COLUMNS]
+    mass, moment = engine.evaluate(types, *flat, columns["density"].ravel())
+    errors = int(np.count_nonzero(np.asarray(moment) < 0))
+    if errors:
+        raise ValueError(f"Ошибка расчета для {errors} точек сетки")
+    return Sweep(axes, np.asarray(mass).reshape(grid_shape), np.asarray(moment).reshape(grid_shape))
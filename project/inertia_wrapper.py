@@ -1,12 +1,61 @@
 import ctypes
 import os
-from ctypes import c_double, c_void_p, POINTER
+from bisect import bisect_left
+import sys
+from ctypes import c_double, c_int, c_void_p, c_size_t, c_ulonglong, POINTER
 
-DLL_PATH = os.path.join(os.path.dirname(__file__), "..", "cpp", "build", "Release", "inertia.dll")
+import inertia_profile
+from inertia_profile import timed, instrument
 
-try:
-    lib = ctypes.CDLL(DLL_PATH)
-    
+# Коды типов тел, совпадают с enum BodyType в inertia_calculator.h
+SPHERE = 0
+BOX = 1
+CYLINDER = 2
+
+SHAPE_CODES = {"Sphere": SPHERE, "Box": BOX, "Cylinder": CYLINDER}
+SHAPE_NAMES = {code: name for name, code in SHAPE_CODES.items()}
+
+# Порядок колонок параметров в колоночных вызовах C-интерфейса:
+# r - радиус (сфера, цилиндр), a/b/c - стороны параллелепипеда, h - высота цилиндра
+PARAM_COLUMNS = ("r", "a", "b", "c", "h")
+
+# Переменная окружения с путем к библиотеке или каталогу с ней
+LIB_ENV_VAR = "INERTIA_LIB"
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_ROOT = os.path.dirname(_HERE)
+
+
+def library_names():
+    """Имена файлов нативного ядра для текущей платформы"""
+    if sys.platform.startswith("win"):
+        return ["inertia.dll"]
+    if sys.platform == "darwin":
+        return ["libinertia.dylib", "libinertia.so"]
+    return ["libinertia.so"]
+
+
+def library_candidates():
+    """Пути, по которым ищется нативное ядро, в порядке приоритета"""
+    names = library_names()
+    override = os.environ.get(LIB_ENV_VAR)
+    if override:
+        if os.path.isdir(override):
+            return [os.path.join(override, name) for name in names]
+        return [override]
+    dirs = [
+        _HERE,
+        os.path.join(_HERE, "build", "Release"),
+        os.path.join(_HERE, "build"),
+        os.path.join(_ROOT, "cpp", "build", "Release"),
+        os.path.join(_ROOT, "cpp", "build"),
+        os.path.join(_ROOT, "build", "Release"),
+        os.path.join(_ROOT, "build"),
+    ]
+    return [os.path.join(d, name) for d in dirs for name in names]
+
+
+def _declare_prototypes(lib):
     # Объявляем прототипы функций C-интерфейса
     lib.create_sphere.argtypes = [c_double]
     lib.create_sphere.restype = c_void_p
@@ -20,6 +69,9 @@ try:
     lib.calculate_moment.argtypes = [c_void_p, c_double]
     lib.calculate_moment.restype = c_double
 
+    lib.calculate_mass.argtypes = [c_void_p, c_double]
+    lib.calculate_mass.restype = c_double
+
     lib.delete_body.argtypes = [c_void_p]
     
     lib.get_body_name.argtypes = [c_void_p]
@@ -31,82 +83,481 @@ try:
     lib.get_box_dimensions.argtypes = [c_void_p, POINTER(c_double), POINTER(c_double), POINTER(c_double)]
     
     lib.get_cylinder_dimensions.argtypes = [c_void_p, POINTER(c_double), POINTER(c_double)]
-    
-except Exception as e:
-    print(f"Ошибка загрузки DLL: {e}")
-    print("Убедитесь, что DLL скомпилирована и находится по пути:", DLL_PATH)
-    lib = None
+
+    lib.get_body_record.argtypes = [c_void_p, POINTER(c_double)]
+    lib.get_body_record.restype = c_int
+
+    lib.get_body_records.argtypes = [POINTER(c_void_p), c_size_t, POINTER(c_int), POINTER(c_double)]
+    lib.get_body_records.restype = c_size_t
+
+    lib.calculate_moments_batch.argtypes = [POINTER(c_void_p), c_size_t, POINTER(c_double), POINTER(c_double)]
+    lib.calculate_moments_batch.restype = c_size_t
+
+    lib.calculate_masses_batch.argtypes = [POINTER(c_void_p), c_size_t, POINTER(c_double), POINTER(c_double)]
+    lib.calculate_masses_batch.restype = c_size_t
+
+    lib.calculate_columns.argtypes = [c_size_t, POINTER(c_int)] + [POINTER(c_double)] * 8
+    lib.calculate_columns.restype = c_size_t
+
+    lib.calculate_principal_moments.argtypes = [c_void_p, c_double, POINTER(c_double)]
+    lib.calculate_principal_moments.restype = c_int
+
+    lib.calculate_principal_batch.argtypes = [POINTER(c_void_p), c_size_t, POINTER(c_double),
+                                              POINTER(c_double), POINTER(c_double)]
+    lib.calculate_principal_batch.restype = c_size_t
+
+    lib.calculate_principal_columns.argtypes = [c_size_t, POINTER(c_int)] + [POINTER(c_double)] * 8
+    lib.calculate_principal_columns.restype = c_size_t
+
+    lib.calculate_columns_parallel.argtypes = [c_size_t, POINTER(c_int)] + [POINTER(c_double)] * 8
+    lib.calculate_columns_parallel.restype = c_size_t
+
+    lib.calculate_principal_columns_parallel.argtypes = [c_size_t, POINTER(c_int)] + [POINTER(c_double)] * 8
+    lib.calculate_principal_columns_parallel.restype = c_size_t
+
+    lib.set_num_threads.argtypes = [c_int]
+    lib.get_num_threads.restype = c_int
+
+    lib.assemble_inertia_tensor.argtypes = [c_size_t] + [POINTER(c_double)] * 7
+    lib.assemble_inertia_tensor.restype = c_double
+
+    lib.create_body_pool.restype = c_void_p
+
+    lib.delete_body_pool.argtypes = [c_void_p]
+
+    lib.create_bodies_batch.argtypes = [c_void_p, c_size_t, POINTER(c_int)] + [POINTER(c_double)] * 5 + [POINTER(c_void_p)]
+    lib.create_bodies_batch.restype = c_size_t
+
+    lib.body_pool_size.argtypes = [c_void_p]
+    lib.body_pool_size.restype = c_size_t
+
+    lib.body_pool_blocks.argtypes = [c_void_p]
+    lib.body_pool_blocks.restype = c_size_t
+
+    lib.set_profiling.argtypes = [c_int]
+    lib.get_profiling.restype = c_int
+    lib.profile_counter_count.restype = c_size_t
+    lib.profile_counter_name.argtypes = [c_size_t]
+    lib.profile_counter_name.restype = ctypes.c_char_p
+    lib.get_profile_counter.argtypes = [c_size_t] + [POINTER(c_ulonglong)] * 3
+    lib.get_profile_counter.restype = c_int
+
+
+def load_library():
+    """Загружает нативное ядро, возвращает (lib, путь) или (None, None)"""
+    errors = []
+    for path in library_candidates():
+        if not os.path.exists(path):
+            continue
+        try:
+            lib = ctypes.CDLL(path)
+            _declare_prototypes(lib)
+            return lib, path
+        except (OSError, AttributeError) as e:
+            # AttributeError - старая сборка без части функций C-интерфейса
+            errors.append(f"{path}: {e}")
+    # Диагностика идет в stderr, чтобы не смешиваться с результатами консольной утилиты в stdout
+    print("DLL не загружена, расчеты выполняются модулем core или на NumPy", file=sys.stderr)
+    for error in errors:
+        print(f"Ошибка загрузки DLL: {error}", file=sys.stderr)
+    if not errors:
+        print("Библиотека не найдена. Пути поиска:", ", ".join(library_candidates()), file=sys.stderr)
+    return None, None
+
+
+lib, DLL_PATH = load_library()
+
+
+def native_profile_counters():
+    """Счетчики профилирования DLL: {функция: {calls, items, seconds}}"""
+    counters = {}
+    calls, items, nanoseconds = c_ulonglong(), c_ulonglong(), c_ulonglong()
+    for i in range(lib.profile_counter_count()):
+        lib.get_profile_counter(i, ctypes.byref(calls), ctypes.byref(items), ctypes.byref(nanoseconds))
+        counters[lib.profile_counter_name(i).decode("utf-8")] = {
+            "calls": calls.value, "items": items.value, "seconds": nanoseconds.value * 1e-9}
+    return counters
+
+
+if lib:
+    inertia_profile.register_native("dll", lambda on: lib.set_profiling(int(on)),
+                                    native_profile_counters, lib.reset_profile_counters)
+
+# Счетчик явных close() тел и пулов: массивы указателей контейнеров, собранные до
+# закрытия, могут содержать освобожденные объекты и пересобираются (см. BodyContainer._pointers)
+_close_generation = 0
+
+
+def _closed():
+    global _close_generation
+    _close_generation += 1
+
+
+def _fallback_engine():
+    # Запасной движок (модуль core или NumPy) подключается только когда DLL недоступна
+    from inertia_engine import get_engine
+    return get_engine()
+
+
+# Буфер записи тела для get_body_record: параметры r, a, b, c, h
+_Record = c_double * len(PARAM_COLUMNS)
+
+
+def _dimensions(code, params):
+    # Словарь размеров по коду типа и параметрам (r, a, b, c, h)
+    r, a, b, c, h = params
+    if code == SPHERE:
+        return {"radius": r}
+    elif code == BOX:
+        return {"a": a, "b": b, "c": c}
+    elif code == CYLINDER:
+        return {"radius": r, "height": h}
+    return {}
+
+
+def body_records(bodies, pointers=None):
+    """Коды типов и колонки параметров {r, a, b, c, h} тел (списки) одним вызовом DLL.
+
+    Неиспользуемые типом тела параметры равны 0, как в колонках BodyPool.create_bodies.
+    pointers - готовый массив указателей тел (например, BodyContainer._pointers()).
+    """
+    n = len(bodies)
+    if not lib:
+        if any(body._params is None for body in bodies):
+            raise ValueError("Тело уже освобождено")
+        types = [body._shape for body in bodies]
+        columns = list(zip(*(body._params for body in bodies))) if n else [()] * len(PARAM_COLUMNS)
+        return types, {name: list(column) for name, column in zip(PARAM_COLUMNS, columns)}
+    if pointers is None:
+        pointers = (c_void_p * n)(*(body._ptr for body in bodies))
+    types = (c_int * n)()
+    params = (c_double * (len(PARAM_COLUMNS) * n))()
+    if n and lib.get_body_records(pointers, n, types, params):
+        raise ValueError("Тело уже освобождено")
+    # Записи тел идут подряд по len(PARAM_COLUMNS) параметров, колонки - срезы с шагом
+    values = memoryview(params).cast("B").cast("d").tolist()
+    step = len(PARAM_COLUMNS)
+    return (memoryview(types).cast("B").cast("i").tolist(),
+            {name: values[k::step] for k, name in enumerate(PARAM_COLUMNS)})
+
 
 # Базовый класс для всех тел
+@instrument
 class Body:
-    def __init__(self, ptr):
+    # Значения по умолчанию на уровне класса: тела из BodyPool задают только _ptr и _pool
+    _name = None
+    _shape = None
+    _params = None
+    # Тела из BodyPool ссылаются на память пула и не удаляются по одному
+    _pool = None
+    # Ключ (код типа, размеры...) для интернирования и кэша результатов, вычисляется один раз
+    _key = None
+
+    def __init__(self, ptr, shape=None, params=None):
+        # Без DLL ptr равен None, а тип и параметры (r, a, b, c, h) хранятся в Python
         self._ptr = ptr
+        if shape is not None:
+            self._name = SHAPE_NAMES[shape]
+            self._shape = shape
+        if params is not None:
+            self._params = tuple(float(x) for x in params)
         
     def __del__(self):
-        if self._ptr and lib:
-            lib.delete_body(self._ptr)
+        # Удаляемое сборщиком тело не входит ни в один контейнер, счетчик закрытий не нужен
+        self._release()
+
+    def _release(self):
+        ptr = getattr(self, "_ptr", None)
+        if ptr and lib and self._pool is None:
+            lib.delete_body(ptr)
+        self._ptr = None
+        self._params = None
+        return ptr
+
+    def close(self):
+        """Освобождает C++ объект тела; после close() тело использовать нельзя"""
+        if self._release():
+            _closed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._ptr is None and self._params is None
+
+    def __reduce__(self):
+        # Указатель на C++ объект не переносится между процессами, тело пересоздается по размерам
+        return type(self), tuple(self.get_dimensions().values())
+
+    def _check_open(self):
+        # С DLL у тела есть только указатель, без DLL - только параметры
+        if self.closed:
+            raise ValueError("Тело уже освобождено")
+
+    def _evaluate(self, density):
+        self._check_open()
+        mass, moment = _fallback_engine().evaluate([self._shape], *self._params, density)
+        return float(mass[0]), float(moment[0])
             
+    @timed()
     def calculate_moment(self, density):
-        if not lib:
-            raise RuntimeError("DLL не загружена")
+        if self._ptr is None:
+            return self._evaluate(density)[1]
         return lib.calculate_moment(self._ptr, density)
+
+    @timed()
+    def calculate_mass(self, density):
+        if self._ptr is None:
+            return self._evaluate(density)[0]
+        return lib.calculate_mass(self._ptr, density)
+
+    def principal_moments(self, density):
+        """Главные моменты инерции (Ixx, Iyy, Izz) относительно центра масс в осях тела"""
+        if self._ptr is None:
+            self._check_open()
+            mass, principal = _fallback_engine().principal([self._shape], *self._params, density)
+            if mass[0] < 0:
+                raise ValueError("Ошибка расчета тензора инерции")
+            return tuple(float(x) for x in principal[0])
+        out = (c_double * 3)()
+        if lib.calculate_principal_moments(self._ptr, density, out) != 0:
+            raise ValueError("Ошибка расчета тензора инерции")
+        return tuple(out)
     
+    def cache_key(self):
+        """(код типа, размеры) в порядке get_dimensions: одинаковые тела имеют равные ключи"""
+        if self._key is None:
+            code, params = self._record()
+            self._key = (code,) + tuple(_dimensions(code, params).values())
+        return self._key
+
+    def _record(self):
+        # Код типа и параметры (r, a, b, c, h) одним вызовом DLL; код кэшируется вместе с именем
+        if self._ptr is None:
+            self._check_open()
+            return self._shape, self._params
+        params = _Record()
+        code = lib.get_body_record(self._ptr, params)
+        if self._shape is None:
+            self._shape = code
+            self._name = SHAPE_NAMES.get(code, "Unknown")
+        # Срез копирует массив ctypes целиком, поэлементный обход заметно медленнее
+        return code, params[:]
+
     @property
     def name(self):
-        if not lib:
-            return "Unknown"
-        return lib.get_body_name(self._ptr).decode('utf-8')
+        # Тип тела не меняется: у классов тел имя задано заранее, иначе читается из DLL один раз
+        if self._name is None:
+            if not lib or self._ptr is None:
+                return "Unknown"
+            self._record()
+        return self._name
     
+    @timed()
     def get_dimensions(self):
         """Возвращает размеры тела в виде словаря"""
-        if not lib:
-            return {}
-        
-        if self.name == "Sphere":
-            r = lib.get_sphere_radius(self._ptr)
-            return {"radius": r}
-        elif self.name == "Box":
-            a, b, c = c_double(), c_double(), c_double()
-            lib.get_box_dimensions(self._ptr, ctypes.byref(a), ctypes.byref(b), ctypes.byref(c))
-            return {"a": a.value, "b": b.value, "c": c.value}
-        elif self.name == "Cylinder":
-            r, h = c_double(), c_double()
-            lib.get_cylinder_dimensions(self._ptr, ctypes.byref(r), ctypes.byref(h))
-            return {"radius": r.value, "height": h.value}
-        return {}
+        return _dimensions(*self._record())
 
 # Конкретные классы тел
 class Sphere(Body):
+    _name = "Sphere"
+    _shape = SPHERE
+
     def __init__(self, radius):
         if not lib:
-            raise RuntimeError("DLL не загружена")
+            if not radius > 0:
+                raise ValueError("Invalid sphere parameters")
+            super().__init__(None, SPHERE, (radius, 0.0, 0.0, 0.0, 0.0))
+            return
         ptr = lib.create_sphere(radius)
         if not ptr:
             raise ValueError("Invalid sphere parameters")
         super().__init__(ptr)
 
 class Box(Body):
+    _name = "Box"
+    _shape = BOX
+
     def __init__(self, a, b, c):
         if not lib:
-            raise RuntimeError("DLL не загружена")
+            if not (a > 0 and b > 0 and c > 0):
+                raise ValueError("Invalid box parameters")
+            super().__init__(None, BOX, (0.0, a, b, c, 0.0))
+            return
         ptr = lib.create_box(a, b, c)
         if not ptr:
             raise ValueError("Invalid box parameters")
         super().__init__(ptr)
 
 class Cylinder(Body):
+    _name = "Cylinder"
+    _shape = CYLINDER
+
     def __init__(self, radius, height):
         if not lib:
-            raise RuntimeError("DLL не загружена")
+            if not (radius > 0 and height > 0):
+                raise ValueError("Invalid cylinder parameters")
+            super().__init__(None, CYLINDER, (radius, 0.0, 0.0, 0.0, height))
+            return
         ptr = lib.create_cylinder(radius, height)
         if not ptr:
             raise ValueError("Invalid cylinder parameters")
         super().__init__(ptr)
 
+_BODY_CLASSES = {SPHERE: Sphere, BOX: Box, CYLINDER: Cylinder}
+
+
+def _int_column(values, n):
+    try:
+        view = memoryview(values)
+        if view.c_contiguous and view.format in ("i", "l") and view.itemsize == ctypes.sizeof(c_int):
+            return (c_int * n).from_buffer_copy(view)
+    except TypeError:
+        pass
+    return (c_int * n)(*values)
+
+
+def _double_column(values, n):
+    # Скаляр размножается на все тела; массивы float64 (NumPy, array) копируются без обхода в Python
+    if isinstance(values, (int, float)):
+        return (c_double * n)(*([float(values)] * n))
+    try:
+        view = memoryview(values)
+        if view.c_contiguous and view.format == "d":
+            return (c_double * n).from_buffer_copy(view)
+    except TypeError:
+        pass
+    return (c_double * n)(*values)
+
+
+class _NativePool:
+    # Владелец памяти пула: на него ссылаются и BodyPool, и все тела пула, поэтому память
+    # освобождается, когда не остается ни пула, ни его тел (или явно через BodyPool.close)
+    def __init__(self):
+        self.ptr = lib.create_body_pool()
+        if not self.ptr:
+            raise MemoryError("Не удалось создать пул тел")
+
+    def free(self):
+        if self.ptr and lib:
+            lib.delete_body_pool(self.ptr)
+        self.ptr = None
+
+    def __del__(self):
+        self.free()
+
+
+@instrument
+class BodyPool:
+    """Пул тел для массового создания по колонкам.
+
+    create_bodies создает пачку тел одним вызовом DLL, все C++ объекты пачки размещаются
+    в одном блоке памяти. Тела пула освобождаются вместе с ним: close() (или выход из with)
+    освобождает память сразу и закрывает все тела пула, иначе память освобождается сборщиком
+    мусора после удаления пула и всех его тел. Без DLL тела создаются по параметрам в Python.
+    """
+
+    def __init__(self):
+        self._native = _NativePool() if lib else None
+        self.bodies = []
+
+    def __len__(self):
+        return len(self.bodies)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def blocks(self):
+        """Число блоков памяти пула (по одному на вызов create_bodies)"""
+        if self._native is None or not self._native.ptr:
+            return 0
+        return lib.body_pool_blocks(self._native.ptr)
+
+    @timed(items=lambda self, types, *args, **kwargs: len(types))
+    def create_bodies(self, types, r=0.0, a=0.0, b=0.0, c=0.0, h=0.0):
+        """Создает тела по колонкам типов и параметров (как ColumnarBodyContainer.extend).
+
+        Параметры - последовательности длины len(types) или скаляры. Если хотя бы одно тело
+        некорректно, тела не создаются и выбрасывается ValueError.
+        """
+        n = len(types)
+        if not n:
+            return []
+        if self._native is None:
+            return self._create_fallback(types, r, a, b, c, h)
+        if not self._native.ptr:
+            raise ValueError("Пул тел уже закрыт")
+        codes = _int_column(types, n)
+        out = (c_void_p * n)()
+        errors = lib.create_bodies_batch(self._native.ptr, n, codes,
+                                         *(_double_column(column, n) for column in (r, a, b, c, h)), out)
+        if errors:
+            raise ValueError(f"Некорректные параметры для {errors} тел(а)")
+        # Обход ctypes-массивов по элементам медленный, списки получаются через memoryview
+        codes = memoryview(codes).cast("B").cast("i").tolist()
+        pointers = memoryview(out).cast("B").cast("N").tolist()
+        bodies = []
+        new = object.__new__
+        native = self._native
+        for code, ptr in zip(codes, pointers):
+            body = new(_BODY_CLASSES[code])
+            body._ptr = ptr
+            body._pool = native
+            bodies.append(body)
+        self.bodies.extend(bodies)
+        return bodies
+
+    def _create_fallback(self, types, r, a, b, c, h):
+        n = len(types)
+        columns = [[float(column)] * n if isinstance(column, (int, float)) else list(column)
+                   for column in (r, a, b, c, h)]
+        bodies = []
+        errors = 0
+        for code, (r, a, b, c, h) in zip(types, zip(*columns)):
+            try:
+                if code == SPHERE:
+                    bodies.append(Sphere(r))
+                elif code == BOX:
+                    bodies.append(Box(a, b, c))
+                elif code == CYLINDER:
+                    bodies.append(Cylinder(r, h))
+                else:
+                    errors += 1
+            except ValueError:
+                errors += 1
+        if errors:
+            raise ValueError(f"Некорректные параметры для {errors} тел(а)")
+        self.bodies.extend(bodies)
+        return bodies
+
+    def close(self):
+        """Закрывает все тела пула и освобождает его память"""
+        for body in self.bodies:
+            body._ptr = None
+            body._params = None
+        self.bodies = []
+        if self._native is not None:
+            self._native.free()
+        _closed()
+
+
 # Класс для работы с файлами
+@instrument
 class ResultExporter:
+    # progress(done, total) вызывается каждые PROGRESS_STEP тел; исключение из него прерывает экспорт
+    PROGRESS_STEP = 1000
+    
     @staticmethod
-    def export_to_txt(results, filename):
+    @timed(items=lambda results, *args, **kwargs: len(results))
+    def export_to_txt(results, filename, progress=None):
         with open(filename, 'w', encoding='utf-8') as f:
             f.write("Моменты инерции тел:\n")
             f.write("=" * 50 + "\n")
@@ -115,9 +566,12 @@ class ResultExporter:
                 f.write(f"   Плотность: {density} кг/м³\n")
                 f.write(f"   Момент инерции: {moment:.6f} кг·м²\n")
                 f.write("-" * 30 + "\n")
+                if progress and i % ResultExporter.PROGRESS_STEP == 0:
+                    progress(i, len(results))
     
     @staticmethod
-    def export_to_pdf(results, filename):
+    @timed(items=lambda results, *args, **kwargs: len(results))
+    def export_to_pdf(results, filename, progress=None):
         try:
             from reportlab.lib.pagesizes import A4
             from reportlab.pdfgen import canvas
@@ -142,21 +596,414 @@ class ResultExporter:
                 text = f"{i}. {body.name}: плотность={density} кг/м³, момент инерции={moment:.6f} кг·м²"
                 c.drawString(50, y, text)
                 y -= 20
+                if progress and i % ResultExporter.PROGRESS_STEP == 0:
+                    progress(i, len(results))
             
             c.save()
         except ImportError:
             raise ImportError("reportlab required for PDF export")
 
+def _container_size(self, *args, **kwargs):
+    return len(self.bodies)
+
+
 # Контейнер для хранения тел
+@instrument
 class BodyContainer:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.bodies = []
+        self.densities = []
+        self._ptr_array = None
+        self._ptr_generation = 0
+        self._pools = []
+        # inertia_cache.MomentCache: одинаковые тела с одной плотностью считаются один раз
+        self.cache = cache
+        self._reset_tracking()
+
+    def _reset_tracking(self):
+        # Учет изменений для update(): результаты на единицу плотности первых len(_unit_mass) тел
+        # (главные моменты - по три на тело), индексы тел, замененных после прошлого update(),
+        # и суммы [масса, момент, Ixx, Iyy, Izz] по остальным посчитанным телам. Тела с собственной
+        # плотностью входят в _own_sums с ее учетом, тела с общей плотностью - в _common_sums
+        # на единицу плотности, поэтому смена плотности не требует пересчета
+        self._unit_mass = []
+        self._unit_moment = []
+        self._unit_principal = []
+        self._dirty = set()
+        self._own_sums = [0.0] * 5
+        self._common_sums = [0.0] * 5
+        self._common_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
     
-    def add_body(self, body):
+    def add_body(self, body, density=None, material=None):
+        """Добавляет тело; density или material задают собственную плотность тела"""
+        if material is not None:
+            from inertia_materials import materials
+            density = materials.density(material)
+        if density is not None and density <= 0:
+            raise ValueError("Плотность должна быть положительной")
         self.bodies.append(body)
+        self.densities.append(density)
+        self._ptr_array = None
+
+    def add_bodies(self, bodies, densities=None, pool=None):
+        """Добавляет пачку тел; densities - собственные плотности (None - общая плотность расчета).
+
+        pool - BodyPool, в котором созданы тела: контейнер освободит его в close().
+        """
+        bodies = list(bodies)
+        densities = [None] * len(bodies) if densities is None else list(densities)
+        if len(densities) != len(bodies):
+            raise ValueError("Число плотностей не совпадает с числом тел")
+        if any(density is not None and density <= 0 for density in densities):
+            raise ValueError("Плотность должна быть положительной")
+        self.bodies.extend(bodies)
+        self.densities.extend(densities)
+        self._ptr_array = None
+        if pool is not None and pool not in self._pools:
+            self._pools.append(pool)
+
+    def extend(self, types, densities=None, **params):
+        """Создает тела по колонкам (r, a, b, c, h) в пуле контейнера и добавляет их.
+
+        Пул освобождается в close(); возвращает список созданных тел.
+        """
+        unknown = set(params) - set(PARAM_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+        if densities is not None and len(densities) != len(types):
+            raise ValueError("Число плотностей не совпадает с числом тел")
+        if not self._pools:
+            self._pools.append(BodyPool())
+        bodies = self._pools[-1].create_bodies(types, **params)
+        self.add_bodies(bodies, densities)
+        return bodies
+
+    def _index(self, index):
+        # Отрицательные индексы как у списка, IndexError за пределами контейнера
+        return range(len(self.bodies))[index]
+
+    def _account(self, indices, sign):
+        # Добавляет (sign=1) или вычитает (sign=-1) вклад посчитанных тел в суммы update()
+        own_sums, common_sums = self._own_sums, self._common_sums
+        mass, moment, principal, densities = self._unit_mass, self._unit_moment, self._unit_principal, self.densities
+        for i in indices:
+            own = densities[i]
+            if own is None:
+                sums, scale = common_sums, sign
+                self._common_count += sign
+            else:
+                sums, scale = own_sums, sign * own
+            sums[0] += scale * mass[i]
+            sums[1] += scale * moment[i]
+            sums[2] += scale * principal[3 * i]
+            sums[3] += scale * principal[3 * i + 1]
+            sums[4] += scale * principal[3 * i + 2]
+
+    def _mark_dirty(self, index):
+        if index < len(self._unit_mass) and index not in self._dirty:
+            self._account((index,), -1)
+            self._dirty.add(index)
+
+    def replace_body(self, index, body):
+        """Заменяет тело (например, с другими размерами); update() пересчитает только его"""
+        index = self._index(index)
+        self._mark_dirty(index)
+        self.bodies[index] = body
+        if self._ptr_array is not None:
+            self._ptr_array[index] = body._ptr
+
+    def set_density(self, index, density=None, material=None):
+        """Меняет собственную плотность тела (None - общая плотность расчета) без пересчета тела"""
+        if material is not None:
+            from inertia_materials import materials
+            density = materials.density(material)
+        if density is not None and density <= 0:
+            raise ValueError("Плотность должна быть положительной")
+        index = self._index(index)
+        counted = index < len(self._unit_mass) and index not in self._dirty
+        if counted:
+            self._account((index,), -1)
+        self.densities[index] = density
+        if counted:
+            self._account((index,), 1)
+
+    def remove_bodies(self, indices):
+        """Удаляет тела по индексам и возвращает их (тела не закрываются); итоги update()
+        уменьшаются на вклад удаленных тел без пересчета остальных"""
+        indices = sorted({self._index(i) for i in indices})
+        evaluated = len(self._unit_mass)
+        self._account([i for i in indices if i < evaluated and i not in self._dirty], -1)
+        removed = [self.bodies[i] for i in indices]
+        # С конца, чтобы индексы еще не удаленных тел не сдвигались
+        for i in reversed(indices):
+            del self.bodies[i]
+            del self.densities[i]
+            if i < evaluated:
+                del self._unit_mass[i]
+                del self._unit_moment[i]
+                del self._unit_principal[3 * i:3 * i + 3]
+        if self._dirty:
+            gone = set(indices)
+            self._dirty = {i - bisect_left(indices, i) for i in self._dirty if i not in gone}
+        self._ptr_array = None
+        return removed
+
+    def remove_body(self, index):
+        return self.remove_bodies([index])[0]
+
+    @property
+    def pending(self):
+        """Число тел, которые посчитает следующий update()"""
+        return len(self._dirty) + len(self.bodies) - len(self._unit_mass)
+
+    def _unit_results(self, bodies):
+        # Массы, моменты и главные моменты (плоским списком) тел при единичной плотности.
+        # Общие (интернированные) объекты тел считаются один раз, с кэшем - и одинаковые тела
+        if self.cache is not None:
+            return self.cache.unit_results(bodies, self._evaluate_unit)
+        unique = list(dict.fromkeys(bodies))
+        if len(unique) == len(bodies):
+            return self._evaluate_unit(bodies)
+        mass, moment, principal = self._evaluate_unit(unique)
+        position = {body: i for i, body in enumerate(unique)}
+        rows = [position[body] for body in bodies]
+        return ([mass[i] for i in rows], [moment[i] for i in rows],
+                [x for i in rows for x in principal[3 * i:3 * i + 3]])
+
+    def _evaluate_unit(self, bodies):
+        n = len(bodies)
+        if not lib:
+            engine = _fallback_engine()
+            columns = self._columns(bodies)
+            mass, moment = engine.evaluate(*columns, [1.0] * n)
+            _, principal = engine.principal(*columns, [1.0] * n)
+            errors = int((mass < 0).sum())
+            if errors:
+                raise ValueError(f"Ошибка расчета для {errors} тел(а)")
+            return mass.tolist(), moment.tolist(), principal.ravel().tolist()
+        pointers = (c_void_p * n)(*(body._ptr for body in bodies))
+        ones = (c_double * n)(*([1.0] * n))
+        mass = (c_double * n)()
+        moment = (c_double * n)()
+        principal = (c_double * (3 * n))()
+        errors = lib.calculate_principal_batch(pointers, n, ones, mass, principal)
+        if not errors:
+            errors = lib.calculate_moments_batch(pointers, n, ones, moment)
+        if errors:
+            raise ValueError(f"Ошибка расчета для {errors} тел(а)")
+        return list(mass), list(moment), list(principal)
+
+    @timed(items=lambda self, *args, **kwargs: self.pending)
+    def update(self, density=None, chunk_size=None, progress=None):
+        """Досчитывает тела, добавленные или замененные после прошлого update(), и возвращает
+        итоги (число тел, масса, момент, (Ixx, Iyy, Izz)) - диагональ тензора сборки с телами
+        в начале координат, как calculate_assembly_tensor без положений.
+
+        Результаты тел хранятся на единицу плотности: set_density, смена общей плотности density
+        и remove_bodies правят суммы без пересчета, поэтому вызов стоит O(числа изменений).
+        Изменения считаются блоками по chunk_size тел (None - одним блоком), после каждого блока
+        вызывается progress(done, total). Исключение из progress прерывает расчет: посчитанные
+        блоки сохраняются, остальные тела остаются в pending.
+        """
+        if density is not None and density <= 0:
+            raise ValueError("Плотность должна быть положительной")
+        indices = sorted(self._dirty) + list(range(len(self._unit_mass), len(self.bodies)))
+        total = len(indices)
+        step = max(int(chunk_size), 1) if chunk_size else max(total, 1)
+        for start in range(0, total, step):
+            self._update_chunk(indices[start:start + step])
+            if progress is not None:
+                progress(min(start + step, total), total)
+        if self._common_count and density is None:
+            raise ValueError("Не задана плотность для части тел")
+        totals = [own + (density or 0.0) * common for own, common in zip(self._own_sums, self._common_sums)]
+        return len(self.bodies), totals[0], totals[1], tuple(totals[2:])
+
+    def _update_chunk(self, indices):
+        # Замененные тела (индексы меньше len(_unit_mass)) идут раньше новых, новые - по порядку
+        mass, moment, principal = self._unit_results([self.bodies[i] for i in indices])
+        evaluated = len(self._unit_mass)
+        replaced = bisect_left(indices, evaluated)
+        for k, i in enumerate(indices[:replaced]):
+            self._unit_mass[i] = mass[k]
+            self._unit_moment[i] = moment[k]
+            self._unit_principal[3 * i:3 * i + 3] = principal[3 * k:3 * k + 3]
+            self._dirty.discard(i)
+        self._unit_mass.extend(mass[replaced:])
+        self._unit_moment.extend(moment[replaced:])
+        self._unit_principal.extend(principal[3 * replaced:])
+        self._account(indices, 1)
+
+    def results(self, density=None):
+        """Плотности, массы и моменты всех тел (списки) с досчетом только измененных тел.
+
+        Значения получаются умножением хранимых результатов на единицу плотности, без
+        повторного расчета в ядре.
+        """
+        self.update(density)
+        densities = self._body_densities(density)
+        return (densities, [d * m for d, m in zip(densities, self._unit_mass)],
+                [d * m for d, m in zip(densities, self._unit_moment)])
+
+    def body_result(self, index, density=None):
+        """(масса, момент) тела по результатам update() без обращения к ядру"""
+        index = self._index(index)
+        if index >= len(self._unit_mass) or index in self._dirty:
+            raise ValueError("Тело изменено после update()")
+        scale = self.densities[index]
+        if scale is None:
+            scale = density
+        if scale is None:
+            raise ValueError("Не задана плотность для части тел")
+        return scale * self._unit_mass[index], scale * self._unit_moment[index]
+
+    @timed(items=_container_size)
+    def body_records(self):
+        """Коды типов и колонки {r, a, b, c, h} всех тел одним вызовом DLL (см. body_records)"""
+        return body_records(self.bodies, self._pointers() if lib and self.bodies else None)
+
+    @timed(items=_container_size)
+    def _pointers(self):
+        # Массив указателей собирается один раз и переиспользуется до изменения контейнера
+        # или закрытия любого тела или пула: закрытые тела попадают в новый массив как NULL,
+        # и расчет сообщает о них ошибкой вместо обращения к освобожденной памяти
+        if self._ptr_array is None or self._ptr_generation != _close_generation:
+            n = len(self.bodies)
+            inertia_profile.count("ctypes.pointer_arrays_built")
+            self._ptr_array = (c_void_p * n)(*(body._ptr for body in self.bodies))
+            self._ptr_generation = _close_generation
+        return self._ptr_array
+    
+    def _body_densities(self, density):
+        # Собственная плотность тела важнее общей плотности расчета
+        densities = [own if own is not None else density for own in self.densities]
+        if None in densities:
+            raise ValueError("Не задана плотность для части тел")
+        return densities
+    
+    def _columns(self, bodies=None):
+        # Колонки типов и параметров для запасного движка (тела без нативного ядра)
+        bodies = self.bodies if bodies is None else bodies
+        if any(body._params is None for body in bodies):
+            raise ValueError("Тело уже освобождено")
+        types = [body._shape for body in bodies]
+        return [types] + [list(column) for column in zip(*(body._params for body in bodies))]
     
-    def calculate_all_moments(self, density):
-        return [(body, density, body.calculate_moment(density)) for body in self.bodies]
+    @timed(items=lambda self, kind, densities, start=0: len(densities))
+    def _calculate_batch(self, kind, densities, start=0):
+        # densities относятся к телам start, start + 1, ...
+        n = len(densities)
+        if not lib:
+            mass, moment = _fallback_engine().evaluate(*self._columns(self.bodies[start:start + n]), densities)
+            out = moment if kind == "moments" else mass
+            errors = int((out < 0).sum())
+        else:
+            pointers = self._pointers()
+            if start:
+                pointers = ctypes.cast(ctypes.byref(pointers, start * ctypes.sizeof(c_void_p)), POINTER(c_void_p))
+            out = (c_double * n)()
+            errors = getattr(lib, f"calculate_{kind}_batch")(pointers, n, (c_double * n)(*densities), out)
+        if errors:
+            raise ValueError(f"Ошибка расчета для {errors} тел(а)")
+        return [float(x) for x in out]
+    
+    @timed(items=_container_size)
+    def calculate_all_moments(self, density=None):
+        """Считает моменты инерции всех тел одним вызовом DLL"""
+        if not self.bodies:
+            return []
+        densities = self._body_densities(density)
+        if self.cache is not None:
+            moments = self.cache.evaluate(self.bodies, densities)[1]
+        else:
+            moments = self._calculate_batch("moments", densities)
+        return list(zip(self.bodies, densities, moments))
+    
+    def iter_moment_chunks(self, density=None, chunk_size=100000):
+        """Результаты calculate_all_moments блоками по chunk_size тел (для прогресса и отмены)"""
+        densities = self._body_densities(density)
+        for start in range(0, len(self.bodies), chunk_size):
+            part = densities[start:start + chunk_size]
+            if self.cache is not None:
+                moments = self.cache.evaluate(self.bodies[start:start + len(part)], part)[1]
+            else:
+                moments = self._calculate_batch("moments", part, start)
+            yield list(zip(self.bodies[start:start + len(part)], part, moments))
+    
+    def calculate_all_moments_sharded(self, density=None, workers=None, shard_size=None):
+        """Как calculate_all_moments, но шардами в пуле процессов для очень больших контейнеров"""
+        if not self.bodies:
+            return []
+        from inertia_columns import ColumnarBodyContainer
+        densities = self._body_densities(density)
+        columns = ColumnarBodyContainer.from_container(self, density)
+        _, moments = columns.calculate_sharded(workers=workers, shard_size=shard_size)
+        return list(zip(self.bodies, densities, moments.tolist()))
+    
+    @timed(items=_container_size)
+    def calculate_all_masses(self, density=None):
+        """Считает массы всех тел одним вызовом DLL"""
+        if not self.bodies:
+            return []
+        if self.cache is not None:
+            return self.cache.evaluate(self.bodies, self._body_densities(density))[0]
+        return self._calculate_batch("masses", self._body_densities(density))
+    
+    @timed(items=_container_size)
+    def calculate_assembly_tensor(self, density=None, positions=None, rotations=None, reference=None):
+        """Тензор инерции сборки по теореме Штейнера.
+
+        positions - координаты центров тел (по умолчанию все в начале координат),
+        rotations - матрицы поворота 3x3 тел, reference - точка приведения
+        (по умолчанию центр масс). Возвращает (масса, центр масс, тензор 3x3).
+        """
+        if not lib:
+            engine = _fallback_engine()
+            n = len(self.bodies)
+            masses, principal = engine.principal(*self._columns(), self._body_densities(density)) if n else ([], [])
+            if n and (masses < 0).any():
+                raise ValueError(f"Ошибка расчета для {int((masses < 0).sum())} тел(а)")
+            total, com, tensor = engine.assemble(masses, principal, positions, rotations, reference)
+            return float(total), tuple(float(x) for x in com), tensor.tolist()
+        n = len(self.bodies)
+        masses = (c_double * n)()
+        principal = (c_double * (3 * n))()
+        if n:
+            densities = (c_double * n)(*self._body_densities(density))
+            errors = lib.calculate_principal_batch(self._pointers(), n, densities, masses, principal)
+            if errors:
+                raise ValueError(f"Ошибка расчета для {errors} тел(а)")
+        flat_positions = (c_double * (3 * n))()
+        if positions is not None:
+            flat_positions[:] = [x for point in positions for x in point]
+        flat_rotations = None
+        if rotations is not None:
+            flat_rotations = (c_double * (9 * n))(*(x for matrix in rotations for row in matrix for x in row))
+        ref = (c_double * 3)(*reference) if reference is not None else None
+        com = (c_double * 3)()
+        tensor = (c_double * 9)()
+        total = lib.assemble_inertia_tensor(n, masses, principal, flat_positions, flat_rotations, ref, com, tensor)
+        return total, tuple(com), [list(tensor[0:3]), list(tensor[3:6]), list(tensor[6:9])]
     
     def clear(self):
-        self.bodies.clear()
\ No newline at end of file
+        # Тела остаются рабочими, пока на них есть ссылки вне контейнера
+        self.bodies.clear()
+        self.densities.clear()
+        self._ptr_array = None
+        self._pools = []
+        self._reset_tracking()
+
+    def close(self):
+        """Освобождает C++ объекты всех тел контейнера и очищает его"""
+        for body in self.bodies:
+            body.close()
+        for pool in self._pools:
+            pool.close()
+        self.clear()
+        self._ptr_array = None
\ No newline at end of file
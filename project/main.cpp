@@ -1,33 +1,136 @@
 #include "inertia_calculator.h"
+#include <cctype>
+#include <fstream>
 #include <iostream>
 #include <memory>
+#include <sstream>
+#include <string>
+#include <vector>
 
-int main() {
+// Консольная утилита:
+//   inertia_cli                 - пример расчета для трех тел
+//   inertia_cli bodies.csv      - расчет тел из CSV с заголовком (shape, r, a, b, c, h, density),
+//                                 результат (shape, mass, moment) печатается в stdout в формате CSV
+//   inertia_cli --density 7800 bodies.csv
+//                               - плотность строк без плотности (пусто или 0); колонка density
+//                                 тогда не обязательна
+// Материалы (колонка material) не поддерживаются: реестр материалов есть только в Python,
+// такие файлы считаются через inertia_cli.py.
+
+static const char* const PARAM_NAMES[] = {"r", "a", "b", "c", "h", "density"};
+
+static std::vector<std::string> splitCsv(const std::string& line) {
+    std::vector<std::string> fields;
+    std::stringstream ss(line);
+    std::string field;
+    while (std::getline(ss, field, ',')) {
+        size_t begin = field.find_first_not_of(" \t\r");
+        size_t end = field.find_last_not_of(" \t\r");
+        fields.push_back(begin == std::string::npos ? "" : field.substr(begin, end - begin + 1));
+    }
+    return fields;
+}
+
+static int shapeCode(std::string name) {
+    for (auto& ch : name) ch = char(std::tolower(static_cast<unsigned char>(ch)));
+    if (name == "sphere" || name == "0") return BODY_SPHERE;
+    if (name == "box" || name == "1") return BODY_BOX;
+    if (name == "cylinder" || name == "2") return BODY_CYLINDER;
+    throw std::invalid_argument("Unknown body type: " + name);
+}
+
+static int runDemo() {
+    std::vector<std::shared_ptr<Body>> collection;
+    collection.push_back(std::make_shared<Sphere>(1.0));
+    collection.push_back(std::make_shared<Box>(2.0, 3.0, 4.0));
+    collection.push_back(std::make_shared<Cylinder>(1.0, 2.0));
+
+    double density = 7800; // сталь
+
+    std::cout << "Моменты инерции тел:\n";
+    for (size_t i = 0; i < collection.size(); ++i) {
+        const auto& body = collection[i];
+        double moment = body->calculateMomentOfInertia(density);
+        std::cout << (i + 1) << ". " << body->getName()
+                  << ": " << moment << " кг·м²\n";
+    }
+    return 0;
+}
+
+static int runFile(const char* path, double default_density) {
+    std::ifstream in(path);
+    if (!in) throw std::runtime_error(std::string("Cannot open ") + path);
+
+    std::string line;
+    if (!std::getline(in, line)) return 0;
+    std::vector<std::string> header = splitCsv(line);
+    int shape_col = -1;
+    int material_col = -1;
+    int param_col[6] = {-1, -1, -1, -1, -1, -1};
+    for (size_t i = 0; i < header.size(); ++i) {
+        if (header[i] == "shape") shape_col = int(i);
+        if (header[i] == "material") material_col = int(i);
+        for (int k = 0; k < 6; ++k)
+            if (header[i] == PARAM_NAMES[k]) param_col[k] = int(i);
+    }
+    if (shape_col < 0 || (param_col[5] < 0 && default_density <= 0))
+        throw std::invalid_argument("CSV header must contain 'shape' and 'density' (or use --density)");
+
+    // Колонки в том же порядке, что аргументы calculate_columns
+    std::vector<int> types;
+    std::vector<double> params[6];
+    while (std::getline(in, line)) {
+        if (line.find_first_not_of(" \t\r") == std::string::npos) continue;
+        std::vector<std::string> fields = splitCsv(line);
+        fields.resize(header.size());
+        if (material_col >= 0 && !fields[material_col].empty())
+            throw std::invalid_argument("Line " + std::to_string(types.size() + 2) +
+                                        ": 'material' is not supported, use density or inertia_cli.py");
+        types.push_back(shapeCode(fields[shape_col]));
+        for (int k = 0; k < 6; ++k) {
+            const std::string& value = param_col[k] >= 0 ? fields[param_col[k]] : std::string();
+            params[k].push_back(value.empty() ? 0.0 : std::stod(value));
+        }
+        if (params[5].back() == 0.0 && default_density > 0) params[5].back() = default_density;
+    }
+
+    size_t n = types.size();
+    std::vector<double> mass(n), moment(n);
+    size_t errors = calculate_columns_parallel(n, types.data(), params[0].data(), params[1].data(),
+                                               params[2].data(), params[3].data(), params[4].data(),
+                                               params[5].data(), mass.data(), moment.data());
+
+    static const char* const names[] = {"Sphere", "Box", "Cylinder"};
+    std::cout.precision(17);
+    std::cout << "shape,mass,moment\n";
+    for (size_t i = 0; i < n; ++i)
+        std::cout << names[types[i]] << ',' << mass[i] << ',' << moment[i] << '\n';
+    if (errors) {
+        std::cerr << "Ошибка расчета для " << errors << " тел(а)\n";
+        return 2;
+    }
+    return 0;
+}
+
+int main(int argc, char** argv) {
     try {
-        BodyCollection<Body> collection;
-        
-        auto sphere = std::make_shared<Sphere>(1.0);
-        auto box = std::make_shared<Box>(2.0, 3.0, 4.0);
-        auto cylinder = std::make_shared<Cylinder>(1.0, 2.0);
-        
-        collection.addBody(sphere);
-        collection.addBody(box);
-        collection.addBody(cylinder);
-        
-        double density = 7800; // сталь
-        
-        std::cout << "Моменты инерции тел:\n";
-        for (size_t i = 0; i < collection.size(); ++i) {
-            auto body = collection.getBody(i);
-            double moment = body->calculateMomentOfInertia(density);
-            std::cout << (i + 1) << ". " << body->getName() 
-                      << ": " << moment << " кг·м²\n";
+        double density = 0.0;
+        const char* path = nullptr;
+        for (int i = 1; i < argc; ++i) {
+            std::string arg = argv[i];
+            if (arg == "--density") {
+                if (++i == argc) throw std::invalid_argument("--density requires a value");
+                density = std::stod(argv[i]);
+                if (density <= 0) throw std::invalid_argument("--density must be positive");
+            } else if (!path) {
+                path = argv[i];
+            } else {
+                throw std::invalid_argument("Unexpected argument: " + arg);
+            }
         }
-        
+        return path ? runFile(path, density) : runDemo();
     } catch (const std::exception& e) {
         std::cerr << "Ошибка: " << e.what() << '\n';
         return 1;
     }
-    
-    return 0;
-}
\ No newline at end of file
+}
@@ -0,0 +1,125 @@
+import pytest
+
+from inertia_wrapper import Sphere, Box, BodyContainer, SPHERE, BOX, CYLINDER
+from inertia_cache import BodyInterner, MomentCache, shape_key
+
+
+def test_moment_cache_rejects_closed_body():
+    cache = MomentCache()
+    body = Sphere(1.0)
+    mass, = cache.evaluate([body], [1000.0])[0]
+    assert mass == pytest.approx(4188.790204786391)
+    body.close()
+    with pytest.raises(ValueError):
+        cache.evaluate([body], [1000.0])
+    # Закрытое тело в контейнере с кэшем тоже не дает старых значений
+    container = BodyContainer(cache=cache)
+    other = Sphere(1.0)
+    container.add_body(other, 1000.0)
+    container.calculate_all_masses()
+    other.close()
+    with pytest.raises(ValueError):
+        container.calculate_all_masses()
+
+
+def test_interner_shares_bodies():
+    interner = BodyInterner()
+    first = interner.get("Sphere", r=1.0)
+    assert interner.get(SPHERE, r=1.0, h=5.0) is first
+    assert interner.get("Sphere", r=2.0) is not first
+    assert interner.stats()["hits"] == 1 and len(interner) == 2
+    box = Box(1.0, 2.0, 3.0)
+    assert interner.intern(box) is box
+    assert interner.intern(Box(1.0, 2.0, 3.0)) is box
+    assert shape_key("Box", a=1.0, b=2.0, c=3.0) in interner
+    interner.discard(box)
+    assert box.cache_key() not in interner
+    with pytest.raises(ValueError):
+        interner.get(7, r=1.0)
+
+
+def test_interner_columns():
+    interner = BodyInterner()
+    bodies = interner.intern_columns([SPHERE, SPHERE, BOX, SPHERE, BOX], r=[1.0, 2.0, 9.0, 1.0, 0.0],
+                                     a=[0.0, 0.0, 1.0, 0.0, 1.0], b=1.0, c=1.0)
+    assert bodies[0] is bodies[3]
+    assert bodies[2] is bodies[4]  # r не входит в ключ коробки
+    assert bodies[0] is not bodies[1]
+    assert len(interner) == 3
+    assert interner.intern_columns([SPHERE], r=[2.0])[0] is bodies[1]
+    assert bodies[1].calculate_mass(1000) == pytest.approx(Sphere(2.0).calculate_mass(1000), rel=1e-12)
+    with pytest.raises(ValueError):
+        interner.intern_columns([SPHERE], radius=[1.0])
+
+
+def test_interner_eviction_and_close():
+    interner = BodyInterner(max_size=2)
+    a, b = interner.get("Sphere", r=1.0), interner.get("Sphere", r=2.0)
+    interner.get("Sphere", r=1.0)
+    interner.get("Sphere", r=3.0)
+    # Вытесняется давно не запрашивавшееся тело, но оно остается рабочим
+    assert interner.evictions == 1 and shape_key(SPHERE, r=2.0) not in interner
+    assert b.calculate_mass(1000) > 0
+    assert interner.get("Sphere", r=2.0) is not b
+    interner.close()
+    assert a.closed and len(interner) == 0
+    assert interner.get("Sphere", r=1.0).calculate_mass(1000) > 0
+    with pytest.raises(ValueError):
+        BodyInterner(max_size=0)
+
+
+def test_moment_cache_hits_and_invalidate():
+    cache = MomentCache(max_size=3)
+    sphere, box = Sphere(1.0), Box(1.0, 2.0, 3.0)
+    masses, moments = cache.evaluate([sphere, box, Sphere(1.0), sphere], [1000.0, 1000.0, 1000.0, 1000.0])
+    assert cache.misses == 2 and cache.hits == 2
+    assert masses[0] == masses[2] == masses[3] == pytest.approx(sphere.calculate_mass(1000.0), rel=1e-12)
+    assert moments[1] == pytest.approx(box.calculate_moment(1000.0), rel=1e-12)
+    cache.evaluate([sphere, sphere], [2000.0, 3000.0])
+    assert len(cache) == 3 and cache.evictions == 1
+    cache.invalidate(shape="Sphere", density=2000.0)
+    assert len(cache) == 2
+    cache.invalidate()
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        MomentCache(max_size=0)
+
+
+def test_container_with_cache_matches_batch():
+    interner = BodyInterner()
+    bodies = interner.intern_columns([SPHERE, BOX, SPHERE, CYLINDER] * 5, r=[1.0, 0.0, 1.0, 0.5] * 5,
+                                     a=[0.0, 1.0, 0.0, 0.0] * 5, b=[0.0, 2.0, 0.0, 0.0] * 5,
+                                     c=[0.0, 3.0, 0.0, 0.0] * 5, h=[0.0, 0.0, 0.0, 2.0] * 5)
+    densities = [None, 2700.0] * 10
+    cached, plain = BodyContainer(cache=MomentCache()), BodyContainer()
+    for container in (cached, plain):
+        container.add_bodies(bodies, densities)
+    assert cached.calculate_all_masses(1000.0) == pytest.approx(plain.calculate_all_masses(1000.0), rel=1e-12)
+    assert cached.calculate_all_moments(1000.0) == plain.calculate_all_moments(1000.0)
+    assert cached.cache.misses == 3
+
+
+def _flat(totals):
+    count, mass, moment, principal = totals
+    return [count, mass, moment, *principal]
+
+
+def test_container_update_uses_cache():
+    cache = MomentCache()
+    container = BodyContainer(cache=cache)
+    container.add_bodies([Sphere(1.0), Box(1.0, 2.0, 3.0), Sphere(1.0)], [None, 2700.0, None])
+    plain = BodyContainer()
+    plain.add_bodies(container.bodies, container.densities)
+    assert _flat(container.update(1000.0)) == pytest.approx(_flat(plain.update(1000.0)), rel=1e-12)
+    assert cache.misses == 2 and cache.hits == 1
+    # Замена на тело с уже посчитанными размерами берется из кэша
+    container.replace_body(1, Sphere(1.0))
+    plain.replace_body(1, container.bodies[1])
+    assert _flat(container.update(1000.0)) == pytest.approx(_flat(plain.update(1000.0)), rel=1e-12)
+    assert cache.misses == 2 and cache.hits == 2
+    for values, expected in zip(container.results(1000.0), plain.results(1000.0)):
+        assert values == pytest.approx(expected, rel=1e-12)
+    container.bodies[0].close()
+    container.replace_body(0, container.bodies[0])
+    with pytest.raises(ValueError):
+        container.update(1000.0)
@@ -0,0 +1,26 @@
+import pytest
+
+from inertia_cli import main
+
+CSV = """shape,r,a,b,c,h,density
+sphere,1,,,,,1000
+cylinder,0.5,,,,2,
+"""
+
+
+def test_cli_default_density(tmp_path, capsys):
+    src = tmp_path / "bodies.csv"
+    src.write_text(CSV, encoding="utf-8")
+    dst = tmp_path / "out.csv"
+    assert main([str(src), "-o", str(dst), "-q"]) == 1
+    assert "плотность" in capsys.readouterr().err
+    assert main([str(src), "-o", str(dst), "-q", "--density", "2000"]) == 0
+    rows = dst.read_text(encoding="utf-8").splitlines()
+    assert len(rows) == 3 and ",2000.0," in rows[2]
+
+
+@pytest.mark.parametrize("density", ["0", "-5"])
+def test_cli_rejects_bad_density(tmp_path, density):
+    src = tmp_path / "bodies.csv"
+    src.write_text(CSV, encoding="utf-8")
+    assert main([str(src), "-o", str(tmp_path / "out.csv"), "-q", "--density", density]) == 1
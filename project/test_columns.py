@@ -0,0 +1,126 @@
+import math
+
+import numpy as np
+import pytest
+
+import inertia_wrapper
+from inertia_wrapper import SPHERE, BOX, CYLINDER, BodyContainer
+from inertia_engine import available_engines
+from inertia_columns import ColumnarBodyContainer, evaluate_numpy, principal_numpy, assemble_numpy, assemble_native
+
+needs_dll = pytest.mark.skipif(not inertia_wrapper.lib, reason="DLL не загружена")
+
+
+def random_columns(n=500, seed=0):
+    # Случайные тела всех типов и несколько некорректных строк (нулевой размер, плотность, тип)
+    rng = np.random.default_rng(seed)
+    types = rng.integers(0, 3, n).astype(np.intc)
+    r, a, b, c, h = rng.uniform(0.1, 2.0, (5, n))
+    density = rng.uniform(500.0, 9000.0, n)
+    r[::37] = 0.0
+    density[::41] = 0.0
+    types[::53] = 7
+    return types, r, a, b, c, h, density
+
+
+def valid_columns(n=500, seed=0):
+    columns = random_columns(n, seed)
+    valid = evaluate_numpy(*columns)[0] >= 0
+    return [x[valid] for x in columns]
+
+
+def test_numpy_formulas():
+    mass, moment = evaluate_numpy([SPHERE, BOX, CYLINDER], [1.0, 0.0, 0.5], [0.0, 1.0, 0.0],
+                                  [0.0, 2.0, 0.0], [0.0, 3.0, 0.0], [0.0, 0.0, 2.0], 1000.0)
+    np.testing.assert_allclose(mass, [4000.0 / 3.0 * math.pi, 6000.0, 500.0 * math.pi])
+    np.testing.assert_allclose(moment, [0.4 * mass[0], mass[1] * 13.0 / 12.0, 0.5 * mass[2] * 0.25])
+    mass, moment = evaluate_numpy([SPHERE, 7], [-1.0, 1.0], 0.0, 0.0, 0.0, 0.0, 1000.0)
+    np.testing.assert_array_equal(mass, [-1.0, -1.0])
+    np.testing.assert_array_equal(moment, [-1.0, -1.0])
+
+
+def test_columnar_container_matches_objects():
+    types, r, a, b, c, h, _ = valid_columns(n=40, seed=4)
+    container = BodyContainer()
+    container.extend(types, r=r, a=a, b=b, c=c, h=h)
+    columns = ColumnarBodyContainer.from_container(container, 1000.0)
+    assert len(columns) == len(types)
+    mass, moment = columns.calculate()
+    np.testing.assert_allclose(mass, container.calculate_all_masses(1000.0), rtol=1e-12)
+    np.testing.assert_allclose(moment, [m for _, _, m in container.calculate_all_moments(1000.0)], rtol=1e-12)
+    columns.add_sphere(0.0)
+    with pytest.raises(ValueError):
+        columns.calculate()
+
+
+def test_columnar_container_extend():
+    columns = ColumnarBodyContainer(capacity=1)
+    columns.add_sphere(1.0, 7800.0)
+    columns.add_box(1.0, 2.0, 3.0)
+    columns.add_cylinder(0.5, 2.0, material="aluminium")
+    assert len(columns) == 3
+    assert [columns.name(i) for i in range(3)] == ["Sphere", "Box", "Cylinder"]
+    assert columns.get_dimensions(2) == {"radius": 0.5, "height": 2.0}
+    np.testing.assert_allclose(columns.calculate_all_masses(1000.0)[:2], [4000.0 / 3.0 * math.pi, 6000.0])
+    with pytest.raises(ValueError):
+        columns.extend([SPHERE], radius=1.0)
+
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_columnar_engines_match_numpy(engine):
+    types, r, a, b, c, h, density = valid_columns(seed=5)
+    columns = ColumnarBodyContainer()
+    columns.extend(types, density, r=r, a=a, b=b, c=c, h=h)
+    for result, numpy in zip(columns.calculate(engine=engine), columns.calculate(engine="numpy")):
+        np.testing.assert_allclose(result, numpy, rtol=1e-12)
+    for result, numpy in zip(columns.principal_moments(engine=engine), columns.principal_moments(engine="numpy")):
+        np.testing.assert_allclose(result, numpy, rtol=1e-12)
+    for result, numpy in zip(columns.assembly_tensor(engine=engine), columns.assembly_tensor(engine="numpy")):
+        np.testing.assert_allclose(result, numpy, rtol=1e-9)
+
+
+def random_pose(n, seed=1, scale=5.0):
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(-scale, scale, (n, 3))
+    # Случайные повороты - ортогональные множители QR-разложения
+    rotations = np.array([np.linalg.qr(rng.normal(size=(3, 3)))[0] for _ in range(n)])
+    return positions, rotations
+
+
+def test_assemble_numpy_steiner():
+    # Две точечные массы на оси x: момент относительно центра масс m1*m2/(m1+m2)*d^2
+    total, com, tensor = assemble_numpy([1.0, 3.0], np.zeros((2, 3)), [[0, 0, 0], [4, 0, 0]])
+    assert total == 4.0
+    np.testing.assert_allclose(com, [3.0, 0.0, 0.0])
+    np.testing.assert_allclose(tensor, np.diag([0.0, 12.0, 12.0]), atol=1e-12)
+    # Приведение к другой точке добавляет M*d^2
+    _, _, shifted = assemble_numpy([1.0, 3.0], np.zeros((2, 3)), [[0, 0, 0], [4, 0, 0]], reference=[3, 0, 2])
+    np.testing.assert_allclose(shifted, tensor + 4.0 * (4.0 * np.eye(3) - np.outer([0, 0, 2], [0, 0, 2])),
+                               atol=1e-12)
+
+
+@needs_dll
+@pytest.mark.parametrize("posed", [False, True])
+def test_assemble_native_matches_numpy(posed):
+    types, r, a, b, c, h, _ = valid_columns(seed=2)
+    mass, principal = principal_numpy(types, r, a, b, c, h, 2700.0)
+    positions, rotations = random_pose(mass.shape[0]) if posed else (None, None)
+    total, com, tensor = assemble_native(mass, principal, positions, rotations)
+    expected_total, expected_com, expected_tensor = assemble_numpy(mass, principal, positions, rotations)
+    assert total == pytest.approx(expected_total, rel=1e-12)
+    np.testing.assert_allclose(com, expected_com, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(tensor, expected_tensor, rtol=1e-9, atol=1e-6)
+
+
+def test_container_assembly_tensor_matches_columns():
+    types, r, a, b, c, h, _ = valid_columns(n=60, seed=3)
+    positions, rotations = random_pose(types.shape[0])
+    container = BodyContainer()
+    container.extend(types, r=r, a=a, b=b, c=c, h=h)
+    total, com, tensor = container.calculate_assembly_tensor(7800.0, positions.tolist(), rotations.tolist())
+    columns = ColumnarBodyContainer()
+    columns.extend(types, 7800.0, r=r, a=a, b=b, c=c, h=h)
+    expected_total, expected_com, expected_tensor = columns.assembly_tensor(positions, rotations, engine="numpy")
+    assert total == pytest.approx(expected_total, rel=1e-12)
+    np.testing.assert_allclose(com, expected_com, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(tensor, expected_tensor, rtol=1e-9)
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from inertia_wrapper import Sphere, Box, BodyContainer, SPHERE, BOX, CYLINDER
+from inertia_cache import BodyInterner
+from inertia_materials import materials
+
+
+def _container(n=30, seed=0):
+    rng = np.random.default_rng(seed)
+    types = rng.integers(0, 3, n).astype(np.intc)
+    r, a, b, c, h = rng.uniform(0.1, 2.0, (5, n))
+    densities = [None if i % 3 else float(d) for i, d in enumerate(rng.uniform(500.0, 9000.0, n))]
+    container = BodyContainer()
+    container.extend(types, densities, r=r, a=a, b=b, c=c, h=h)
+    return container
+
+
+def _full(container, density):
+    # Итоги полного пересчета: тензор сборки с телами в начале координат
+    count = len(container.bodies)
+    mass, _, tensor = container.calculate_assembly_tensor(density)
+    moment = sum(m for _, _, m in container.calculate_all_moments(density)) if count else 0.0
+    return count, mass, moment, (tensor[0][0], tensor[1][1], tensor[2][2])
+
+
+def _assert_totals(totals, expected):
+    assert totals[0] == expected[0]
+    assert totals[1:3] == pytest.approx(expected[1:3], rel=1e-9)
+    assert totals[3] == pytest.approx(expected[3], rel=1e-9)
+
+
+def test_update_matches_full():
+    container = _container()
+    assert container.pending == 30
+    _assert_totals(container.update(1000.0), _full(container, 1000.0))
+    assert container.pending == 0
+    # Смена общей плотности не пересчитывает тела
+    _assert_totals(container.update(2500.0), _full(container, 2500.0))
+    container.extend([SPHERE, CYLINDER], r=[0.3, 0.4], h=[0.0, 1.5])
+    assert container.pending == 2
+    _assert_totals(container.update(2500.0), _full(container, 2500.0))
+
+
+def test_update_replace_set_density_remove():
+    container = _container(seed=1)
+    container.update(1000.0)
+    container.replace_body(4, Box(1.0, 2.0, 3.0))
+    container.replace_body(-1, Sphere(0.7))
+    assert container.pending == 2
+    container.set_density(0, 7800.0)
+    container.set_density(1, material="copper")
+    container.set_density(3)
+    assert container.densities[1] == materials.density("copper")
+    _assert_totals(container.update(1000.0), _full(container, 1000.0))
+    # Удаление в том числе замененного и еще не пересчитанного тела
+    container.replace_body(10, Sphere(0.2))
+    removed = container.remove_bodies([10, 2, -1])
+    assert len(removed) == 3 and len(container.bodies) == 27
+    container.replace_body(5, Box(0.5, 0.5, 0.5))
+    container.remove_body(0)
+    _assert_totals(container.update(1000.0), _full(container, 1000.0))
+    with pytest.raises(ValueError):
+        container.set_density(0, 0.0)
+    with pytest.raises(IndexError):
+        container.replace_body(100, Sphere(1.0))
+
+
+def test_results_and_body_result():
+    container = _container(seed=2)
+    densities, masses, moments = container.results(1200.0)
+    expected = container.calculate_all_moments(1200.0)
+    assert densities == [density for _, density, _ in expected]
+    assert moments == pytest.approx([m for _, _, m in expected], rel=1e-12)
+    assert masses == pytest.approx(container.calculate_all_masses(1200.0), rel=1e-12)
+    assert container.body_result(3, 1200.0) == pytest.approx((masses[3], moments[3]), rel=1e-12)
+    container.replace_body(3, Sphere(1.0))
+    with pytest.raises(ValueError):
+        container.body_result(3, 1200.0)
+
+
+def test_update_requires_density():
+    container = BodyContainer()
+    assert container.update() == (0, 0.0, 0.0, (0.0, 0.0, 0.0))
+    container.add_body(Sphere(1.0), 1000.0)
+    assert container.update()[1] == pytest.approx(Sphere(1.0).calculate_mass(1000.0), rel=1e-12)
+    container.add_body(Sphere(1.0))
+    with pytest.raises(ValueError):
+        container.update()
+    with pytest.raises(ValueError):
+        container.update(-1.0)
+    container.clear()
+    assert container.pending == 0 and container.update() == (0, 0.0, 0.0, (0.0, 0.0, 0.0))
+
+
+def test_update_shared_bodies():
+    # Интернированные тела повторяются в контейнере и считаются один раз
+    interner = BodyInterner()
+    bodies = interner.intern_columns([SPHERE, BOX, CYLINDER] * 10, r=[1.0, 0.0, 0.5] * 10,
+                                     a=[0.0, 1.0, 0.0] * 10, b=2.0, c=3.0, h=[0.0, 0.0, 2.0] * 10)
+    container = BodyContainer()
+    container.add_bodies(bodies, [None, 2700.0, None] * 10)
+    _assert_totals(container.update(1000.0), _full(container, 1000.0))
+    container.remove_bodies(range(0, 30, 2))
+    _assert_totals(container.update(1000.0), _full(container, 1000.0))
+
+
+def test_update_in_chunks_reports_progress():
+    container = _container(n=25, seed=3)
+    container.update(1000.0)
+    container.replace_body(20, Sphere(0.4))
+    container.replace_body(2, Box(0.1, 0.2, 0.3))
+    container.extend([SPHERE] * 6, r=0.5)
+    calls = []
+    totals = container.update(1000.0, chunk_size=3, progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(3, 8), (6, 8), (8, 8)]
+    _assert_totals(totals, _full(container, 1000.0))
+
+
+def test_update_cancel_keeps_counted_chunks():
+    container = _container(n=20, seed=4)
+
+    def cancel(done, total):
+        if done >= 10:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        container.update(1000.0, chunk_size=4, progress=cancel)
+    # Прерывание после третьего блока: 12 тел посчитаны, остальные ждут следующего update()
+    assert container.pending == 8
+    _assert_totals(container.update(1000.0, chunk_size=4), _full(container, 1000.0))
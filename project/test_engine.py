@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from inertia_columns import evaluate_numpy, principal_numpy, assemble_numpy
+from inertia_engine import ENGINES, PREFERENCE, available_engines, get_engine, set_num_threads, get_num_threads
+from test_columns import random_columns, valid_columns, random_pose
+
+
+@pytest.mark.parametrize("name", available_engines())
+def test_engines_match_numpy(name):
+    engine = ENGINES[name]
+    columns = random_columns()
+    mass, moment = engine.evaluate(*columns)
+    expected_mass, expected_moment = evaluate_numpy(*columns)
+    np.testing.assert_allclose(mass, expected_mass, rtol=1e-12)
+    np.testing.assert_allclose(moment, expected_moment, rtol=1e-12)
+    mass, principal = engine.principal(*columns)
+    expected_mass, expected_principal = principal_numpy(*columns)
+    np.testing.assert_allclose(mass, expected_mass, rtol=1e-12)
+    np.testing.assert_allclose(principal, expected_principal, rtol=1e-12)
+
+
+@pytest.mark.parametrize("name", available_engines())
+@pytest.mark.parametrize("posed", [False, True])
+def test_engines_assemble_match_numpy(name, posed):
+    types, r, a, b, c, h, _ = valid_columns(seed=2)
+    mass, principal = principal_numpy(types, r, a, b, c, h, 2700.0)
+    positions, rotations = random_pose(mass.shape[0]) if posed else (None, None)
+    total, com, tensor = ENGINES[name].assemble(mass, principal, positions, rotations)
+    expected_total, expected_com, expected_tensor = assemble_numpy(mass, principal, positions, rotations)
+    assert total == pytest.approx(expected_total, rel=1e-12)
+    np.testing.assert_allclose(com, expected_com, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(tensor, expected_tensor, rtol=1e-9, atol=1e-6)
+
+
+def test_get_engine():
+    # По умолчанию - первый доступный движок в порядке PREFERENCE
+    assert get_engine().name == next(name for name in PREFERENCE if name in available_engines())
+    assert get_engine("numpy") is ENGINES["numpy"]
+    with pytest.raises(ValueError):
+        get_engine("fortran")
+    for name in set(ENGINES) - set(available_engines()):
+        with pytest.raises(RuntimeError):
+            get_engine(name)
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_threads_do_not_change_results(threads):
+    # Колонки длиннее порога распараллеливания делятся между потоками
+    columns = random_columns(n=200000, seed=7)
+    expected = evaluate_numpy(*columns)
+    engine = get_engine()
+    try:
+        set_num_threads(threads)
+        if engine.name != "numpy":
+            assert get_num_threads() == threads
+        for result, reference in zip(engine.evaluate(*columns), expected):
+            np.testing.assert_allclose(result, reference, rtol=1e-12)
+    finally:
+        set_num_threads(0)
+    with pytest.raises(ValueError):
+        set_num_threads(-1)
+
+
+@pytest.mark.parametrize("name", available_engines())
+def test_engines_assemble_far_from_origin(name):
+    # Координаты порядка 1e5: суммы по сырым координатам теряли недиагональные элементы
+    types, r, a, b, c, h, _ = valid_columns(n=1200, seed=8)
+    mass, principal = principal_numpy(types, r, a, b, c, h, 7800.0)
+    positions, rotations = random_pose(mass.shape[0], seed=9)
+    positions += 1e5
+    for pose in ((positions, None), (positions, rotations)):
+        total, com, tensor = ENGINES[name].assemble(mass, principal, *pose)
+        expected_total, expected_com, expected_tensor = assemble_numpy(mass, principal, *pose)
+        np.testing.assert_allclose(com, expected_com, rtol=1e-12)
+        np.testing.assert_allclose(tensor, expected_tensor, rtol=1e-9, atol=1e-9 * np.abs(expected_tensor).max())
+    # Смещение всех тел на один вектор не меняет тензор относительно центра масс
+    _, _, near = assemble_numpy(mass, principal, positions - 1e5, rotations)
+    np.testing.assert_allclose(tensor, near, rtol=1e-6, atol=1e-9 * np.abs(near).max())
@@ -0,0 +1,48 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from inertia_export import export_results, EXPORT_COLUMNS
+from inertia_wrapper import SPHERE, BOX, CYLINDER
+
+TYPES = [SPHERE, BOX, CYLINDER, SPHERE, BOX]
+PARAMS = {"r": [1.0, 0.0, 0.5, 2.0, 0.0], "a": [0.0, 1.0, 0.0, 0.0, 2.0],
+          "b": [0.0, 2.0, 0.0, 0.0, 2.0], "c": [0.0, 3.0, 0.0, 0.0, 2.0], "h": [0.0, 0.0, 4.0, 0.0, 0.0]}
+DENSITY = [1000.0, 2000.0, 3000.0, 4000.0, 5000.0]
+MASS = [1.5, 2.5, 3.5, 4.5, 5.5]
+MOMENT = [0.1, 0.2, 0.3, 0.4, 0.5]
+
+
+def _export(path, chunk_size):
+    export_results(str(path), TYPES, DENSITY, MASS, MOMENT, chunk_size=chunk_size, **PARAMS)
+
+
+@pytest.mark.parametrize("chunk_size", [2, 5, 100, 1, 0, -3])
+def test_csv_round_trip(tmp_path, chunk_size):
+    path = tmp_path / "out.csv"
+    _export(path, chunk_size)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert [row[0] for row in rows[1:]] == ["Sphere", "Box", "Cylinder", "Sphere", "Box"]
+    np.testing.assert_allclose([float(row[-1]) for row in rows[1:]], MOMENT)
+    np.testing.assert_allclose([float(row[EXPORT_COLUMNS.index("h")]) for row in rows[1:]], PARAMS["h"])
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = tmp_path / "out.jsonl"
+    progress = []
+    export_results(str(path), TYPES, DENSITY, MASS, MOMENT, chunk_size=2,
+                   progress=lambda done, total: progress.append((done, total)), **PARAMS)
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["mass"] for record in records] == MASS
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+
+
+def test_unknown_format_and_params(tmp_path):
+    with pytest.raises(ValueError):
+        _export(tmp_path / "out.xyz", 2)
+    with pytest.raises(ValueError):
+        export_results(str(tmp_path / "out.csv"), TYPES, DENSITY, MASS, MOMENT, radius=1.0)
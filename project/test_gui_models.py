@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt6.QtCore")
+Qt = QtCore.Qt
+
+from inertia_wrapper import SPHERE, BOX, CYLINDER, Sphere
+from gui_models import BodyTableModel, NUMBER, SHAPE, DIMENSIONS, DENSITY, MASS, MOMENT
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _column(model, column):
+    return [model.data(model.index(row, column)) for row in range(model.rowCount())]
+
+
+def _model():
+    model = BodyTableModel()
+    model.extend([SPHERE, BOX, CYLINDER], [7800.0, float("nan"), 2700.0],
+                 r=[2.0, 0.0, 0.5], a=[0.0, 1.0, 0.0], b=[0.0, 2.0, 0.0], c=[0.0, 3.0, 0.0], h=[0.0, 0.0, 2.0])
+    return model
+
+
+def test_model_cells(app):
+    model = _model()
+    assert model.rowCount() == 3 and model.columnCount() == 6
+    assert _column(model, SHAPE) == ["Sphere", "Box", "Cylinder"]
+    assert _column(model, DIMENSIONS) == ["r=2", "1×2×3", "r=0.5, h=2"]
+    assert _column(model, DENSITY) == ["7800", "общая", "2700"]
+    assert _column(model, MASS) == ["", "", ""]
+    model.set_results([3.0, 1.0, 2.0], [30.0, 10.0, 20.0])
+    assert _column(model, MASS) == ["3", "1", "2"]
+    model.add_body(Sphere(1.0))
+    assert model.rowCount() == 4 and _column(model, MOMENT)[3] == ""
+
+
+def test_append_result_grows_buffers(app):
+    model = BodyTableModel()
+    model.extend([SPHERE] * 2000, 1000.0, r=1.0)
+    changed = []
+    model.dataChanged.connect(lambda *args: changed.append(args))
+    for i in range(2000):
+        model.append_result(float(i), 2.0 * i)
+    assert len(changed) == 2000
+    assert model.data(model.index(1999, MASS)) == "1999" and model.data(model.index(1500, MOMENT)) == "3000"
+
+
+def test_sort_keeps_bodies_and_selection(app):
+    model = _model()
+    model.set_results([3.0, 1.0, 2.0], [30.0, 10.0, 20.0])
+    selected = QtCore.QPersistentModelIndex(model.index(0, SHAPE))
+    model.sort(MASS)
+    assert _column(model, MASS) == ["1", "2", "3"]
+    assert _column(model, NUMBER) == ["2", "3", "1"]
+    assert [model.body_index(row) for row in range(3)] == [1, 2, 0]
+    # Выделенная строка остается на том же теле
+    assert selected.row() == 2
+    # Общая плотность (NaN) идет после заданных
+    model.sort(DENSITY)
+    assert _column(model, SHAPE) == ["Cylinder", "Sphere", "Box"]
+    # Новые результаты пересортировывают таблицу по активной колонке результатов
+    model.sort(MOMENT, Qt.SortOrder.DescendingOrder)
+    model.set_results([1.0, 2.0, 3.0], [10.0, 20.0, 30.0])
+    assert _column(model, NUMBER) == ["3", "2", "1"]
+    # Добавленное после сортировки тело идет в конец, по результатам без них не сортируется
+    model.add_body(Sphere(1.0))
+    assert _column(model, NUMBER)[-1] == "4"
+    model.sort(MASS)
+    assert _column(model, NUMBER) == ["3", "2", "1", "4"]
+    model.sort(NUMBER)
+    assert _column(model, NUMBER) == ["1", "2", "3", "4"]
+    model.clear()
+    assert model.rowCount() == 0
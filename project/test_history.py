@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from inertia_history import CalculationHistory, RunningTotals, load_snapshot, make_snapshot
+
+
+def test_history_keeps_last_snapshots():
+    history = CalculationHistory(max_snapshots=3)
+    for i in range(5):
+        history.append([float(i), 1.0], [2.0, 3.0], timestamp=i)
+    assert len(history) == 3 and history.evicted == 2 and history.spilled == []
+    assert [snapshot.timestamp for snapshot in history] == [2, 3, 4]
+    assert history.latest().total_mass == 5.0 and history[0].total_moment == 5.0
+    assert history.nbytes == 3 * 4 * 8
+    history.clear()
+    assert len(history) == 0 and history.nbytes == 0 and history.latest() is None
+    with pytest.raises(ValueError):
+        CalculationHistory(max_snapshots=0)
+    with pytest.raises(ValueError):
+        make_snapshot([1.0, 2.0], [1.0])
+
+
+def test_history_byte_limit_and_spill(tmp_path):
+    history = CalculationHistory(max_snapshots=10, max_bytes=1000, spill_dir=str(tmp_path / "spill"))
+    history.append(np.ones(40), np.ones(40), timestamp=1.0)
+    history.append(np.full(40, 2.0), np.ones(40), timestamp=2.0)
+    # Два снимка по 640 байт не помещаются в 1000 байт: старый выгружается на диск
+    assert len(history) == 1 and history.evicted == 1 and history.nbytes == 640
+    path, = history.spilled
+    spilled = load_snapshot(path)
+    assert spilled.timestamp == 1.0 and spilled.total_mass == 40.0
+    np.testing.assert_array_equal(spilled.masses, np.ones(40))
+    # Снимок больше лимита остается последним в буфере
+    history.append(np.ones(100), np.ones(100))
+    assert len(history) == 1 and history.nbytes == 1600 and len(history.spilled) == 2
+
+
+def test_running_totals():
+    totals = RunningTotals()
+    totals.reset(2, 10.0, 4.0, (1.0, 2.0, 3.0))
+    totals.add(5.0, 1.0, (0.5, 0.5, 1.0))
+    assert (totals.count, totals.mass, totals.moment, totals.principal) == (3, 15.0, 5.0, [1.5, 2.5, 4.0])
+    totals.reset()
+    assert (totals.count, totals.mass, totals.principal) == (0, 0.0, [0.0, 0.0, 0.0])
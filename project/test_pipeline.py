@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pytest
+
+from inertia_pipeline import read_chunks, process_file
+from inertia_materials import materials
+
+CSV = """shape,r,a,b,c,h,density,material
+sphere,1,,,,,1000,
+box,,1,2,3,,,steel
+cylinder,0.5,,,,2,,
+"""
+
+
+def _write(tmp_path, text=CSV):
+    path = tmp_path / "bodies.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_read_chunks_default_density(tmp_path):
+    path = _write(tmp_path)
+    chunk, = read_chunks(path)
+    np.testing.assert_array_equal(chunk["density"], [1000.0, materials.density("steel"), 0.0])
+    chunk, = read_chunks(path, density=500.0)
+    np.testing.assert_array_equal(chunk["density"], [1000.0, materials.density("steel"), 500.0])
+
+
+def test_read_chunks_blocks(tmp_path):
+    chunks = list(read_chunks(_write(tmp_path), chunk_size=2))
+    assert [len(chunk["types"]) for chunk in chunks] == [2, 1]
+
+
+def test_read_chunks_stdin(tmp_path, monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO(CSV))
+    chunk, = read_chunks("-", density=1.0)
+    assert list(chunk["types"]) == [0, 1, 2]
+
+
+def test_process_file_missing_density(tmp_path):
+    with pytest.raises(ValueError, match="плотность"):
+        process_file(_write(tmp_path), str(tmp_path / "out.csv"))
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_process_file_totals(tmp_path):
+    summary = process_file(_write(tmp_path), str(tmp_path / "out.csv"), density=2000.0)
+    steel = materials.density("steel")
+    mass = 4 / 3 * np.pi * 1000 + 6 * steel + np.pi * 0.25 * 2 * 2000
+    assert summary.bodies == 3
+    assert summary.total_mass == pytest.approx(mass)
@@ -0,0 +1,47 @@
+import pytest
+
+import inertia_profile
+from inertia_profile import timed, instrument
+
+
+@instrument
+class _Queue:
+    def __init__(self):
+        self.items = [1, 2, 3]
+
+    @timed(items=lambda self: len(self.items))
+    def drain(self):
+        self.items.clear()
+
+    @timed(items=lambda self: 1 / 0)
+    def fail(self):
+        raise KeyError("fail")
+
+
+@pytest.fixture
+def profiling():
+    inertia_profile.enable()
+    inertia_profile.reset()
+    yield
+    inertia_profile.disable()
+
+
+def test_items_counted_before_call(profiling):
+    _Queue().drain()
+    timer = inertia_profile.report()["timers"]["_Queue.drain"]
+    assert timer["calls"] == 1
+    assert timer["items"] == 3
+
+
+def test_items_error_does_not_mask_call_error(profiling):
+    with pytest.raises(KeyError):
+        _Queue().fail()
+    assert inertia_profile.report()["timers"]["_Queue.fail"]["calls"] == 1
+
+
+def test_disable_restores_originals():
+    original = _Queue.__dict__["drain"]
+    inertia_profile.enable()
+    assert _Queue.__dict__["drain"] is not original
+    inertia_profile.disable()
+    assert _Queue.__dict__["drain"] is original
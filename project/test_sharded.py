@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from inertia_wrapper import SPHERE, BOX, CYLINDER, BodyContainer
+from inertia_columns import evaluate_numpy
+from inertia_sharded import evaluate_sharded, shard_bounds
+from test_columns import random_columns, valid_columns
+
+
+def test_shard_bounds():
+    assert shard_bounds(10, 2, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert shard_bounds(0, 2, 4) == []
+    bounds = shard_bounds(1000000, 3)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 1000000
+    assert all(stop == start for (_, stop), (start, _) in zip(bounds, bounds[1:]))
+
+
+def test_sharded_matches_numpy():
+    columns = valid_columns(n=1000, seed=6)
+    mass, moment = evaluate_sharded(*columns, workers=2, shard_size=150, engine="numpy")
+    expected_mass, expected_moment = evaluate_numpy(*columns)
+    np.testing.assert_allclose(mass, expected_mass, rtol=1e-12)
+    np.testing.assert_allclose(moment, expected_moment, rtol=1e-12)
+    with pytest.raises(ValueError):
+        evaluate_sharded(*random_columns(n=1000, seed=6), workers=2, shard_size=400, engine="numpy")
+
+
+def test_container_sharded_matches_batch():
+    container = BodyContainer()
+    container.extend([SPHERE, BOX, CYLINDER] * 20, densities=[None, 2700.0, None] * 20,
+                     r=[1.0, 0.0, 0.5] * 20, a=[0.0, 1.0, 0.0] * 20, b=[0.0, 2.0, 0.0] * 20,
+                     c=[0.0, 3.0, 0.0] * 20, h=[0.0, 0.0, 2.0] * 20)
+    sharded = container.calculate_all_moments_sharded(1000.0, workers=2, shard_size=25)
+    batch = container.calculate_all_moments(1000.0)
+    assert [row[:2] for row in sharded] == [row[:2] for row in batch]
+    np.testing.assert_allclose([m for _, _, m in sharded], [m for _, _, m in batch], rtol=1e-12)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from inertia_wrapper import SPHERE, CYLINDER
+from inertia_columns import evaluate_numpy
+from inertia_engine import available_engines
+from inertia_sweep import sweep
+
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_sweep_matches_loop(engine):
+    radii = np.linspace(0.1, 1.0, 7)
+    heights = np.array([0.5, 2.0])
+    densities = np.array([1000.0, 7800.0, 2700.0])
+    result = sweep("Cylinder", densities, engine=engine, r=radii, h=heights)
+    assert result.axes == ("r", "h", "density")
+    assert result.mass.shape == result.moment.shape == (7, 2, 3)
+    for i, r in enumerate(radii):
+        for j, h in enumerate(heights):
+            mass, moment = evaluate_numpy([CYLINDER] * 3, r, 0.0, 0.0, 0.0, h, densities)
+            np.testing.assert_allclose(result.mass[i, j], mass, rtol=1e-12)
+            np.testing.assert_allclose(result.moment[i, j], moment, rtol=1e-12)
+
+
+def test_sweep_scalars_and_errors():
+    # Скаляры не дают осей
+    fixed = sweep(SPHERE, 1000.0, r=1.0)
+    assert fixed.axes == () and fixed.mass.shape == ()
+    assert sweep("Box", np.array([1.0, 2.0]), a=1.0, b=2.0, c=3.0).mass.tolist() == pytest.approx([6.0, 12.0])
+    with pytest.raises(ValueError):
+        sweep("Box", 1000.0, a=1.0, b=1.0)
+    with pytest.raises(ValueError):
+        sweep("Sphere", 1000.0, r=np.ones((2, 2)))
+    with pytest.raises(ValueError):
+        sweep("Sphere", 1000.0, r=np.array([1.0, 0.0]))
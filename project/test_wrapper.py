@@ -0,0 +1,101 @@
+import pytest
+
+import inertia_wrapper
+from inertia_wrapper import Sphere, Box, Cylinder, BodyPool, BodyContainer, SPHERE, BOX, CYLINDER
+
+
+def test_close_after_cached_pointers_raises():
+    # Массив указателей, собранный до close(), не должен использоваться после него
+    container = BodyContainer()
+    sphere, box = Sphere(1.0), Box(1.0, 2.0, 3.0)
+    container.add_body(sphere)
+    container.add_body(box)
+    container.calculate_all_moments(1000)
+    sphere.close()
+    with pytest.raises(ValueError):
+        container.calculate_all_moments(1000)
+    with pytest.raises(ValueError):
+        container.calculate_all_masses(1000)
+    with pytest.raises(ValueError):
+        container.calculate_assembly_tensor(1000)
+
+
+def test_pool_close_after_cached_pointers_raises():
+    pool = BodyPool()
+    bodies = pool.create_bodies([SPHERE, BOX], r=[1.0, 0.0], a=[0.0, 1.0], b=[0.0, 2.0], c=[0.0, 3.0])
+    container = BodyContainer()
+    container.add_bodies(bodies)
+    container.calculate_all_masses(1000)
+    pool.close()
+    assert all(body.closed for body in bodies)
+    with pytest.raises(ValueError):
+        container.calculate_all_masses(1000)
+
+
+def test_closed_body_methods_raise():
+    sphere = Sphere(1.0)
+    sphere.close()
+    assert sphere.closed
+    with pytest.raises(ValueError):
+        sphere.get_dimensions()
+
+
+def test_container_batch_matches_single():
+    # Пакетные вызовы DLL дают те же числа, что поштучные вызовы тел
+    bodies = [Sphere(1.0), Box(1.0, 2.0, 3.0), Cylinder(0.5, 2.0)]
+    container = BodyContainer()
+    for body, density in zip(bodies, [None, 2700.0, None]):
+        container.add_body(body, density)
+    densities = [1000.0, 2700.0, 1000.0]
+    masses = container.calculate_all_masses(1000.0)
+    moments = container.calculate_all_moments(1000.0)
+    assert [(body, density) for body, density, _ in moments] == list(zip(bodies, densities))
+    for body, density, mass, (_, _, moment) in zip(bodies, densities, masses, moments):
+        assert mass == pytest.approx(body.calculate_mass(density), rel=1e-12)
+        assert moment == pytest.approx(body.calculate_moment(density), rel=1e-12)
+    chunks = [row for chunk in container.iter_moment_chunks(1000.0, chunk_size=2) for row in chunk]
+    assert chunks == moments
+    assert BodyContainer().calculate_all_moments(1000.0) == []
+    with pytest.raises(ValueError):
+        container.calculate_all_masses()
+
+
+def test_pool_create_bodies():
+    with BodyPool() as pool:
+        bodies = pool.create_bodies([SPHERE, BOX, CYLINDER], r=[1.0, 0.0, 0.5], a=[0.0, 1.0, 0.0],
+                                    b=[0.0, 2.0, 0.0], c=[0.0, 3.0, 0.0], h=[0.0, 0.0, 2.0])
+        assert [type(body) for body in bodies] == [Sphere, Box, Cylinder]
+        assert len(pool) == 3
+        assert pool.blocks == (1 if inertia_wrapper.lib else 0)
+        assert [body.get_dimensions() for body in bodies] == [
+            {"radius": 1.0}, {"a": 1.0, "b": 2.0, "c": 3.0}, {"radius": 0.5, "height": 2.0}]
+        # Тела пула считаются так же, как созданные по одному
+        single = [Sphere(1.0), Box(1.0, 2.0, 3.0), Cylinder(0.5, 2.0)]
+        for body, reference in zip(bodies, single):
+            assert body.calculate_mass(1000) == pytest.approx(reference.calculate_mass(1000), rel=1e-12)
+            assert body.calculate_moment(1000) == pytest.approx(reference.calculate_moment(1000), rel=1e-12)
+        assert pool.create_bodies([]) == []
+        # Скалярный параметр задается сразу для всех тел
+        assert len(pool.create_bodies([SPHERE] * 4, r=2.0)) == 4
+        assert len(pool) == 7
+    assert all(body.closed for body in bodies)
+    assert pool.blocks == 0
+
+
+def test_pool_rejects_invalid_bodies():
+    pool = BodyPool()
+    with pytest.raises(ValueError):
+        pool.create_bodies([SPHERE, BOX], r=[1.0, 0.0], a=[0.0, -1.0], b=1.0, c=1.0)
+    assert len(pool) == 0
+    pool.close()
+    if inertia_wrapper.lib:
+        with pytest.raises(ValueError):
+            pool.create_bodies([SPHERE], r=1.0)
+
+
+def test_container_close_releases_pool():
+    container = BodyContainer()
+    bodies = container.extend([SPHERE, CYLINDER], r=[1.0, 0.5], h=[0.0, 2.0])
+    assert container.calculate_all_masses(1000.0)[0] > 0
+    container.close()
+    assert all(body.closed for body in bodies) and not container.bodies
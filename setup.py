@@ -1,15 +1,14 @@
 # setup.py
-from setuptools import setup, Extension
+from setuptools import setup
 from pybind11.setup_helpers import Pybind11Extension, build_ext
-from pybind11 import get_cmake_dir
-import pybind11
 
 ext_modules = [
     Pybind11Extension(
         "core",           # имя модуля в Python: import core
-        ["inertia_calculator.cpp"], 
-        ["inertia_calculator.h"],
-        ["main.cpp"],  
+        ["project/inertia_calculator.cpp", "project/core_bindings.cpp"],
+        include_dirs=["project"],
+        # Ядро компилируется прямо в модуль, поэтому символы не импортируются из inertia.dll
+        define_macros=[("BUILDING_INERTIA_DLL", None)],
         cxx_std=17,
     ),
 ]
@@ -19,4 +18,4 @@ setup(
     ext_modules=ext_modules,
     cmdclass={"build_ext": build_ext},
     zip_safe=False,
-)
\ No newline at end of file
+)